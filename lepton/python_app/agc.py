@@ -0,0 +1,174 @@
+# agc.py  (RAW16 → 8bit 자동 대비조정, 히스토그램 + 시간 smoothing)
+import cv2
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT
+from temp_lut import RAW_LEVELS
+
+# 히스토그램 bin 크기: raw >> 4 → 16 raw(0.16°C) 단위, 4096 bin
+HIST_SHIFT = 4
+HIST_BINS = RAW_LEVELS >> HIST_SHIFT
+
+# 범위가 너무 좁으면 노이즈가 과하게 커지므로 최소 폭 (예전 stretch_raw_to_grayscale 과 같은 값)
+MIN_SPAN = 10
+
+# linear LUT 는 smoothing 된 범위가 이 값(raw) 이상 움직였을 때만 다시 만든다
+LUT_HYSTERESIS = 8
+
+
+class Agc:
+    """
+    RAW16 프레임 → 8bit grayscale AGC 엔진.
+
+    mode
+      "linear"  : 히스토그램에서 아래/위 low_clip, high_clip 비율 픽셀을 잘라낸 범위를 0~255 로 선형 매핑
+      "equalize": 시간 평균 히스토그램으로 histogram equalization
+    smoothing (0~1]
+      클립 범위(linear) / 히스토그램(equalize) 의 EMA 계수.
+      1 이면 매 프레임 새로 계산, 작을수록 천천히 따라가서 화면 밝기 깜빡임이 줄어든다.
+
+    - 0 (dead pixel) 은 히스토그램에서 빼고 항상 0 으로 출력
+    - 매핑은 uint16 → uint8 LUT np.take 한 번, 결과는 미리 할당한 버퍼에 씀
+      (apply() 결과 배열은 다음 호출 때 덮어써지므로 보관하려면 .copy())
+    - linear LUT 는 범위가 LUT_HYSTERESIS 이상 바뀔 때만, 그것도 [lo, hi) 구간만 다시 계산
+    - linear + clip 0 (기본값) 이면 히스토그램 없이 유효 픽셀 min/max 만으로 범위를 잡는다
+    """
+
+    def __init__(self, mode="linear", low_clip=0.0, high_clip=0.0, smoothing=0.2,
+                 shape=(HEIGHT, WIDTH)):
+        if mode not in ("linear", "equalize"):
+            raise ValueError(f"unknown AGC mode: {mode}")
+
+        self.mode = mode
+        self.low_clip = low_clip
+        self.high_clip = high_clip
+        self.smoothing = smoothing
+
+        self._out = np.empty(shape, dtype=np.uint8)
+        self._idx = np.empty(shape, dtype=np.uint16)
+        self._tmp = np.empty(shape, dtype=np.uint16)
+
+        # linear: raw 전체 해상도 LUT
+        self._lut = np.zeros(RAW_LEVELS, dtype=np.uint8)
+        self._ramp = np.arange(RAW_LEVELS, dtype=np.float32)
+        self._scratch = np.empty(RAW_LEVELS, dtype=np.float32)
+        self._lut_range = None
+
+        # equalize: bin 단위 LUT + EMA 히스토그램
+        self._bin_lut = np.zeros(HIST_BINS, dtype=np.uint8)
+        self._hist = None
+
+        self.lo = None   # smoothing 된 현재 하한 (raw)
+        self.hi = None   # smoothing 된 현재 상한 (raw)
+
+    def reset(self):
+        """장면이 확 바뀌었을 때 smoothing 상태 초기화"""
+        self._hist = None
+        self.lo = None
+        self.hi = None
+
+    def _histogram(self, raw_frame):
+        np.right_shift(raw_frame, HIST_SHIFT, out=self._idx)
+        hist = np.bincount(self._idx.ravel(), minlength=HIST_BINS)
+        # bin 0 (raw 0~15) 은 dead pixel → 제외
+        hist[0] = 0
+        return hist
+
+    def _valid_min_max(self, raw_frame):
+        """0 을 뺀 min/max (없으면 None). raw - 1 하면 0 이 65535 로 넘어가는 걸 이용"""
+        np.subtract(raw_frame, 1, out=self._tmp)
+        min_m1 = cv2.minMaxLoc(self._tmp)[0]
+        raw_max = cv2.minMaxLoc(raw_frame)[1]
+        if raw_max == 0:
+            return None
+        return int(min_m1) + 1, int(raw_max)
+
+    def _clip_range(self, hist, total):
+        """히스토그램에서 low_clip / high_clip 비율을 잘라낸 (lo, hi) raw 범위"""
+        cdf = np.cumsum(hist)
+        lo_bin = int(np.searchsorted(cdf, self.low_clip * total, side="right"))
+        hi_bin = int(np.searchsorted(cdf, (1.0 - self.high_clip) * total, side="left"))
+        return lo_bin << HIST_SHIFT, (hi_bin + 1) << HIST_SHIFT
+
+    def _update_linear(self, lo, hi):
+        if self.lo is None:
+            self.lo, self.hi = float(lo), float(hi)
+        else:
+            a = self.smoothing
+            self.lo += a * (lo - self.lo)
+            self.hi += a * (hi - self.hi)
+
+        raw_min = max(1, int(round(self.lo)))
+        raw_max = min(RAW_LEVELS, max(int(round(self.hi)), raw_min + MIN_SPAN))
+
+        if self._lut_range is not None:
+            cur_min, cur_max = self._lut_range
+            if abs(raw_min - cur_min) < LUT_HYSTERESIS and abs(raw_max - cur_max) < LUT_HYSTERESIS:
+                return
+
+        lut = self._lut
+        lut[:raw_min] = 0
+        lut[raw_max:] = 255
+        n = raw_max - raw_min
+        ramp = self._scratch[:n]
+        np.subtract(self._ramp[raw_min:raw_max], raw_min, out=ramp)
+        ramp *= 255.0 / n
+        np.copyto(lut[raw_min:raw_max], ramp, casting="unsafe")   # float32 → uint8 (버림)
+        self._lut_range = (raw_min, raw_max)
+
+    def _update_equalize(self, hist):
+        if self._hist is None:
+            self._hist = hist.astype(np.float64)
+        else:
+            self._hist *= 1.0 - self.smoothing
+            self._hist += self.smoothing * hist
+
+        cdf = np.cumsum(self._hist)
+        nz = np.flatnonzero(self._hist)
+        cdf_min = cdf[nz[0]]
+        span = cdf[-1] - cdf_min
+
+        if span <= 0:
+            # 한 bin 에 다 몰려있으면 중간 회색
+            self._bin_lut[:] = 0
+            self._bin_lut[nz[0]:] = 128
+        else:
+            lut = (cdf - cdf_min) * (255.0 / span)
+            np.clip(lut, 0, 255, out=lut)
+            self._bin_lut[:] = lut
+            self._bin_lut[:nz[0]] = 0
+
+        self._bin_lut[0] = 0
+        self.lo = float(nz[0] << HIST_SHIFT)
+        self.hi = float((nz[-1] + 1) << HIST_SHIFT)
+
+    def apply(self, raw_frame, out=None):
+        """RAW16 프레임 → 8bit (out 안 주면 내부 버퍼 재사용)"""
+        if out is None:
+            out = self._out
+
+        if self.mode == "linear" and self.low_clip == 0 and self.high_clip == 0:
+            # 예전 stretch_raw_to_grayscale 처럼 유효 픽셀 min/max → 히스토그램 불필요
+            limits = self._valid_min_max(raw_frame)
+            if limits is None:
+                out[...] = 0
+                return out
+            self._update_linear(limits[0], limits[1] + 1)
+            np.take(self._lut, raw_frame, out=out)
+            return out
+
+        hist = self._histogram(raw_frame)
+        total = int(hist.sum())
+        if total == 0:
+            out[...] = 0
+            return out
+
+        if self.mode == "linear":
+            self._update_linear(*self._clip_range(hist, total))
+            np.take(self._lut, raw_frame, out=out)
+        else:
+            self._update_equalize(hist)
+            # _histogram 에서 만든 raw >> HIST_SHIFT 를 그대로 bin LUT 인덱스로 사용
+            np.take(self._bin_lut, self._idx, out=out)
+
+        return out
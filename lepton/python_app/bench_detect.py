@@ -0,0 +1,126 @@
+# bench_detect.py  (사람 검출 한 프레임 비용 비교)
+#
+# python bench_detect.py [repeat]
+#   ultralytics : 지금 스크립트들이 쓰는 model(gray_3ch, imgsz=160, conf=0.25) + 박스 추출
+#   onnx-dnn    : onnx_detect.OnnxPersonDetector (cv2.dnn)
+#   onnx-ort    : onnx_detect.OnnxPersonDetector (onnxruntime CPU)
+#   blob        : thermal_detect.ThermalDetector (신경망 없음)
+#   onnx batch  : detect_gray_batch 로 1/2/4/8 장 한 번에 → 장당 비용 (inference_service)
+#                 batch 가변 모델 필요 (python onnx_detect.py export --dynamic)
+# 모델 파일 / 패키지가 없는 항목은 건너뛴다 (yolov8n.onnx 는 python onnx_detect.py export).
+# ONNX 는 전처리(AGC → blob) / 추론 / 후처리(person 필터 + NMS) 를 나눠서도 잰다.
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from agc import Agc
+from bench_face_temp import make_frame, timeit
+from detect_worker import YOLO_WEIGHTS, yolo_person_boxes
+from thermal_detect import ThermalDetector
+import onnx_detect
+
+
+def bench_ultralytics(raw, repeat):
+    try:
+        from ultralytics import YOLO
+    except ImportError:
+        print(f"{'ultralytics':<12} skipped (not installed)")
+        return None
+    model = YOLO(YOLO_WEIGHTS)
+
+    gray = Agc().apply(raw)
+    gray_3ch = cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB)
+    t = timeit(lambda: yolo_person_boxes(model, gray_3ch), repeat)
+    boxes = yolo_person_boxes(model, gray_3ch)
+    print(f"{'ultralytics':<12} {t * 1e3:>8.2f} ms   boxes={boxes}")
+    return t
+
+
+def bench_onnx(raw, backend, repeat):
+    name = f"onnx-{backend}"
+    if not os.path.exists(onnx_detect.ONNX_MODEL):
+        print(f"{name:<12} skipped ({onnx_detect.ONNX_MODEL} not found)")
+        return None
+    try:
+        det = onnx_detect.OnnxPersonDetector(backend=backend)
+    except ImportError as e:
+        print(f"{name:<12} skipped ({e})")
+        return None
+
+    gray = np.empty_like(raw, dtype=np.uint8)
+    t = timeit(lambda: det.detect(raw), repeat)
+    t_pre = timeit(lambda: det._fill_blob(det._agc.apply(raw, out=gray)), repeat)
+    t_fwd = timeit(det.forward, repeat)
+    pred = det.forward()[0]
+    t_post = timeit(lambda: det.postprocess(pred), repeat)
+
+    boxes, _ = det.detect(raw)
+    print(f"{name:<12} {t * 1e3:>8.2f} ms   (pre {t_pre * 1e3:.2f} / forward {t_fwd * 1e3:.2f} / "
+          f"post {t_post * 1e3:.2f})   boxes={boxes}")
+    return t
+
+
+def bench_onnx_batch(raw, repeat, sizes=(1, 2, 4, 8)):
+    if not os.path.exists(onnx_detect.ONNX_MODEL):
+        return
+    det = onnx_detect.OnnxPersonDetector(max_batch=max(sizes))
+    if not det.batched:
+        print(f"{'onnx batch':<12} skipped ({onnx_detect.ONNX_MODEL} has a fixed batch size, "
+              "export with --dynamic)")
+        return
+    gray = Agc().apply(raw).copy()
+    for n in sizes:
+        grays = [gray] * n
+        t = timeit(lambda: det.detect_gray_batch(grays), repeat)
+        print(f"{'onnx batch':<12} {n:>2} x  {t * 1e3:>8.2f} ms   ({t / n * 1e3:.2f} ms/frame)")
+
+
+def bench_blob(raw, repeat):
+    det = ThermalDetector()
+    t = timeit(lambda: det.detect(raw), repeat)
+    print(f"{'blob':<12} {t * 1e3:>8.2f} ms   boxes={det(raw)}")
+    return t
+
+
+def bench_postprocess(repeat, n_people=3, per_person=15):
+    """모델 없이도 후처리 비용만: 사람당 겹친 후보 per_person 개짜리 가짜 출력"""
+    rng = np.random.default_rng(0)
+    det = onnx_detect.OnnxPersonDetector.__new__(onnx_detect.OnnxPersonDetector)
+    det.conf = onnx_detect.CONF_THRESHOLD
+    det.iou = onnx_detect.IOU_THRESHOLD
+
+    pred = np.zeros((84, 420), dtype=np.float32)
+    for p in range(n_people):
+        sl = slice(p * per_person, (p + 1) * per_person)
+        pred[0, sl] = rng.uniform(20, 140) + rng.normal(0, 1, per_person)
+        pred[1, sl] = 64 + rng.normal(0, 1, per_person)
+        pred[2, sl] = 30
+        pred[3, sl] = 80
+        pred[4, sl] = rng.uniform(0.3, 0.9, per_person)
+
+    t = timeit(lambda: det.postprocess(pred), repeat)
+    print(f"{'onnx post':<12} {t * 1e6:>8.1f} us   ({n_people} people x {per_person} candidates, "
+          f"-> {len(det.postprocess(pred)[0])} boxes)")
+
+
+def main(argv):
+    repeat = int(argv[0]) if argv else 50
+    rng = np.random.default_rng(0)
+    raw, _ = make_frame(rng, 3)
+
+    print(f"repeat={repeat}, frame {raw.shape[1]}x{raw.shape[0]}")
+    t_ref = bench_ultralytics(raw, repeat)
+    for backend in ("dnn", "ort"):
+        t = bench_onnx(raw, backend, repeat)
+        if t is not None and t_ref is not None:
+            print(f"{'':<12} {t_ref / t:>7.2f}x vs ultralytics")
+    bench_onnx_batch(raw, repeat)
+    bench_blob(raw, repeat)
+    bench_postprocess(repeat * 20)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
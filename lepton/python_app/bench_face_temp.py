@@ -0,0 +1,86 @@
+# bench_face_temp.py  (얼굴 온도 계산 사람당 비용 비교)
+#
+# python bench_face_temp.py
+#   sort    : 예전 compute_face_temp_from_center (np.sort 전체 정렬)
+#   single  : face_temp.face_raw_from_center (np.partition 상위 k 선택)
+#   batch   : face_temp.face_raw_from_centers (모든 사람 ROI 를 쌓아서 한 번에)
+import time
+
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT
+from face_temp import face_raw_from_center, face_raw_from_centers
+
+
+def legacy_face_raw(raw_frame, center, radius=10, hot_ratio=0.08):
+    """비교용: 예전 정렬 기반 구현 (섭씨 변환 전 raw 값까지)"""
+    cx, cy = center
+
+    x_min = max(0, cx - radius)
+    x_max = min(WIDTH, cx + radius + 1)
+    y_min = max(0, cy - radius)
+    y_max = min(HEIGHT, cy + radius + 1)
+
+    roi = raw_frame[y_min:y_max, x_min:x_max]
+    valid = roi[roi > 0]
+    if valid.size == 0:
+        return None
+
+    flat_sorted = np.sort(valid)
+    k = max(1, int(len(flat_sorted) * hot_ratio))
+    hottest_vals = flat_sorted[-k:]
+
+    if len(hottest_vals) > 6:
+        med = np.median(hottest_vals)
+        hottest_vals = hottest_vals[hottest_vals >= med]
+
+    return float(hottest_vals.mean())
+
+
+def make_frame(rng, n_people):
+    """배경 ~22°C + 사람 얼굴 ~34°C 얼룩 + 노이즈 + dead pixel"""
+    raw = rng.normal(29500, 30, (HEIGHT, WIDTH))
+    yy, xx = np.mgrid[0:HEIGHT, 0:WIDTH]
+    centers = []
+    for _ in range(n_people):
+        cx, cy = int(rng.integers(10, WIDTH - 10)), int(rng.integers(10, HEIGHT - 10))
+        raw += 1200 * np.exp(-((xx - cx) ** 2 + (yy - cy) ** 2) / (2 * 6.0 ** 2))
+        centers.append((cx, cy))
+    raw = raw.astype(np.uint16)
+    raw[rng.random((HEIGHT, WIDTH)) < 0.01] = 0
+    return raw, centers
+
+
+def timeit(fn, repeat):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    rng = np.random.default_rng(0)
+    repeat = 300
+
+    print(f"{'people':>6} {'sort us/p':>10} {'single us/p':>12} {'batch us/p':>11} {'speedup':>8}")
+    for n_people in (1, 2, 5, 10, 20):
+        raw, centers = make_frame(rng, n_people)
+        ratios = [0.08] * n_people
+
+        # 세 방법 결과가 같은지 먼저 확인
+        ref = [legacy_face_raw(raw, c) for c in centers]
+        assert ref == [face_raw_from_center(raw, c) for c in centers]
+        assert ref == face_raw_from_centers(raw, centers, hot_ratios=ratios)
+
+        t_sort = timeit(lambda: [legacy_face_raw(raw, c) for c in centers], repeat)
+        t_single = timeit(lambda: [face_raw_from_center(raw, c) for c in centers], repeat)
+        t_batch = timeit(lambda: face_raw_from_centers(raw, centers, hot_ratios=ratios), repeat)
+
+        print(f"{n_people:>6} {t_sort / n_people * 1e6:>10.1f} "
+              f"{t_single / n_people * 1e6:>12.1f} {t_batch / n_people * 1e6:>11.1f} "
+              f"{t_sort / t_batch:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# bench_hotpath.py  (매 프레임 도는 열화상 함수들의 비용: 사람 수별 시간 / 임시 메모리)
+#
+# python bench_hotpath.py                          # 사람 0,1,2,5,10,20 명
+# python bench_hotpath.py --people 0,5,20 --repeat 500
+# python bench_hotpath.py --noise 0.5 --dead 0.02  # 노이즈 (°C 표준편차) / dead pixel 비율
+# python bench_hotpath.py --no-alloc               # tracemalloc 측정 건너뛰기
+#
+# 표 값
+#   시간 : 프레임 하나 처리에 드는 µs (사람별 함수는 그 프레임의 사람 전부)
+#   alloc: 한 번 호출하는 동안 늘어난 최대 메모리 KiB (tracemalloc peak, NumPy 임시 배열 포함)
+# 맨 아래 'frame' 행은 final_temp.py 감지 사이 프레임 한 장 (integrals → refine → 온도),
+# 센서 프레임 간격(FRAME_PERIOD) 대비 몇 % 인지도 같이 출력.
+# PC 에서 잰 값이라 Pi 에서는 몇 배 느리지만, 변경 전후 비교 / 사람 수에 따른 증가 추세를 보는 용도.
+import argparse
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT
+from face_temp import find_face_center, refine_face_center, frame_integrals
+from thermal_detect import ThermalDetector
+from tracker import Tracker
+import final_temp
+import yolo_blob
+
+PEOPLE_COUNTS = (0, 1, 2, 5, 10, 20)
+
+# Lepton 3.x 출력 속도 (~8.7 fps)
+FRAME_PERIOD = 1.0 / 8.7
+
+# 합성 장면 기본값 (°C)
+AMBIENT_C = 22.0
+BODY_C = 30.0        # 옷 입은 몸통
+FACE_C = 34.5        # 얼굴 피부
+NOISE_C = 0.3
+DEAD_RATIO = 0.01
+
+
+def make_scene(rng, n_people, noise_c=NOISE_C, dead_ratio=DEAD_RATIO):
+    """
+    160x120 RAW16 합성 장면: 배경(위아래 완만한 기울기) + 사람(몸통 사각형 + 얼굴 타원) + 노이즈 + dead pixel.
+    사람 크기는 거리(scale) 에 따라 다르고 프레임 밖으로 일부 잘리거나 서로 겹칠 수 있다.
+    반환: (raw uint16, 사람 박스 [(x1, y1, x2, y2)], 얼굴 중심 [(x, y)])
+    """
+    temp = np.empty((HEIGHT, WIDTH), dtype=np.float32)
+    temp[:] = AMBIENT_C + np.linspace(-1.0, 1.0, HEIGHT, dtype=np.float32)[:, None]
+
+    boxes, centers = [], []
+    for _ in range(n_people):
+        scale = rng.uniform(0.5, 1.2)
+        w = int(16 * scale) + 4
+        h = int(50 * scale) + 8
+        x1 = int(rng.integers(-w // 4, WIDTH - w + w // 4))
+        y1 = int(rng.integers(0, HEIGHT - h // 2))
+        x2, y2 = x1 + w, y1 + h
+
+        # 몸통: 머리 아래부터 박스 끝까지
+        head_h = max(4, h // 5)
+        temp[max(0, y1 + head_h):max(0, y2), max(0, x1):max(0, x2)] = BODY_C + rng.uniform(-1.0, 1.0)
+
+        # 얼굴: 박스 위쪽 가운데 타원
+        cx, cy = x1 + w // 2, y1 + head_h // 2 + 1
+        ax, ay = max(2, w // 4), max(2, head_h // 2 + 1)
+        face_c = FACE_C + rng.uniform(-0.7, 0.7)
+        cv2.ellipse(temp, (cx, cy), (ax, ay), 0, 0, 360, float(face_c), -1)
+
+        boxes.append((max(0, x1), max(0, y1), min(WIDTH - 1, x2), min(HEIGHT - 1, y2)))
+        centers.append((min(max(cx, 0), WIDTH - 1), min(max(cy, 0), HEIGHT - 1)))
+
+    # 광학 blur (경계가 계단이 아니게) + 센서 노이즈
+    cv2.GaussianBlur(temp, (3, 3), 0, dst=temp)
+    temp += rng.normal(0.0, noise_c, temp.shape).astype(np.float32)
+
+    raw = np.rint((temp + 273.15) * 100.0).astype(np.uint16)
+    raw[rng.random(raw.shape) < dead_ratio] = 0
+    return raw, boxes, centers
+
+
+def timeit(fn, repeat):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def peak_alloc(fn):
+    """fn 한 번 호출 동안 늘어난 최대 메모리 (bytes). tracemalloc 이 켜져 있어야 함"""
+    fn()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    fn()
+    return max(0, tracemalloc.get_traced_memory()[1] - base)
+
+
+def make_cases(raw, boxes, centers):
+    """이름 → 인자 없는 함수 (장면 하나에 대해)"""
+    integrals = frame_integrals(raw)
+    ratios = [0.08] * len(centers)
+    detector = ThermalDetector()
+
+    # IoU 매칭: 같은 사람들이 1px 씩 움직인 박스 두 세트를 번갈아 넣음 (track 수 유지)
+    tracker = Tracker()
+    shifted = [(x1 + 1, y1, x2 + 1, y2) for x1, y1, x2, y2 in boxes]
+    tracker.update(boxes, 0.0)
+    tick = [0]
+
+    def track_update():
+        tick[0] += 1
+        tracker.update(shifted if tick[0] % 2 else boxes, tick[0] * FRAME_PERIOD)
+
+    def between_frame():
+        ints = frame_integrals(raw)
+        refined = [refine_face_center(raw, c, integrals=ints) for c in centers]
+        final_temp.compute_face_temps_from_centers(raw, refined, hot_ratios=ratios)
+
+    return {
+        "agc (stretch_raw_to_grayscale)": lambda: final_temp.stretch_raw_to_grayscale(raw),
+        "frame_integrals": lambda: frame_integrals(raw),
+        "find_face_center": lambda: [find_face_center(raw, b, integrals=integrals) for b in boxes],
+        "refine_face_center": lambda: [refine_face_center(raw, c, integrals=integrals) for c in centers],
+        "compute_face_temp_from_center": lambda: [final_temp.compute_face_temp_from_center(raw, c)
+                                                  for c in centers],
+        "compute_face_temps_from_centers": lambda: final_temp.compute_face_temps_from_centers(
+            raw, centers, hot_ratios=ratios),
+        "find_head_hotspot": lambda: [yolo_blob.find_head_hotspot(raw, b) for b in boxes],
+        "detect_blob_person_box": lambda: yolo_blob.detect_blob_person_box(raw),
+        "ThermalDetector.detect": lambda: detector.detect(raw),
+        "Tracker.update (IoU matching)": track_update,
+        "frame (between detections)": between_frame,
+    }
+
+
+def print_table(title, unit, names, counts, values, fmt):
+    width = max(len(n) for n in names)
+    print(f"\n{title} ({unit})")
+    print(f"{'people':<{width}} " + " ".join(f"{n:>8}" for n in counts))
+    for name in names:
+        print(f"{name:<{width}} " + " ".join(fmt(values[name, n]) for n in counts))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Per-frame cost of the thermal hot-path functions")
+    parser.add_argument("--people", default=",".join(map(str, PEOPLE_COUNTS)),
+                        help="comma separated person counts")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=NOISE_C, help="sensor noise std (°C)")
+    parser.add_argument("--dead", type=float, default=DEAD_RATIO, help="dead (zero) pixel ratio")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-alloc", action="store_true", help="skip tracemalloc measurement")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    counts = [int(n) for n in args.people.split(",")]
+    rng = np.random.default_rng(args.seed)
+
+    scenes = {n: make_scene(rng, n, noise_c=args.noise, dead_ratio=args.dead) for n in counts}
+
+    print(f"frame {WIDTH}x{HEIGHT}, repeat={args.repeat}, noise={args.noise}°C, dead={args.dead:.1%}")
+    # 합성 장면이 검출기에 어떻게 보이는지 (겹친 사람은 한 덩어리로 잡힘)
+    print("ThermalDetector boxes: " + ", ".join(
+        f"{n}->{len(ThermalDetector()(scenes[n][0]))}" for n in counts))
+
+    times, allocs = {}, {}
+    names = None
+    for n in counts:
+        cases = make_cases(*scenes[n])
+        names = list(cases)
+        for name, fn in cases.items():
+            times[name, n] = timeit(fn, args.repeat)
+
+    print_table("time per frame", "us", names, counts, times, lambda v: f"{v * 1e6:>8.1f}")
+
+    if not args.no_alloc:
+        # tracemalloc 은 느려서 시간 측정과 따로
+        tracemalloc.start()
+        for n in counts:
+            for name, fn in make_cases(*scenes[n]).items():
+                allocs[name, n] = peak_alloc(fn)
+        tracemalloc.stop()
+        print_table("peak temporary memory per frame", "KiB", names, counts, allocs,
+                    lambda v: f"{v / 1024:>8.1f}")
+
+    print()
+    for n in counts:
+        t = times["frame (between detections)", n]
+        print(f"{n:>2} people: between-detection frame {t * 1e3:.2f} ms = "
+              f"{t / FRAME_PERIOD:.1%} of the {FRAME_PERIOD * 1e3:.0f} ms frame period")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
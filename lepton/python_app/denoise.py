@@ -0,0 +1,237 @@
+# denoise.py  (RAW16 스트림 시간 방향 노이즈 제거: 픽셀별 EMA / 최근 N 프레임 median)
+#
+#   filt = TemporalFilter("ema", alpha=0.3)
+#   denoised = filt.update(raw_frame)          # 새 프레임마다 한 번, 결과는 내부 버퍼 재사용
+#
+#   스크립트 수정 없이 (read_frame.open_source 가 DenoisedReader 로 감쌈):
+#     LEPTON_DENOISE=ema python final_temp.py          # alpha 기본값
+#     LEPTON_DENOISE=ema:0.2 python final_temp.py
+#     LEPTON_DENOISE=median:3 python final_temp.py     # 최근 3 프레임 median
+#
+# 얼굴 온도 계산(face_raw_from_center)의 상위 픽셀 median 필터는 한 프레임 안에서만 노이즈를
+# 누르는데, 사람이 가만히 있는 동안은 같은 픽셀을 여러 프레임 평균하는 게 훨씬 싸고 효과가 크다.
+# - ema   : state += alpha * (raw - state). 한 프레임에 MOTION_THRESHOLD 이상 바뀐 픽셀은
+#           움직임으로 보고 바로 raw 로 리셋 (움직이는 사람 가장자리가 번지지 않게)
+# - median: 최근 window 프레임의 픽셀별 median (짝수면 위쪽 중앙값).
+#           np.partition(axis=0) 대신 미리 할당한 버퍼에서 min/max compare-swap 으로 선택
+# 0 (dead pixel) 은 그대로 0 으로 내보내서 기존 '0 초과 픽셀만' 처리와 맞춘다.
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT
+
+DEFAULT_ALPHA = 0.3
+DEFAULT_WINDOW = 3
+
+# raw 단위 (100 = 1°C). 센서 노이즈(~0.05°C)보다 충분히 크고 사람 가장자리 변화보다 작은 값
+MOTION_THRESHOLD = 80
+
+
+class TemporalFilter:
+    """
+    RAW16 프레임 시간 필터. update() 결과는 매번 같은 uint16 버퍼 (보관하려면 .copy()).
+    첫 프레임 (또는 reset() 직후) 은 그대로 통과.
+    """
+
+    def __init__(self, mode="ema", alpha=DEFAULT_ALPHA, window=DEFAULT_WINDOW,
+                 motion_threshold=MOTION_THRESHOLD, shape=(HEIGHT, WIDTH)):
+        if mode not in ("ema", "median"):
+            raise ValueError(f"unknown temporal filter mode: {mode}")
+        if mode == "median" and window < 1:
+            raise ValueError("median window must be >= 1")
+
+        self.mode = mode
+        self.alpha = alpha
+        self.window = window
+        self.motion_threshold = motion_threshold
+
+        self._out = np.empty(shape, dtype=np.uint16)
+
+        if mode == "ema":
+            self._state = np.empty(shape, dtype=np.float32)
+            self._diff = np.empty(shape, dtype=np.float32)
+            self._abs = np.empty(shape, dtype=np.float32)
+            self._reset_mask = np.empty(shape, dtype=bool)
+            self._dead = np.empty(shape, dtype=bool)
+        else:
+            self._history = np.empty((window,) + shape, dtype=np.uint16)
+            self._work = np.empty((window,) + shape, dtype=np.uint16)
+            self._lo = np.empty(shape, dtype=np.uint16)
+            self._hi = np.empty(shape, dtype=np.uint16)
+            self._index = 0
+
+        self.frames = 0
+
+    def reset(self):
+        self.frames = 0
+
+    def _update_ema(self, raw_frame):
+        state = self._state
+        if self.frames == 0:
+            np.copyto(state, raw_frame)
+        else:
+            diff = self._diff
+            np.subtract(raw_frame, state, out=diff)
+
+            # 크게 바뀐 픽셀(움직임)과 dead pixel 은 raw 로 리셋
+            np.abs(diff, out=self._abs)
+            np.greater(self._abs, self.motion_threshold, out=self._reset_mask)
+            np.equal(raw_frame, 0, out=self._dead)
+            self._reset_mask |= self._dead
+
+            diff *= self.alpha
+            state += diff
+            np.copyto(state, raw_frame, where=self._reset_mask)
+
+        np.rint(state, out=self._diff)
+        np.copyto(self._out, self._diff, casting="unsafe")
+        return self._out
+
+    def _update_median(self, raw_frame):
+        history = self._history
+        if self.frames == 0:
+            history[:] = raw_frame
+            self._index = 0
+        else:
+            self._index = (self._index + 1) % self.window
+            np.copyto(history[self._index], raw_frame)
+
+        if self.window == 1:
+            np.copyto(self._out, raw_frame)
+        elif self.window == 3:
+            # median(a, b, c) = max(min(a, b), min(max(a, b), c))
+            a, b, c = history
+            np.minimum(a, b, out=self._lo)
+            np.maximum(a, b, out=self._hi)
+            np.minimum(self._hi, c, out=self._hi)
+            np.maximum(self._lo, self._hi, out=self._out)
+        else:
+            self._select_median(history)
+
+        # 지금 프레임의 dead pixel 은 0 으로 (median 이 이웃 프레임 값으로 메우지 않게)
+        self._out[raw_frame == 0] = 0
+        return self._out
+
+    def _select_median(self, history):
+        """
+        bubble pass 를 (window - mid) 번: 매 pass 마다 남은 것 중 최대값이 뒤로 가므로
+        끝나면 work[mid] 가 중앙값. compare-swap 한 번 = 프레임 크기 min/max 3 번 (임시 배열 없음)
+        """
+        work = self._work
+        np.copyto(work, history)
+        lo = self._lo
+        n = self.window
+        mid = n // 2
+        for p in range(n - mid):
+            for j in range(n - 1 - p):
+                a, b = work[j], work[j + 1]
+                np.minimum(a, b, out=lo)
+                np.maximum(a, b, out=b)
+                np.copyto(a, lo)
+        np.copyto(self._out, work[mid])
+
+    def update(self, raw_frame):
+        """새 RAW16 프레임 → denoise 된 RAW16 (내부 버퍼)"""
+        if self.mode == "ema":
+            out = self._update_ema(raw_frame)
+        else:
+            out = self._update_median(raw_frame)
+        self.frames += 1
+        return out
+
+    @property
+    def output(self):
+        """마지막 update() 결과 (아직 없으면 None)"""
+        return self._out if self.frames else None
+
+
+def parse_filter_spec(spec):
+    """'ema', 'ema:0.2', 'median', 'median:5' → TemporalFilter"""
+    mode, _, arg = spec.partition(":")
+    mode = mode.strip().lower()
+    if mode == "ema":
+        return TemporalFilter("ema", alpha=float(arg) if arg else DEFAULT_ALPHA)
+    if mode == "median":
+        return TemporalFilter("median", window=int(arg) if arg else DEFAULT_WINDOW)
+    raise ValueError(f"unknown temporal filter: {spec!r} (ema[:alpha] or median[:window])")
+
+
+class DenoisedReader:
+    """
+    frame source (FrameReader / ReplayReader / SpiCapture) 를 감싸서
+    get_raw16_frame / get_frame / wait_frame / wait_raw16_frame 이 denoise 된 RAW 를 돌려주게 한다.
+
+    - 필터는 raw_seq 가 바뀐 새 프레임에서만 한 번 갱신 (같은 프레임을 여러 번 읽어도 한 번)
+    - 원본 RAW 는 get_original_raw16_frame() 으로 (마지막으로 읽은 프레임)
+    - raw_seq, raw_timestamp_ns, capture_stats() 같은 나머지는 원래 source 그대로
+    """
+
+    def __init__(self, source, temporal_filter):
+        self.source = source
+        self.filter = temporal_filter
+        self._raw = None
+        self._filtered_seq = None
+
+    def __getattr__(self, name):
+        # raw_seq / raw_timestamp_ns / current_seq / has_new_frame / capture_stats ...
+        return getattr(self.source, name)
+
+    def _denoise(self, raw):
+        seq = getattr(self.source, "raw_seq", None)
+        if seq is None or seq != self._filtered_seq or self.filter.output is None:
+            self.filter.update(raw)
+            self._filtered_seq = seq
+        self._raw = raw
+        return self.filter.output
+
+    def get_original_raw16_frame(self):
+        """마지막으로 읽은 원본 RAW (source 버퍼, 아직 없으면 None)"""
+        return self._raw
+
+    def get_raw16_frame(self, out=None, since_seq=None):
+        raw = self.source.get_raw16_frame(since_seq=since_seq)
+        if raw is None:
+            return None
+        denoised = self._denoise(raw)
+        if out is None:
+            return denoised
+        np.copyto(out, denoised)
+        return out
+
+    def get_rgb_frame(self, out=None, since_seq=None):
+        return self.source.get_rgb_frame(out=out, since_seq=since_seq)
+
+    def get_frame(self, since_seq=None):
+        frame = self.source.get_frame(since_seq=since_seq)
+        if frame is None:
+            return None
+        rgb, raw = frame
+        return rgb, self._denoise(raw)
+
+    def wait_frame(self, timeout=None, since_seq=None):
+        frame = self.source.wait_frame(timeout=timeout, since_seq=since_seq)
+        if frame is None:
+            return None
+        rgb, raw = frame
+        return rgb, self._denoise(raw)
+
+    def wait_raw16_frame(self, timeout=None, since_seq=None, out=None):
+        raw = self.source.wait_raw16_frame(timeout=timeout, since_seq=since_seq)
+        if raw is None:
+            return None
+        denoised = self._denoise(raw)
+        if out is None:
+            return denoised
+        np.copyto(out, denoised)
+        return out
+
+    def wait_rgb_frame(self, timeout=None, since_seq=None, out=None):
+        return self.source.wait_rgb_frame(timeout=timeout, since_seq=since_seq, out=out)
+
+    def close(self):
+        self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
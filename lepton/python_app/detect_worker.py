@@ -0,0 +1,339 @@
+# detect_worker.py  (YOLO 추론을 화면 루프와 분리하는 background worker + 검출기 registry)
+#
+#   parser = argparse.ArgumentParser()
+#   add_detector_arg(parser)                    # --detector none|blob|yolo|onnx
+#   detector = Detector(args.detector, interval=DETECTION_INTERVAL)
+#   result = detector.step(frame_seq, now, raw_frame, image)   # 새 결과면 (seq, boxes)
+#
+# ultralytics 는 torch 까지 import 해서 Pi 에서 수 초가 걸리므로 모듈 import 때 불러오지 않는다.
+# yolo 는 worker 스레드가 처음에 모델을 로딩하고, 그동안 메인 루프는 프레임을 계속 보여준다.
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+
+def _person_boxes(result):
+    """ultralytics Results 한 장 → person(class 0) 박스 [(x1, y1, x2, y2), ...]"""
+    boxes = []
+    det = result.boxes
+    if det is not None and det.xyxy is not None and det.cls is not None:
+        xyxy = det.xyxy.cpu().numpy()
+        cls = det.cls.cpu().numpy()
+
+        for i in np.where(cls == 0)[0]:  # person class
+            x1, y1, x2, y2 = map(int, xyxy[i])
+            boxes.append((x1, y1, x2, y2))
+    return boxes
+
+
+def yolo_person_boxes(model, image, imgsz=160, conf=0.25):
+    """YOLO 결과에서 person(class 0) 박스만 [(x1, y1, x2, y2), ...] 로 반환"""
+    results = model(image, imgsz=imgsz, conf=conf, verbose=False)
+
+    if len(results) == 0:
+        return []
+    return _person_boxes(results[0])
+
+
+def yolo_person_boxes_batch(model, images, imgsz=160, conf=0.25):
+    """여러 이미지를 한 번의 model() 호출(batch forward)로 → 이미지별 person 박스 리스트"""
+    results = model(list(images), imgsz=imgsz, conf=conf, verbose=False)
+    return [_person_boxes(r) for r in results]
+
+
+def largest_box(boxes):
+    """여러 명이면 면적이 가장 큰 박스 (없으면 None)"""
+    if not boxes:
+        return None
+    return max(boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]))
+
+
+class DetectionWorker:
+    """
+    detect_fn(image) → boxes 를 별도 스레드에서 실행.
+
+    - submit(image, seq): 이미지를 복사해 대기열(1칸)에 넣음. 아직 처리 안 된 이전 프레임은 버림
+    - poll()            : 새 결과가 있으면 (seq, boxes) 를 한 번만 반환, 없으면 None
+    - latest            : 마지막 결과 (seq, boxes) (계속 유지)
+    - result_ns         : poll() 이 마지막으로 돌려준 결과의 추론 (시작, 끝) time.monotonic_ns
+
+    메인 루프는 submit/poll 만 하고 추론이 끝나기를 기다리지 않는다.
+    """
+
+    def __init__(self, detect_fn=None, load_fn=None):
+        """
+        detect_fn 대신 load_fn (→ detect_fn) 을 주면 worker 스레드에서 먼저 로딩한다.
+        로딩 중에 submit 된 프레임은 가장 최근 것 하나만 남았다가 로딩이 끝나면 처리.
+        """
+        self.detect_fn = detect_fn
+        self.load_fn = load_fn
+
+        self._cond = threading.Condition()
+        self._pending = None       # (seq, image) - 가장 최근에 들어온 프레임 하나
+        self._result = None        # (seq, boxes) - 아직 poll() 안 된 결과
+        self._result_ns = None     # 그 결과의 추론 (시작, 끝) monotonic_ns
+        self._running = False
+        self._thread = None
+
+        self.latest = None         # 마지막 결과 (seq, boxes)
+        self.result_ns = None      # poll() 로 받은 결과의 추론 (시작, 끝) monotonic_ns
+        self.dropped = 0           # 처리 전에 더 새 프레임으로 교체된 횟수
+        self.last_infer_time = 0.0 # 마지막 추론 시간 (초)
+        self.load_time = None      # load_fn 걸린 시간 (초), 로딩 전이면 None
+        self.error = None          # load_fn / detect_fn 실패 시 예외 (worker 는 종료, poll() 은 계속 None)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            # 아직 로딩 중이면 기다리지 않음 (daemon 스레드라 프로세스와 같이 끝남)
+            if self.detect_fn is not None:
+                self._thread.join()
+            self._thread = None
+
+    def busy(self):
+        """처리 대기 중인 프레임이 있는지"""
+        with self._cond:
+            return self._pending is not None
+
+    def submit(self, image, seq):
+        if self.error is not None:
+            return
+        # 메인 루프가 버퍼를 재사용하므로 복사해서 넘긴다
+        image = image.copy()
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (seq, image)
+            self._cond.notify()
+
+    def poll(self):
+        with self._cond:
+            result = self._result
+            if result is not None:
+                self.result_ns = self._result_ns
+            self._result = None
+        return result
+
+    def ready(self):
+        """detect_fn 이 준비됐는지 (로딩 중이거나 로딩 / 검출 실패면 False)"""
+        return self.detect_fn is not None and self.error is None
+
+    def _load(self):
+        t0 = time.perf_counter()
+        try:
+            detect_fn = self.load_fn()
+        except Exception as e:       # ImportError (ultralytics 없음), 모델 파일 없음 등
+            self.error = e
+            print(f"[detector] load failed: {e!r} (running without detection)", file=sys.stderr)
+            return False
+        self.load_time = time.perf_counter() - t0
+        self.detect_fn = detect_fn
+        print(f"[detector] loaded in {self.load_time:.2f}s", file=sys.stderr)
+        return True
+
+    def _fail(self):
+        with self._cond:
+            self._running = False
+            self._pending = None
+
+    def _run(self):
+        if self.detect_fn is None and not self._load():
+            self._fail()
+            return
+
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                seq, image = self._pending
+                self._pending = None
+
+            t0 = time.monotonic_ns()
+            try:
+                boxes = self.detect_fn(image)
+            except Exception as e:   # 모델 입력 / 런타임 오류: 매 프레임 같은 오류를 찍지 않고 검출 중단
+                self.error = e
+                print(f"[detector] detect failed: {e!r} (running without detection)", file=sys.stderr)
+                self._fail()
+                return
+            t1 = time.monotonic_ns()
+            self.last_infer_time = (t1 - t0) / 1e9
+
+            with self._cond:
+                self._result = (seq, boxes)
+                self._result_ns = (t0, t1)
+                self.latest = self._result
+
+
+# ---- 검출기 registry ----
+
+YOLO_WEIGHTS = "yolov8n.pt"
+
+
+def open_yolo_model(weights=YOLO_WEIGHTS):
+    """
+    ultralytics YOLO 모델 (ultralytics / torch import 는 여기서 처음 일어남).
+    ultralytics 로그는 기본이 stdout 이라 --headless JSON-lines 출력에 섞이지 않게 stderr 로 돌린다.
+    """
+    from ultralytics import YOLO
+    from ultralytics.utils import LOGGER
+    for handler in LOGGER.handlers:
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+            handler.setStream(sys.stderr)
+    return YOLO(weights)
+
+
+def load_yolo(weights=YOLO_WEIGHTS):
+    """YOLO person 검출기"""
+    model = open_yolo_model(weights)
+    return lambda image: yolo_person_boxes(model, image)
+
+
+def load_onnx():
+    """yolov8n ONNX 를 cv2.dnn / onnxruntime 으로 (onnx_detect, 입력 버퍼 고정)"""
+    from onnx_detect import OnnxPersonDetector
+    return OnnxPersonDetector()
+
+
+def load_blob():
+    """열화상 피부 온도 구간 검출기 (thermal_detect, 수백 µs)"""
+    from thermal_detect import ThermalDetector
+    return ThermalDetector()
+
+
+# name → (load_fn, 입력, background)
+#   입력      : "raw" = RAW16 프레임, "image" = 3채널 이미지 (컬러 / grayscale 화면)
+#   background: True 면 로딩/추론 모두 worker 스레드에서 interval 마다,
+#               False 면 생성할 때 바로 로딩하고 매 프레임 메인 루프에서 실행
+DETECTORS = {
+    "none": (None, None, False),
+    "blob": (load_blob, "raw", False),
+    "yolo": (load_yolo, "image", True),
+    "onnx": (load_onnx, "raw", True),
+}
+
+
+def register_detector(name, load_fn, takes="raw", background=False):
+    """새 검출기 추가 (load_fn() → detect_fn(frame) → [(x1, y1, x2, y2), ...])"""
+    DETECTORS[name] = (load_fn, takes, background)
+
+
+def add_detector_arg(parser, default="yolo"):
+    """argparse 에 --detector 옵션 추가"""
+    parser.add_argument("--detector", choices=list(DETECTORS), default=default,
+                        help="person detector: none (mouse temperature only), "
+                             "blob (thermal, every frame), yolo / onnx (background thread) "
+                             f"(default: {default})")
+
+
+class Detector:
+    """
+    이름으로 고른 검출기를 메인 루프에서 같은 방식으로 쓰기 위한 핸들.
+
+    - none : step() 은 항상 None
+    - blob 처럼 background=False : 매 프레임 바로 실행해서 (seq, boxes)
+    - yolo 처럼 background=True  : interval 마다 DetectionWorker 에 넘기고 결과가 오면 (seq, boxes)
+                                   모델 로딩도 worker 에서 하므로 첫 프레임은 import 를 기다리지 않음
+    """
+
+    def __init__(self, name, interval=1.0):
+        if name not in DETECTORS:
+            raise ValueError(f"unknown detector: {name} (choices: {', '.join(DETECTORS)})")
+        load_fn, takes, background = DETECTORS[name]
+
+        self.name = name
+        self.takes = takes
+        # True = interval 마다 도는 주 검출기 (yolo / onnx), False = 매 프레임 도는 가벼운 검출기 (blob)
+        self.background = background
+        self.interval = interval
+        self.load_time = None
+        # step() 이 마지막으로 돌려준 결과의 추론 (시작, 끝) time.monotonic_ns (latency 측정용)
+        self.last_detect_ns = None
+
+        self._detect_fn = None
+        self._worker = None
+        self._last_submit = 0.0
+
+        if load_fn is None:
+            self.load_time = 0.0
+        elif background:
+            self._worker = DetectionWorker(load_fn=load_fn).start()
+        else:
+            t0 = time.perf_counter()
+            self._detect_fn = load_fn()
+            self.load_time = time.perf_counter() - t0
+
+    def ready(self):
+        """결과를 낼 수 있는 상태인지 (background 로딩 중이면 False)"""
+        if self._worker is not None:
+            self.load_time = self._worker.load_time
+            return self._worker.ready()
+        return self._detect_fn is not None
+
+    def status(self):
+        if self._worker is not None and self._worker.error is not None:
+            return f"{self.name}: failed"
+        if self.name == "none" or self.ready():
+            return f"{self.name}: ready ({self.load_time:.2f}s)"
+        return f"{self.name}: loading"
+
+    def step(self, seq, now, raw_frame, image):
+        """이번 프레임 처리. 새 감지 결과가 있으면 (seq, boxes), 없으면 None"""
+        frame = raw_frame if self.takes == "raw" else image
+
+        if self._detect_fn is not None:
+            t0 = time.monotonic_ns()
+            boxes = self._detect_fn(frame)
+            self.last_detect_ns = (t0, time.monotonic_ns())
+            return seq, boxes
+
+        if self._worker is None:
+            return None
+        if now - self._last_submit > self.interval:
+            self._worker.submit(frame, seq)
+            self._last_submit = now
+        result = self._worker.poll()
+        if result is not None:
+            self.last_detect_ns = self._worker.result_ns
+        return result
+
+    def stop(self):
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+
+
+_IMPORT_TIME = time.monotonic()
+
+
+def process_uptime():
+    """프로세스 시작 후 흐른 시간 (초). /proc 을 못 읽으면 이 모듈 import 이후 시간"""
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        # fields[0] 이 3번째 필드(state), starttime 은 22번째 필드 (clock tick 단위)
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.monotonic() - _IMPORT_TIME
+
+
+def print_startup_time(detector):
+    """첫 프레임을 화면에 띄울 때 한 번 호출: 프로세스 시작 → 첫 프레임 시간"""
+    print(f"[startup] first frame {process_uptime():.2f}s after start "
+          f"(detector {detector.status()})", file=sys.stderr)
@@ -1,13 +1,13 @@
 # face.py  (Person bbox + hotspot head temp + mouse pixel temp)
+import argparse
 import time
 import cv2
 import numpy as np
-from ultralytics import YOLO
 
-from read_frame import get_frame  # rgb_frame, raw_frame 반환
-
-# YOLO 일반 모델 (COCO, class 0 = person)
-model = YOLO("yolov8n.pt")
+from read_frame import get_frame, wait_frame, get_source  # rgb_frame, raw_frame 반환
+from temp_lut import raw_to_celsius
+from detect_worker import Detector, add_detector_arg, print_startup_time, largest_box
+from results import add_output_args, open_publisher, person
 
 # Lepton 해상도
 WIDTH = 160
@@ -16,7 +16,9 @@ HEIGHT = 120
 # YOLO 감지 주기 (초) - 1초에 한 번만 사람 detection
 DETECTION_INTERVAL = 1.0
 
-last_det_time = 0.0
+# 사람 검출기 기본값 (--detector none|blob|yolo), yolo = COCO class 0 = person
+DETECTOR = "yolo"
+
 person_box = None          # (x1, y1, x2, y2)
 head_temp_c = None         # 마지막 추정 머리온도(섭씨)
 
@@ -34,16 +36,6 @@ def mouse_event(event, x, y, flags, param):
         mouse_x, mouse_y = x, y
 
 
-def raw_to_celsius(raw_val: float) -> float:
-    """
-    Radiometric Lepton 3.x 가정:
-    raw ≈ Kelvin * 100  =>  T(°C) = raw/100 - 273.15
-    절대 정확도는 캘리브레이션 필요하지만
-    상대적인 비교/제어 용도로는 충분함.
-    """
-    return raw_val * 0.01 - 273.15
-
-
 def find_head_hotspot(raw_frame, box, head_ratio=0.6, radius=3):
     """
     사람 박스의 상단 부분(head 영역)에서 가장 뜨거운 픽셀(hotspot)을 찾고,
@@ -101,81 +93,115 @@ def find_head_hotspot(raw_frame, box, head_ratio=0.6, radius=3):
     return raw_to_celsius(avg_raw)
 
 
-def main():
-    global last_det_time, person_box, head_temp_c
-
-    window_name = "Person Hotspot Temperature"
-    cv2.namedWindow(window_name)
-    cv2.setMouseCallback(window_name, mouse_event)
-
-    while True:
-        # 1) C++가 /dev/shm에 써둔 프레임 읽기
-        rgb_frame, raw_frame = get_frame()  # rgb: (H, W, 3), raw: (H, W)
-       
-
-        now = time.time()
-
-        # 2) 1초에 한 번만 YOLO detection
-        if now - last_det_time > DETECTION_INTERVAL:
-            results = model(rgb_frame, imgsz=160, conf=0.25)
+def draw(window_name, rgb_frame, raw_frame):
+    """마우스 온도 + 사람 박스 / 머리 온도 표시"""
+    # 시각화용 이미지 복사
+    vis = rgb_frame.copy()
 
-            person_box = None
-            head_temp_c = None
+    # 마우스 아래 픽셀 온도 표시
+    if 0 <= mouse_x < WIDTH and 0 <= mouse_y < HEIGHT:
+        raw_val = int(raw_frame[mouse_y, mouse_x])
+        if raw_val > 0:
+            temp_c = raw_to_celsius(raw_val)
+            txt = f"{temp_c:.2f} C"
+            cv2.putText(vis, txt, (mouse_x + 8, mouse_y + 12),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
+            cv2.circle(vis, (mouse_x, mouse_y), 2, (255, 255, 255), -1)
 
-            if len(results) > 0 and results[0].boxes is not None:
-                boxes = results[0].boxes
-                if boxes.xyxy is not None and boxes.cls is not None:
-                    xyxy = boxes.xyxy.cpu().numpy()
-                    cls  = boxes.cls.cpu().numpy()
+    # 사람 박스 + 머리 온도 표시
+    if person_box is not None:
+        x1, y1, x2, y2 = person_box
+        cv2.rectangle(vis, (x1, y1), (x2, y2), (0,255,0), 2)
 
-                    # class 0 = person
-                    person_idx = np.where(cls == 0)[0]
-                    if person_idx.size > 0:
-                        # 여러 명이면 가장 큰 박스 선택
-                        p_xyxy = xyxy[person_idx]
-                        areas = (p_xyxy[:, 2] - p_xyxy[:, 0]) * (p_xyxy[:, 3] - p_xyxy[:, 1])
-                        idx = np.argmax(areas)
-                        x1, y1, x2, y2 = p_xyxy[idx]
-                        person_box = (int(x1), int(y1), int(x2), int(y2))
+        if head_temp_c is not None:
+            txt = f"{head_temp_c:.1f} C"
+            cv2.putText(vis, txt, (x1, max(0, y1 - 5)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0,255,0), 1)
 
-                        # 사람 박스 내부에서 머리쪽 핫스팟 기반 온도 추정
-                        head_temp_c = find_head_hotspot(raw_frame, person_box,
-                                                        head_ratio=0.6, radius=3)
+    cv2.imshow(window_name, vis)
 
-            last_det_time = now
 
-        # 3) 시각화용 이미지 복사
-        vis = rgb_frame.copy()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Person bbox + hotspot head temperature")
+    add_detector_arg(parser, default=DETECTOR)
+    add_output_args(parser)
+    return parser.parse_args(argv)
 
-        # 3-1) 마우스 아래 픽셀 온도 표시
-        if 0 <= mouse_x < WIDTH and 0 <= mouse_y < HEIGHT:
-            raw_val = int(raw_frame[mouse_y, mouse_x])
-            if raw_val > 0:
-                temp_c = raw_to_celsius(raw_val)
-                txt = f"{temp_c:.2f} C"
-                cv2.putText(vis, txt, (mouse_x + 8, mouse_y + 12),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
-                cv2.circle(vis, (mouse_x, mouse_y), 2, (255, 255, 255), -1)
 
-        # 3-2) 사람 박스 + 머리 온도 표시
-        if person_box is not None:
-            x1, y1, x2, y2 = person_box
-            cv2.rectangle(vis, (x1, y1), (x2, y2), (0,255,0), 2)
+def main(argv=None):
+    global person_box, head_temp_c
 
-            if head_temp_c is not None:
-                txt = f"{head_temp_c:.1f} C"
-                cv2.putText(vis, txt, (x1, max(0, y1 - 5)),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0,255,0), 1)
+    args = parse_args(argv)
 
-        # 4) 출력
-        cv2.imshow(window_name, vis)
+    # --headless: 창 / 그리기 없이 결과만 publisher 로 (화면은 result_viewer.py 가 따로)
+    publisher = open_publisher(args)
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-
-    cv2.destroyAllWindows()
+    window_name = "Person Hotspot Temperature"
+    if not args.headless:
+        cv2.namedWindow(window_name)
+        cv2.setMouseCallback(window_name, mouse_event)
+
+    # yolo 는 worker 스레드에서 로딩하므로 모델을 기다리지 않고 바로 화면 루프 시작
+    detector = Detector(args.detector, interval=DETECTION_INTERVAL)
+    frame_seq = 0
+
+    try:
+        while True:
+            # 1) C++가 /dev/shm에 써둔 프레임 읽기
+            if args.headless:
+                # waitKey 로 쉬는 곳이 없으므로 같은 프레임을 반복하지 않게 새 프레임을 기다림
+                frame = wait_frame(timeout=0.5)
+                if frame is None:
+                    continue
+                rgb_frame, raw_frame = frame
+            else:
+                rgb_frame, raw_frame = get_frame()  # rgb: (H, W, 3), raw: (H, W)
+
+            now = time.time()
+
+            frame_seq += 1
+
+            if frame_seq == 1:
+                print_startup_time(detector)
+
+            # 2) 1초에 한 번만 YOLO detection 요청 (worker 스레드에서 가장 최근 프레임만 처리)
+            # 새 결과가 도착했을 때만 박스/머리 온도 갱신 (화면 루프는 기다리지 않음)
+            result = detector.step(frame_seq, now, raw_frame, rgb_frame)
+            if result is not None:
+                det_seq, boxes = result
+
+                # 여러 명이면 가장 큰 박스 선택
+                person_box = largest_box(boxes)
+                head_temp_c = None
+
+                if person_box is not None:
+                    # 사람 박스 내부에서 머리쪽 핫스팟 기반 온도 추정
+                    head_temp_c = find_head_hotspot(raw_frame, person_box,
+                                                    head_ratio=0.6, radius=3)
+
+            if publisher is not None:
+                # 한 사람만 추적하므로 id 는 항상 1 (머리 중심은 따로 추적하지 않음)
+                people = [] if person_box is None else [person(1, person_box, None, head_temp_c)]
+                source = get_source()
+                publisher.publish(source.raw_seq, source.raw_timestamp_ns, people)
+
+            if args.headless:
+                continue
+
+            # 3) 화면 출력
+            draw(window_name, rgb_frame, raw_frame)
+
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detector.stop()
+        if publisher is not None:
+            publisher.close()
+        if not args.headless:
+            cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
     main()
-
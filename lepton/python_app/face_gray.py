@@ -1,18 +1,20 @@
+import argparse
 import time
 import cv2
 import numpy as np
-from ultralytics import YOLO
 
 from read_frame import get_frame  # rgb_frame, raw_frame
-
-# YOLO 모델 (person detection)
-model = YOLO("yolov8n.pt")
+from temp_lut import raw_to_celsius
+from agc import Agc
+from detect_worker import Detector, add_detector_arg, print_startup_time, largest_box
 
 WIDTH = 160
 HEIGHT = 120
 
 DETECTION_INTERVAL = 1.0
-last_det_time = 0.0
+
+# 사람 검출기 기본값 (--detector none|blob|yolo)
+DETECTOR = "yolo"
 
 # detection results
 person_box = None
@@ -29,11 +31,6 @@ def mouse_event(event, x, y, flags, param):
         mouse_x, mouse_y = x, y
 
 
-def raw_to_celsius(raw_val: float) -> float:
-    """Lepton radiometric 변환: raw/100 - 273.15"""
-    return raw_val * 0.01 - 273.15
-
-
 def find_head_hotspot(raw_frame, box, head_ratio=0.6, radius=2):
     """사람 박스 상단부분에서 가장 뜨거운 지점을 찾아 온도로 변환"""
     x1, y1, x2, y2 = box
@@ -82,33 +79,34 @@ def find_head_hotspot(raw_frame, box, head_ratio=0.6, radius=2):
     return raw_to_celsius(avg_raw)
 
 
-def stretch_raw_to_grayscale(raw_frame):
-    """RAW16 → 밝기/대비 자동 보정된 8bit grayscale로 변환"""
-    valid_pixels = raw_frame[raw_frame > 0]
+# 화면용 AGC (범위를 프레임마다 EMA 로 따라가서 밝기 깜빡임 감소)
+agc = Agc()
 
-    if valid_pixels.size == 0:
-        return np.zeros_like(raw_frame, dtype=np.uint8)
 
-    raw_min = np.min(valid_pixels)
-    raw_max = np.max(valid_pixels)
+def stretch_raw_to_grayscale(raw_frame):
+    """RAW16 → 밝기/대비 자동 보정된 8bit grayscale로 변환 (agc.Agc, 결과 버퍼는 매 프레임 재사용)"""
+    return agc.apply(raw_frame)
 
-    # 너무 범위가 작으면 대비 강제 확장
-    if raw_max - raw_min < 10:
-        raw_max = raw_min + 10
 
-    stretched = ((raw_frame - raw_min) * (255.0 / (raw_max - raw_min)))
-    stretched = np.clip(stretched, 0, 255)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Thermal grayscale head temperature")
+    add_detector_arg(parser, default=DETECTOR)
+    return parser.parse_args(argv)
 
-    return stretched.astype(np.uint8)
 
+def main(argv=None):
+    global person_box, head_temp_c
 
-def main():
-    global last_det_time, person_box, head_temp_c
+    args = parse_args(argv)
 
     window_name = "Thermal YOLO (Grayscale Enhanced)"
     cv2.namedWindow(window_name)
     cv2.setMouseCallback(window_name, mouse_event)
 
+    # yolo 는 worker 스레드에서 로딩/추론하므로 모델을 기다리지 않고 바로 화면 루프 시작
+    detector = Detector(args.detector, interval=DETECTION_INTERVAL)
+    frame_seq = 0
+
     while True:
         # 1) SHM에서 프레임 가져오기 (C++에서 계속 업데이트 중)
         rgb_frame, raw_frame = get_frame()
@@ -119,32 +117,23 @@ def main():
         # 3) YOLO는 3채널이 필요하므로 1채널을 3채널로 확장
         gray_3ch = cv2.cvtColor(raw_8bit, cv2.COLOR_GRAY2RGB)
 
-        # 4) 1초에 한 번 YOLO detection
         now = time.time()
-        if now - last_det_time > DETECTION_INTERVAL:
-
-            person_box = None
-            head_temp_c = None
+        frame_seq += 1
+        if frame_seq == 1:
+            print_startup_time(detector)
 
-            results = model(gray_3ch, imgsz=160, conf=0.25)
+        # 4) 1초에 한 번 YOLO detection (worker 스레드, 결과가 왔을 때만 갱신)
+        result = detector.step(frame_seq, now, raw_frame, gray_3ch)
+        if result is not None:
+            det_seq, boxes = result
 
-            if len(results) > 0 and results[0].boxes is not None:
-                boxes = results[0].boxes
-                xyxy = boxes.xyxy.cpu().numpy()
-                cls = boxes.cls.cpu().numpy()
-
-                ids = np.where(cls == 0)[0]  # person만
-                if ids.size > 0:
-                    pxy = xyxy[ids]
-                    areas = (pxy[:, 2] - pxy[:, 0]) * (pxy[:, 3] - pxy[:, 1])
-                    best = np.argmax(areas)
-                    x1, y1, x2, y2 = map(int, pxy[best])
-                    person_box = (x1, y1, x2, y2)
-
-                    # 머리 온도 계산
-                    head_temp_c = find_head_hotspot(raw_frame, person_box)
+            # 여러 명이면 가장 큰 박스
+            person_box = largest_box(boxes)
+            head_temp_c = None
 
-            last_det_time = now
+            if person_box is not None:
+                # 머리 온도 계산
+                head_temp_c = find_head_hotspot(raw_frame, person_box)
 
         # 5) 시각화용 grayscale → BGR로 변환
         vis = cv2.cvtColor(raw_8bit, cv2.COLOR_GRAY2BGR)
@@ -181,6 +170,7 @@ def main():
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
+    detector.stop()
     cv2.destroyAllWindows()
 
 
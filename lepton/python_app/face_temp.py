@@ -0,0 +1,292 @@
+# face_temp.py  (사람 박스 → 얼굴 중심 / 얼굴 온도 계산 공용 함수)
+import cv2
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT
+
+# face_raw_from_centers 에서 이 인원 이상일 때만 batch 배열 연산 사용
+BATCH_MIN_PEOPLE = 4
+
+# refine_face_center: 감지 사이 프레임에서 이전 중심 주변 ±REFINE_RADIUS 픽셀만 다시 찾음
+# (9Hz 에서 한 프레임에 얼굴이 움직이는 거리), 평균 내는 칸 크기는 REFINE_CELL
+REFINE_RADIUS = 6
+REFINE_CELL = 7
+
+
+def frame_integrals(raw_frame):
+    """
+    RAW 프레임의 summed-area table 2개를 한 번에 계산.
+    - sums  : raw 값 누적합 (0 픽셀은 더해도 0 이므로 유효 픽셀 합과 같음)
+    - counts: raw > 0 (유효 픽셀) 개수 누적합
+    둘 다 (H+1, W+1), [0, :] / [:, 0] 은 0.
+    sums 는 float64 지만 정수 합(< 2^53)이라 오차 없음.
+    한 프레임에서 여러 사람 박스를 처리할 때 한 번만 만들어서 같이 쓴다.
+    """
+    sums = cv2.integral(raw_frame, sdepth=cv2.CV_64F)
+    counts = cv2.integral((raw_frame > 0).view(np.uint8), sdepth=cv2.CV_32S)
+    return sums, counts
+
+
+def _rect_sum(table, y1, y2, x1, x2):
+    """table 에서 [y1:y2, x1:x2] 합 (y*, x* 는 broadcast 가능한 배열)"""
+    return table[y2, x2] - table[y1, x2] - table[y2, x1] + table[y1, x1]
+
+
+def find_face_center(raw_frame, box, prev_center=None,
+                     grid_rows=6, grid_cols=4, integrals=None):
+    """
+    YOLO 박스 안에서 '가장 뜨거운 영역'을 찾아 얼굴 중심 추정.
+    - 박스 세로 10%~80% 구간만 사용 (다리 제외)
+    - grid로 나눠서 각 칸 평균 온도 계산
+    - 평균 온도가 가장 높은 칸의 중심을 얼굴 중심으로 사용
+    - 이전 중심(prev_center)과 살짝 섞어서 위치 튐 줄임
+
+    칸 평균은 summed-area table(frame_integrals)로 모든 칸을 한 번에 계산한다.
+    integrals 를 주면 그걸 재사용 (한 프레임 여러 사람일 때).
+    """
+    x1, y1, x2, y2 = box
+
+    x1 = max(0, min(WIDTH - 1, x1))
+    x2 = max(0, min(WIDTH - 1, x2))
+    y1 = max(0, min(HEIGHT - 1, y1))
+    y2 = max(0, min(HEIGHT - 1, y2))
+
+    if x2 <= x1 or y2 <= y1:
+        return prev_center
+
+    H = y2 - y1
+
+    # 검색 영역: 위 10% ~ 아래 80% (머리~상체 위주)
+    sy1 = int(y1 + H * 0.10)
+    sy2 = int(y1 + H * 0.80)
+    sx1 = x1
+    sx2 = x2
+
+    sy1 = max(0, min(HEIGHT - 1, sy1))
+    sy2 = max(0, min(HEIGHT, sy2))
+    sx1 = max(0, min(WIDTH - 1, sx1))
+    sx2 = max(0, min(WIDTH, sx2))
+
+    if sy2 <= sy1 or sx2 <= sx1:
+        return prev_center
+
+    if integrals is None:
+        integrals = frame_integrals(raw_frame)
+    sums, counts = integrals
+
+    cell_h = (sy2 - sy1) / grid_rows
+    cell_w = (sx2 - sx1) / grid_cols
+
+    # 칸 경계 (예전 루프의 int(sy1 + r * cell_h) 와 같은 값)
+    r = np.arange(grid_rows + 1, dtype=np.float64)
+    c = np.arange(grid_cols + 1, dtype=np.float64)
+    ys = (sy1 + r * cell_h).astype(np.int64)
+    xs = (sx1 + c * cell_w).astype(np.int64)
+
+    cy1, cy2 = ys[:-1, None], ys[1:, None]
+    cx1, cx2 = xs[None, :-1], xs[None, 1:]
+
+    cell_sum = _rect_sum(sums, cy1, cy2, cx1, cx2)
+    cell_cnt = _rect_sum(counts, cy1, cy2, cx1, cx2)
+
+    # 유효 픽셀 없는 칸(빈 칸 포함)은 후보에서 제외
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(cell_cnt > 0, cell_sum / cell_cnt, -np.inf)
+
+    # 행 우선으로 처음 나온 최대값 (예전 루프의 '>' 비교와 동일)
+    best = int(np.argmax(means))
+    if means.flat[best] == -np.inf:
+        return prev_center
+
+    br, bc = divmod(best, grid_cols)
+    center_x = (int(xs[bc]) + int(xs[bc + 1])) // 2
+    center_y = (int(ys[br]) + int(ys[br + 1])) // 2
+    best_center = (center_x, center_y)
+
+    # 이전 중심과 위치 smoothing (좌표 튐 방지)
+    if prev_center is not None:
+        px, py = prev_center
+        cx, cy = best_center
+        alpha_pos = 0.5  # 0.3~0.6 사이 조절 가능
+        sm_x = int(alpha_pos * cx + (1 - alpha_pos) * px)
+        sm_y = int(alpha_pos * cy + (1 - alpha_pos) * py)
+        return (sm_x, sm_y)
+    else:
+        return best_center
+
+
+def refine_face_center(raw_frame, center, search_radius=REFINE_RADIUS, cell=REFINE_CELL,
+                       integrals=None, alpha_pos=0.5):
+    """
+    find_face_center 의 감지 사이 프레임용 가벼운 버전 (YOLO 박스 없이 이전 중심만으로).
+    - 이전 중심 주변 ±search_radius 안의 모든 위치에서 cell x cell 칸 평균 온도 계산
+      (summed-area table 이라 위치 수만큼 4번 더하기/빼기)
+    - 가장 뜨거운 칸이 지금 위치보다 뜨거울 때만 그쪽으로 이동 (평평한 곳에서 떠돌지 않게)
+    - find_face_center 처럼 이전 중심과 alpha_pos 로 섞음 (남은 거리의 alpha_pos, 최소 1픽셀)
+    center 가 None 이거나 찾을 칸이 없으면 center 그대로 반환.
+    """
+    if center is None:
+        return None
+
+    cx, cy = int(center[0]), int(center[1])
+    half = cell // 2
+
+    # 후보 중심 (칸이 프레임 밖으로 나가지 않는 범위)
+    xs = np.arange(max(half, cx - search_radius),
+                   min(WIDTH - cell + half, cx + search_radius) + 1)
+    ys = np.arange(max(half, cy - search_radius),
+                   min(HEIGHT - cell + half, cy + search_radius) + 1)
+    if xs.size == 0 or ys.size == 0:
+        return center
+
+    if integrals is None:
+        integrals = frame_integrals(raw_frame)
+    sums, counts = integrals
+
+    cy1 = (ys - half)[:, None]
+    cx1 = (xs - half)[None, :]
+    cell_sum = _rect_sum(sums, cy1, cy1 + cell, cx1, cx1 + cell)
+    cell_cnt = _rect_sum(counts, cy1, cy1 + cell, cx1, cx1 + cell)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(cell_cnt > 0, cell_sum / cell_cnt, -np.inf)
+
+    best = int(np.argmax(means))
+    if means.flat[best] == -np.inf:
+        return center
+
+    br, bc = divmod(best, xs.size)
+    bx, by = int(xs[bc]), int(ys[br])
+
+    # 지금 위치 칸이 후보 안에 있고 최대값과 같으면 움직이지 않음
+    if xs[0] <= cx <= xs[-1] and ys[0] <= cy <= ys[-1]:
+        if means[cy - ys[0], cx - xs[0]] >= means.flat[best]:
+            return (cx, cy)
+
+    # int() 버림이면 1픽셀 차이는 한쪽 방향으로만 움직이므로 올림으로 최소 1픽셀씩 이동
+    return (cx + _step_toward(bx - cx, alpha_pos), cy + _step_toward(by - cy, alpha_pos))
+
+
+def _step_toward(delta, alpha):
+    step = int(np.ceil(abs(delta) * alpha))
+    return step if delta > 0 else -step
+
+
+def _hot_raw_from_valid(valid, hot_ratio):
+    """유효 픽셀(1D)에서 상위 hot_ratio 픽셀 → median 이상만 평균한 raw 값"""
+    n = valid.size
+    k = max(1, int(n * hot_ratio))
+
+    # 전체 정렬 대신 상위 k 개만 선택 (순서는 상관없음)
+    hottest_vals = np.partition(valid, n - k)[n - k:]
+
+    # median 기반 안정화
+    if k > 6:
+        med = np.median(hottest_vals)
+        hottest_vals = hottest_vals[hottest_vals >= med]
+
+    return float(hottest_vals.mean())
+
+
+def face_raw_from_center(raw_frame, center, radius=10, hot_ratio=0.08):
+    """
+    얼굴 중심 좌표 주변 작은 ROI에서 얼굴 raw 값 계산 (섭씨 변환/보정 전).
+    - 중심 주변 (radius) 영역 추출
+    - 0 초과 픽셀만 사용
+    - 상위 hot_ratio 픽셀만 선택 (np.partition, 전체 정렬 X)
+    - median 기반 필터 후 평균
+    """
+    if center is None:
+        return None
+
+    cx, cy = center
+
+    x_min = max(0, cx - radius)
+    x_max = min(WIDTH, cx + radius + 1)
+    y_min = max(0, cy - radius)
+    y_max = min(HEIGHT, cy + radius + 1)
+
+    roi = raw_frame[y_min:y_max, x_min:x_max]
+    if roi.size == 0:
+        return None
+
+    valid = roi[roi > 0]
+    if valid.size == 0:
+        return None
+
+    return _hot_raw_from_valid(valid, hot_ratio)
+
+
+def face_raw_from_centers(raw_frame, centers, radius=10, hot_ratios=0.08):
+    """
+    face_raw_from_center 의 여러 사람 한 번에 버전.
+    centers   : [(cx, cy) 또는 None, ...]
+    hot_ratios: 숫자 하나 또는 사람별 리스트
+    반환      : 사람별 raw 값 리스트 (계산 불가면 None) - face_raw_from_center 와 같은 값
+
+    모든 ROI 를 (P, 2r+1, 2r+1) 로 쌓아서 (프레임 밖은 0)
+    정렬/상위 k/median 필터/평균을 한 번의 배열 연산으로 처리한다.
+    (채운 0 은 원래 코드의 '0 초과 픽셀만' 조건에서 어차피 빠지므로 경계 clip 과 같음)
+    """
+    n_people = len(centers)
+    results = [None] * n_people
+    if n_people == 0:
+        return results
+
+    ratios = np.broadcast_to(np.asarray(hot_ratios, dtype=np.float64), (n_people,))
+
+    # 프레임 안에 있는 중심만 batch 로, 나머지(None / 프레임 밖)는 단일 버전으로
+    idx = []
+    for i, center in enumerate(centers):
+        if center is None:
+            continue
+        cx, cy = center
+        if 0 <= cx < WIDTH and 0 <= cy < HEIGHT:
+            idx.append(i)
+        else:
+            results[i] = face_raw_from_center(raw_frame, center, radius, float(ratios[i]))
+    if len(idx) < BATCH_MIN_PEOPLE:
+        # 사람이 적으면 배열 연산 고정 비용이 더 커서 한 명씩 처리
+        for i in idx:
+            results[i] = face_raw_from_center(raw_frame, centers[i], radius, float(ratios[i]))
+        return results
+
+    size = 2 * radius + 1
+    rois = np.zeros((len(idx), size, size), dtype=raw_frame.dtype)
+    for j, i in enumerate(idx):
+        cx, cy = centers[i]
+        x_min = max(0, cx - radius)
+        x_max = min(WIDTH, cx + radius + 1)
+        y_min = max(0, cy - radius)
+        y_max = min(HEIGHT, cy + radius + 1)
+        oy, ox = y_min - (cy - radius), x_min - (cx - radius)
+        rois[j, oy:oy + y_max - y_min, ox:ox + x_max - x_min] = raw_frame[y_min:y_max, x_min:x_max]
+    rois = rois.reshape(len(idx), size * size)
+
+    # 0(무효)은 정렬하면 앞으로 모이므로 상위 k 는 항상 뒤쪽 유효 픽셀
+    rois = np.sort(rois, axis=1)
+    n_valid = np.count_nonzero(rois, axis=1)
+    k = np.maximum(1, (n_valid * ratios[idx]).astype(np.int64))
+
+    n_cols = size * size
+    start = n_cols - k                      # 상위 k 시작 위치
+
+    # 상위 k 의 median (정렬돼 있으므로 가운데 값 / 두 값 평균)
+    rows = np.arange(len(idx))
+    lo = start + (k - 1) // 2
+    hi = start + k // 2
+    med = (rois[rows, lo].astype(np.float64) + rois[rows, hi]) * 0.5
+
+    col = np.arange(n_cols)[None, :]
+    keep = col >= start[:, None]
+    keep &= ~((k[:, None] > 6) & (rois < med[:, None]))
+
+    sums = np.where(keep, rois, 0).sum(axis=1, dtype=np.float64)
+    counts = keep.sum(axis=1)
+
+    for j, i in enumerate(idx):
+        if n_valid[j] == 0:
+            continue
+        results[i] = float(sums[j] / counts[j])
+
+    return results
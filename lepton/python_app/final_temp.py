@@ -1,18 +1,36 @@
+import argparse
 import time
 import cv2
 import numpy as np
-from ultralytics import YOLO
 
-from read_frame import get_frame  # rgb_frame, raw_frame
-
-# YOLO person 모델
-model = YOLO("yolov8n.pt")
+from read_frame import get_frame, wait_frame, get_source  # rgb_frame, raw_frame
+from temp_lut import raw_to_celsius
+from agc import Agc
+from face_temp import (find_face_center, refine_face_center, frame_integrals,
+                       face_raw_from_center, face_raw_from_centers)
+from detect_worker import Detector, add_detector_arg, print_startup_time
+from tracker import Tracker
+from results import add_output_args, open_publisher, person
+from latency import add_latency_arg, open_monitor, DETECT_START, DETECT_END, TEMP, RENDER
+from pan_tracker import add_pan_arg, open_pan_tracker, select_target
 
 WIDTH = 160
 HEIGHT = 120
 
-DETECTION_INTERVAL = 1.0
-last_det_time = 0.0
+# 감지 사이 프레임은 refine_face_center 로 얼굴 중심/온도를 매 프레임 갱신하므로 YOLO 는 2초에 한 번
+DETECTION_INTERVAL = 2.0
+
+# 사람 검출기 기본값 (--detector 로 변경)
+#   "yolo": YOLO 를 worker 스레드에서 DETECTION_INTERVAL 마다 (모델 로딩도 worker 에서)
+#   "blob": thermal_detect.ThermalDetector (피부 온도 구간 connected components) 를 매 프레임
+#           프레임당 수백 µs 라서 YOLO 돌릴 여유가 없는 Pi 에서도 센서 속도로 동작
+#   "onnx": yolov8n ONNX 를 cv2.dnn / onnxruntime 으로 (onnx_detect, ultralytics 불필요)
+#   "none": 검출 없이 마우스 온도만
+DETECTOR = "yolo"
+
+# True: 새 프레임이 올 때까지 잠들어 있음 (busy polling X)
+# False: 예전처럼 get_frame() 을 쉬지 않고 반복
+WAIT_FOR_FRAME = True
 
 # 보정 상수 (radiometric 온도에서 몇 도를 뺄지)
 # 예: radiometric 36.8°C일 때 여기서 0.8 빼면 36.0°C 출력
@@ -28,28 +46,13 @@ def mouse_event(event, x, y, flags, param):
         mouse_x, mouse_y = x, y
 
 
-def raw_to_celsius(raw_val: float) -> float:
-    """Lepton radiometric: raw/100 - 273.15"""
-    return raw_val * 0.01 - 273.15
+# 화면용 AGC (범위를 프레임마다 EMA 로 따라가서 밝기 깜빡임 감소)
+agc = Agc()
 
 
 def stretch_raw_to_grayscale(raw_frame):
-    """RAW16 → 자동 대비조정 8bit grayscale"""
-    valid = raw_frame[raw_frame > 0]
-
-    if valid.size == 0:
-        return np.zeros_like(raw_frame, dtype=np.uint8)
-
-    raw_min = np.min(valid)
-    raw_max = np.max(valid)
-
-    if raw_max - raw_min < 10:
-        raw_max = raw_min + 10
-
-    stretched = (raw_frame - raw_min) * (255.0 / (raw_max - raw_min))
-    stretched = np.clip(stretched, 0, 255)
-
-    return stretched.astype(np.uint8)
+    """RAW16 → 자동 대비조정 8bit grayscale (agc.Agc, 결과 버퍼는 매 프레임 재사용)"""
+    return agc.apply(raw_frame)
 
 
 def distance(p1, p2):
@@ -58,314 +61,263 @@ def distance(p1, p2):
     return ((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2) ** 0.5
 
 
-def iou(boxA, boxB):
-    """박스 간 IoU (사람 매칭용)"""
-    xA = max(boxA[0], boxB[0])
-    yA = max(boxA[1], boxB[1])
-    xB = min(boxA[2], boxB[2])
-    yB = min(boxA[3], boxB[3])
+def compute_face_temp_from_center(raw_frame, center, radius=10, hot_ratio=0.08):
+    """
+    얼굴 중심 좌표 주변 작은 ROI에서 온도 계산.
+    - 중심 주변 (radius) 영역의 상위 hot_ratio 픽셀 → median 필터 → 평균 (face_temp.py)
+    - 섭씨 변환
+    - 환경에 맞게 조정한 피부 보정(temp + SKIN_OFFSET) 적용
+    """
+    avg_raw = face_raw_from_center(raw_frame, center, radius=radius, hot_ratio=hot_ratio)
+    if avg_raw is None:
+        return None
 
-    interW = max(0, xB - xA)
-    interH = max(0, yB - yA)
-    interArea = interW * interH
+    temp_c = raw_to_celsius(avg_raw)  # radiometric skin
 
-    if interArea == 0:
-        return 0.0
+    # ⭐ 환경 맞춘 피부 보정: radiometric + SKIN_OFFSET
+    skin_temp = temp_c + SKIN_OFFSET
+
+    return skin_temp
 
-    boxAArea = (boxA[2] - boxA[0]) * (boxA[3] - boxA[1])
-    boxBArea = (boxB[2] - boxB[0]) * (boxB[3] - boxB[1])
 
-    return interArea / (boxAArea + boxBArea - interArea + 1e-6)
+def compute_face_temps_from_centers(raw_frame, centers, radius=10, hot_ratios=0.08):
+    """compute_face_temp_from_center 의 여러 사람 한 번에 버전 (사람별 온도 리스트, 없으면 None)"""
+    avg_raws = face_raw_from_centers(raw_frame, centers, radius=radius, hot_ratios=hot_ratios)
+    return [None if v is None else raw_to_celsius(v) + SKIN_OFFSET for v in avg_raws]
 
 
-def find_face_center(raw_frame, box, prev_center=None,
-                     grid_rows=6, grid_cols=4):
+def update_track_temps(raw_frame, tracks, prev_centers, centers):
     """
-    YOLO 박스 안에서 '가장 뜨거운 영역'을 찾아 얼굴 중심 추정.
-    - 박스 세로 10%~80% 구간만 사용 (다리 제외)
-    - grid로 나눠서 각 칸 평균 온도 계산
-    - 평균 온도가 가장 높은 칸의 중심을 얼굴 중심으로 사용
-    - 이전 중심(prev_center)과 살짝 섞어서 위치 튐 줄임
+    track 별 얼굴 온도를 centers 에서 계산해서 track.temp 에 smoothing (감지 프레임 / 사이 프레임 공용).
+    얼굴 중심이 많이 움직였으면 hot_ratio 를 줄여서 더 보수적으로.
     """
-    x1, y1, x2, y2 = box
-
-    x1 = max(0, min(WIDTH - 1, x1))
-    x2 = max(0, min(WIDTH - 1, x2))
-    y1 = max(0, min(HEIGHT - 1, y1))
-    y2 = max(0, min(HEIGHT - 1, y2))
-
-    if x2 <= x1 or y2 <= y1:
-        return prev_center
-
-    H = y2 - y1
-
-    # 검색 영역: 위 10% ~ 아래 80% (머리~상체 위주)
-    sy1 = int(y1 + H * 0.10)
-    sy2 = int(y1 + H * 0.80)
-    sx1 = x1
-    sx2 = x2
-
-    sy1 = max(0, min(HEIGHT - 1, sy1))
-    sy2 = max(0, min(HEIGHT, sy2))
-    sx1 = max(0, min(WIDTH - 1, sx1))
-    sx2 = max(0, min(WIDTH, sx2))
-
-    if sy2 <= sy1 or sx2 <= sx1:
-        return prev_center
-
-    cell_h = (sy2 - sy1) / grid_rows
-    cell_w = (sx2 - sx1) / grid_cols
-
-    best_mean = None
-    best_center = None
-
-    for r in range(grid_rows):
-        cy1 = int(sy1 + r * cell_h)
-        cy2 = int(sy1 + (r + 1) * cell_h)
-        for c in range(grid_cols):
-            cx1 = int(sx1 + c * cell_w)
-            cx2 = int(sx1 + (c + 1) * cell_w)
-
-            patch = raw_frame[cy1:cy2, cx1:cx2]
-            if patch.size == 0:
-                continue
-
-            valid = patch[patch > 0]
-            if valid.size == 0:
-                continue
-
-            mean_val = float(valid.mean())
-            if (best_mean is None) or (mean_val > best_mean):
-                best_mean = mean_val
-                center_x = (cx1 + cx2) // 2
-                center_y = (cy1 + cy2) // 2
-                best_center = (center_x, center_y)
-
-    if best_center is None:
-        return prev_center
-
-    # 이전 중심과 위치 smoothing (좌표 튐 방지)
-    if prev_center is not None:
-        px, py = prev_center
-        cx, cy = best_center
-        alpha_pos = 0.5  # 0.3~0.6 사이 조절 가능
-        sm_x = int(alpha_pos * cx + (1 - alpha_pos) * px)
-        sm_y = int(alpha_pos * cy + (1 - alpha_pos) * py)
-        return (sm_x, sm_y)
-    else:
-        return best_center
+    hot_ratios = [0.05 if distance(prev, center) > 5 else 0.08
+                  for prev, center in zip(prev_centers, centers)]
+
+    # 얼굴 온도는 모든 사람을 한 번에 계산
+    frame_temps = compute_face_temps_from_centers(raw_frame, centers, radius=10,
+                                                  hot_ratios=hot_ratios)
+
+    for track, frame_temp in zip(tracks, frame_temps):
+        # 프레임 기반 smoothing
+        if frame_temp is not None:
+            alpha = 0.3  # 반응성/안정성 타협
+            if track.temp is None:
+                track.temp = frame_temp
+            else:
+                track.temp = alpha * frame_temp + (1 - alpha) * track.temp
 
 
-def compute_face_temp_from_center(raw_frame, center, radius=10, hot_ratio=0.08):
-    """
-    얼굴 중심 좌표 주변 작은 ROI에서 온도 계산.
-    - 중심 주변 (radius) 영역 추출
-    - 0 초과 픽셀만 사용
-    - 상위 hot_ratio 픽셀만 선택
-    - median 기반 필터 후 평균 → 섭씨 변환
-    - 환경에 맞게 조정한 피부 보정(temp + SKIN_OFFSET) 적용
-    """
-    if center is None:
-        return None
+def draw(window_name, raw_8bit, raw_frame, people):
+    """메인 화면 (사람 박스 / 얼굴 중심 / 라벨 / 마우스 온도) + 사람별 온도 리스트 창"""
+    vis = cv2.cvtColor(raw_8bit, cv2.COLOR_GRAY2BGR)
 
-    cx, cy = center
+    # 메인 화면: 각 사람 박스/라벨
+    for idx, track in enumerate(people, start=1):
+        x1, y1, x2, y2 = track.int_box()
+        center = track.shifted_center()
+        temp = track.temp
 
-    x_min = max(0, cx - radius)
-    x_max = min(WIDTH, cx + radius + 1)
-    y_min = max(0, cy - radius)
-    y_max = min(HEIGHT, cy + radius + 1)
+        # 사람 박스
+        cv2.rectangle(vis, (x1, y1), (x2, y2), (255, 255, 255), 1)
 
-    roi = raw_frame[y_min:y_max, x_min:x_max]
-    if roi.size == 0:
-        return None
+        # 얼굴 중심
+        if center is not None:
+            cv2.circle(vis, center, 3, (255, 255, 255), -1)
 
-    valid = roi[roi > 0]
-    if valid.size == 0:
-        return None
+        # 박스 위에 PersonX: YY.YC 표시
+        label_y = max(10, y1 - 5)
+        if temp is not None:
+            text = f"Person{idx}: {temp:.2f}C"
+        else:
+            text = f"Person{idx}: --.-C"
+
+        cv2.putText(vis, text,
+                    (x1, label_y),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.45, (255, 255, 255), 1)
+
+    # 오른쪽 온도 리스트 창
+    temp_window = np.zeros((350, 260, 3), dtype=np.uint8)
+    if not people:
+        cv2.putText(temp_window, "No person detected",
+                    (5, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.6, (255, 255, 255), 1)
+    else:
+        for idx, track in enumerate(people, start=1):
+            temp = track.temp
+            if temp is not None:
+                line = f"Person{idx}: {temp:.2f}C"
+            else:
+                line = f"Person{idx}: --.-C"
+            y = 25 + (idx - 1) * 22
+            cv2.putText(temp_window, line,
+                        (5, y),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.6, (255, 255, 255), 1)
 
-    flat_sorted = np.sort(valid)
-    k = max(1, int(len(flat_sorted) * hot_ratio))
-    hottest_vals = flat_sorted[-k:]
+    cv2.imshow("People Temperatures", temp_window)
 
-    # median 기반 안정화
-    if len(hottest_vals) > 6:
-        med = np.median(hottest_vals)
-        hottest_vals = hottest_vals[hottest_vals >= med]
+    # 마우스 온도 (보정 포함 디버그)
+    if 0 <= mouse_x < WIDTH and 0 <= mouse_y < HEIGHT:
+        raw_val = int(raw_frame[mouse_y, mouse_x])
+        if raw_val > 0:
+            t_radiometric = raw_to_celsius(raw_val)
+            t_skin = t_radiometric + SKIN_OFFSET
+            cv2.putText(vis, f"{t_skin:.2f}C",
+                        (mouse_x + 6, mouse_y - 6),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.4, (255, 255, 255), 1)
+            cv2.circle(vis, (mouse_x, mouse_y), 2, (255, 255, 255), -1)
 
-    avg_raw = float(hottest_vals.mean())
-    temp_c = raw_to_celsius(avg_raw)  # radiometric skin
+    cv2.imshow(window_name, vis)
 
-    # ⭐ 환경 맞춘 피부 보정: radiometric + SKIN_OFFSET
-    skin_temp = temp_c + SKIN_OFFSET
 
-    return skin_temp
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Thermal multi-person face temperature")
+    add_detector_arg(parser, default=DETECTOR)
+    add_output_args(parser)
+    add_latency_arg(parser)
+    add_pan_arg(parser)
+    return parser.parse_args(argv)
 
 
-def main():
-    global last_det_time, mouse_x, mouse_y
+def main(argv=None):
+    global mouse_x, mouse_y
 
-    window_name = "Thermal YOLO (Multi-Person Calibrated)"
-    cv2.namedWindow(window_name)
-    cv2.namedWindow("People Temperatures")
-    cv2.setMouseCallback(window_name, mouse_event)
-
-    # id → { "box":(x1,y1,x2,y2), "center":(cx,cy), "temp":float }
-    people = {}
-    next_person_id = 1
-
-    while True:
-        rgb_frame, raw_frame = get_frame()
-
-        raw_8bit = stretch_raw_to_grayscale(raw_frame)
-        gray_3ch = cv2.cvtColor(raw_8bit, cv2.COLOR_GRAY2RGB)
-
-        now = time.time()
-
-        # YOLO 감지 주기적으로 수행
-        if now - last_det_time > DETECTION_INTERVAL:
-
-            results = model(gray_3ch, imgsz=160, conf=0.25)
-
-            detected_boxes = []
-
-            if len(results) > 0 and results[0].boxes is not None:
-                boxes = results[0].boxes
-                xyxy = boxes.xyxy.cpu().numpy()
-                cls = boxes.cls.cpu().numpy()
-
-                ids = np.where(cls == 0)[0]  # person class
-                for i in ids:
-                    x1, y1, x2, y2 = map(int, xyxy[i])
-                    detected_boxes.append((x1, y1, x2, y2))
-
-            # 이전 people과 IoU 기반 매칭해서 id 유지
-            new_people = {}
-
-            for box in detected_boxes:
-                best_id = None
-                best_iou = 0.0
-
-                for pid, st in people.items():
-                    if st["box"] is None:
-                        continue
-                    v = iou(box, st["box"])
-                    if v > 0.1 and v > best_iou:
-                        best_iou = v
-                        best_id = pid
-
-                if best_id is None:
-                    pid = next_person_id
-                    next_person_id += 1
-                    prev_center = None
-                    prev_temp = None
-                else:
-                    pid = best_id
-                    prev_center = people[pid]["center"]
-                    prev_temp = people[pid]["temp"]
-
-                # 얼굴 중심 찾기
-                center = find_face_center(raw_frame, box, prev_center=prev_center)
-
-                # 움직임 크기에 따라 hot_ratio 조절 (많이 움직이면 더 보수적으로)
-                move = distance(prev_center, center)
-                hot_ratio = 0.05 if move > 5 else 0.08
-
-                frame_temp = compute_face_temp_from_center(
-                    raw_frame, center,
-                    radius=10,
-                    hot_ratio=hot_ratio
-                )
-
-                # 프레임 기반 smoothing
-                smooth = prev_temp
-                if frame_temp is not None:
-                    alpha = 0.3  # 반응성/안정성 타협
-                    if smooth is None:
-                        smooth = frame_temp
-                    else:
-                        smooth = alpha * frame_temp + (1 - alpha) * smooth
-
-                new_people[pid] = {
-                    "box": box,
-                    "center": center,
-                    "temp": smooth
-                }
-
-            people = new_people
-            last_det_time = now
-
-        # 시각화
-        vis = cv2.cvtColor(raw_8bit, cv2.COLOR_GRAY2BGR)
-
-        sorted_ids = sorted(people.keys())
-
-        # 메인 화면: 각 사람 박스/라벨
-        for idx, pid in enumerate(sorted_ids, start=1):
-            st = people[pid]
-            x1, y1, x2, y2 = st["box"]
-            center = st["center"]
-            temp = st["temp"]
-
-            # 사람 박스
-            cv2.rectangle(vis, (x1, y1), (x2, y2), (255, 255, 255), 1)
-
-            # 얼굴 중심
-            if center is not None:
-                cv2.circle(vis, center, 3, (255, 255, 255), -1)
-
-            # 박스 위에 PersonX: YY.YC 표시
-            label_y = max(10, y1 - 5)
-            if temp is not None:
-                text = f"Person{idx}: {temp:.2f}C"
-            else:
-                text = f"Person{idx}: --.-C"
+    args = parse_args(argv)
 
-            cv2.putText(vis, text,
-                        (x1, label_y),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        0.45, (255, 255, 255), 1)
+    # --headless: 창 / 그리기 없이 결과만 publisher 로 (화면은 result_viewer.py 가 따로)
+    publisher = open_publisher(args)
 
-        # 오른쪽 온도 리스트 창
-        temp_window = np.zeros((350, 260, 3), dtype=np.uint8)
-        if not sorted_ids:
-            cv2.putText(temp_window, "No person detected",
-                        (5, 30),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        0.6, (255, 255, 255), 1)
-        else:
-            for idx, pid in enumerate(sorted_ids, start=1):
-                st = people[pid]
-                temp = st["temp"]
-                if temp is not None:
-                    line = f"Person{idx}: {temp:.2f}C"
-                else:
-                    line = f"Person{idx}: --.-C"
-                y = 25 + (idx - 1) * 22
-                cv2.putText(temp_window, line,
-                            (5, y),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.6, (255, 255, 255), 1)
-
-        cv2.imshow("People Temperatures", temp_window)
-
-        # 마우스 온도 (보정 포함 디버그)
-        if 0 <= mouse_x < WIDTH and 0 <= mouse_y < HEIGHT:
-            raw_val = int(raw_frame[mouse_y, mouse_x])
-            if raw_val > 0:
-                t_radiometric = raw_to_celsius(raw_val)
-                t_skin = t_radiometric + SKIN_OFFSET
-                cv2.putText(vis, f"{t_skin:.2f}C",
-                            (mouse_x + 6, mouse_y - 6),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.4, (255, 255, 255), 1)
-                cv2.circle(vis, (mouse_x, mouse_y), 2, (255, 255, 255), -1)
-
-        cv2.imshow(window_name, vis)
-
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-
-    cv2.destroyAllWindows()
+    # --latency: 단계별 지연 / dropped frame 통계를 주기적으로 파일에 (python latency.py 로 보기)
+    latency = open_monitor(args)
+
+    # --pan: 대상 얼굴이 화면 가운데 오도록 서보 (서보는 자기 스레드에서 움직임)
+    pan = open_pan_tracker(args)
+
+    window_name = "Thermal YOLO (Multi-Person Calibrated)"
+    if not args.headless:
+        cv2.namedWindow(window_name)
+        cv2.namedWindow("People Temperatures")
+        cv2.setMouseCallback(window_name, mouse_event)
+
+    # 사람별 Track (box / center / temp), 감지를 몇 번 놓쳐도 id 와 온도 smoothing 유지
+    tracker = Tracker()
+
+    # yolo 는 worker 스레드에서 로딩하므로 모델을 기다리지 않고 바로 화면 루프 시작
+    detector = Detector(args.detector, interval=DETECTION_INTERVAL)
+    frame_seq = 0
+
+    # headless 에서 blob / onnx / none 이면 8bit 영상을 쓸 곳이 없으므로 AGC 도 건너뜀
+    need_image = not args.headless or detector.takes == "image"
+    raw_8bit = gray_3ch = None
+
+    # seq / 캡처 시각을 볼 frame source (wait_frame 이 읽는 전역 source)
+    source = get_source()
+
+    try:
+        while True:
+            if WAIT_FOR_FRAME:
+                frame = wait_frame(timeout=0.5)
+                if frame is None:
+                    # 프레임이 안 와도 창 이벤트는 처리
+                    if not args.headless and cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+                    continue
+                rgb_frame, raw_frame = frame
+            else:
+                rgb_frame, raw_frame = get_frame()
+
+            if latency is not None:
+                latency.begin(source.raw_seq, source.raw_timestamp_ns)
+
+            if need_image:
+                raw_8bit = stretch_raw_to_grayscale(raw_frame)
+                gray_3ch = cv2.cvtColor(raw_8bit, cv2.COLOR_GRAY2RGB)
+
+            now = time.time()
+
+            frame_seq += 1
+
+            if frame_seq == 1:
+                print_startup_time(detector)
+
+            # 얼굴 중심 계산용 summed-area table 은 프레임당 한 번만
+            integrals = frame_integrals(raw_frame)
+
+            # yolo: worker 스레드에서 (대기 중인 이전 프레임은 버리고 가장 최근 것만), 결과가 왔을 때만
+            # blob: 충분히 빨라서 매 프레임 바로 실행
+            result = detector.step(frame_seq, now, raw_frame, gray_3ch)
+            if result is not None:
+                if latency is not None:
+                    latency.mark(DETECT_START, detector.last_detect_ns[0])
+                    latency.mark(DETECT_END, detector.last_detect_ns[1])
+                # 새 감지 결과: IoU 행렬 + 최적 할당으로 이전 사람과 매칭 (boxes[i] ↔ tracks[i])
+                det_seq, detected_boxes = result
+                tracks = tracker.update(detected_boxes, now)
+                prev_centers = [track.center for track in tracks]
+
+                # 박스 안에서 얼굴 중심 찾기
+                centers = [find_face_center(raw_frame, box, prev_center=prev,
+                                            integrals=integrals)
+                           for box, prev in zip(detected_boxes, prev_centers)]
+                for track, center in zip(tracks, centers):
+                    track.center = center
+            else:
+                # 감지 사이 프레임: 박스는 속도로 예측하고,
+                # 얼굴 중심은 예측 위치 주변의 가장 뜨거운 곳으로 다시 맞춤 (박스도 같이 이동)
+                tracker.predict(now)
+                tracks = [track for track in tracker.tracks() if track.center is not None]
+                prev_centers = [track.shifted_center() for track in tracks]
+                centers = [refine_face_center(raw_frame, prev, integrals=integrals)
+                           for prev in prev_centers]
+                for track, center in zip(tracks, centers):
+                    track.refine(center)
+
+            # 온도는 매 프레임 갱신 (화면 루프는 감지를 기다리지 않음)
+            update_track_temps(raw_frame, tracks, prev_centers, centers)
+            if latency is not None:
+                latency.mark(TEMP)
+
+            people = tracker.tracks()
+
+            if pan is not None:
+                # 가장 뜨거운 사람 (이미 따라가는 사람은 더 뜨거운 사람이 확실할 때만 교체)
+                target = select_target(people, pan.target_id)
+                pan.target_id = None if target is None else target.id
+                pan.update(None if target is None else target.shifted_center(), source.raw_timestamp_ns)
+
+            if publisher is not None:
+                publisher.publish(source.raw_seq, source.raw_timestamp_ns,
+                                  [person(track.id, track.int_box(), track.shifted_center(), track.temp)
+                                   for track in people])
+
+            quit_key = False
+            if not args.headless:
+                draw(window_name, raw_8bit, raw_frame, people)
+                quit_key = cv2.waitKey(1) & 0xFF == ord('q')
+
+            if latency is not None:
+                # 화면 갱신(waitKey) / 결과 publish 까지 끝난 시각
+                latency.mark(RENDER)
+                latency.end()
+
+            if quit_key:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detector.stop()
+        if publisher is not None:
+            publisher.close()
+        if latency is not None:
+            latency.close()
+        if pan is not None:
+            pan.stop()
+        if not args.headless:
+            cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
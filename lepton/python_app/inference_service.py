@@ -0,0 +1,302 @@
+# inference_service.py  (여러 카메라 프레임을 모아 한 번의 forward 로 사람 검출하는 공용 서비스)
+#
+# Lepton 여러 대를 한 Pi 에서 돌릴 때 스크립트마다 YOLO 를 따로 올리면 모델 메모리도
+# 추론 고정 비용도 카메라 수만큼 든다. 이 서비스는 모델을 한 번만 올리고
+# 카메라별로 들어온 가장 최근 프레임을 batch 로 묶어 추론한 뒤 카메라 / seq 별로 돌려준다.
+#
+#   service = InferenceService("onnx", max_batch=4).start()
+#   service.submit("cam0", raw_frame, seq)       # 카메라별 1칸 대기열 (처리 전 이전 프레임은 버림)
+#   result = service.poll("cam0")                # 새 결과면 (seq, boxes), 없으면 None
+#   service.stop()
+#
+#   명령줄 (카메라마다 frame source 하나, 결과는 stdout 에 한 줄씩):
+#     python inference_service.py /dev/shm/lepton_raw /dev/shm/lepton_raw_1
+#     python inference_service.py --detector yolo /dev/spidev0.0 /dev/spidev0.1
+#     python inference_service.py a.lrec b.lrcz                    # 녹화 파일 (최대 속도)
+#
+# - 입력은 카메라별 RAW16. AGC 는 카메라마다 따로 (밝기 smoothing 상태가 섞이지 않게)
+# - onnx: OnnxPersonDetector.detect_gray_batch (batch 가변 모델이면 (B, 3, 128, 160) 한 번)
+#   yolo: ultralytics model([img, ...]) 한 번
+# - 모델 로딩도 서비스 스레드에서 (DetectionWorker 와 같은 방식)
+import argparse
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT, WAIT_POLL_INTERVAL, FrameReader
+from agc import Agc
+
+# 한 번에 묶을 최대 장 수 (onnx blob 크기)
+MAX_BATCH = 4
+
+# 첫 프레임이 들어온 뒤 다른 카메라 프레임을 더 기다리는 시간 (초)
+# 카메라들은 서로 동기화돼 있지 않아서 (각각 9Hz) 조금 모아야 batch 가 찬다
+GATHER_TIME = 0.02
+
+
+def load_onnx_batch(max_batch):
+    from onnx_detect import OnnxPersonDetector
+    det = OnnxPersonDetector(max_batch=max_batch)
+    return lambda grays: [boxes for boxes, _ in det.detect_gray_batch(grays)]
+
+
+def load_yolo_batch(max_batch):
+    from detect_worker import open_yolo_model, yolo_person_boxes_batch
+    model = open_yolo_model()
+
+    def detect(grays):
+        images = [cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB) for gray in grays]
+        return yolo_person_boxes_batch(model, images)
+    return detect
+
+
+# name → load_fn(max_batch) → detect(grays: [(H, W) uint8, ...]) → [boxes, ...]
+BATCH_DETECTORS = {
+    "onnx": load_onnx_batch,
+    "yolo": load_yolo_batch,
+}
+
+
+class _Camera:
+    def __init__(self):
+        self.raw = np.empty((HEIGHT, WIDTH), dtype=np.uint16)
+        self.gray = np.empty((HEIGHT, WIDTH), dtype=np.uint8)
+        self.agc = Agc()
+        self.pending_seq = None      # 처리 대기 중인 프레임 seq (없으면 None)
+        self.submit_time = 0.0
+        self.result = None           # 아직 poll() 안 된 (seq, boxes)
+        self.latest = None
+        self.frames = 0
+        self.dropped = 0             # 처리 전에 더 새 프레임으로 교체된 횟수
+
+
+class InferenceService:
+    """
+    카메라별 최신 프레임을 모아서 batch 추론하는 스레드.
+
+    - submit(camera, raw_frame, seq): RAW 를 카메라 버퍼에 복사. 아직 처리 안 된 이전 프레임은 버림
+    - poll(camera)                  : 새 결과가 있으면 (seq, boxes) 를 한 번만 반환
+    - stats()                       : batch 수, 평균 batch 크기, 카메라별 처리/버린 프레임 수
+
+    카메라 id 는 hashable 이면 아무거나 (처음 submit 할 때 등록).
+    """
+
+    def __init__(self, detector="onnx", max_batch=MAX_BATCH, gather_time=GATHER_TIME):
+        if detector not in BATCH_DETECTORS:
+            raise ValueError(f"unknown batch detector: {detector} (choices: {', '.join(BATCH_DETECTORS)})")
+        self.detector = detector
+        self.max_batch = max_batch
+        self.gather_time = gather_time
+
+        self._cond = threading.Condition()
+        self._cameras = {}
+        self._running = False
+        self._thread = None
+        self._detect = None
+
+        self.batches = 0
+        self.frames = 0
+        self.last_infer_time = 0.0
+        self.load_time = None
+        self.error = None            # 로딩 / 추론 실패 시 예외 (서비스 스레드는 종료)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            # 아직 로딩 중이면 기다리지 않음 (daemon 스레드)
+            if self._detect is not None:
+                self._thread.join()
+            self._thread = None
+
+    def ready(self):
+        return self._detect is not None and self.error is None
+
+    def submit(self, camera, raw_frame, seq):
+        if self.error is not None:
+            return
+        with self._cond:
+            cam = self._cameras.get(camera)
+            if cam is None:
+                cam = self._cameras[camera] = _Camera()
+            if cam.pending_seq is not None:
+                cam.dropped += 1
+            else:
+                cam.submit_time = time.monotonic()
+            np.copyto(cam.raw, raw_frame)
+            cam.pending_seq = seq
+            self._cond.notify()
+
+    def poll(self, camera):
+        with self._cond:
+            cam = self._cameras.get(camera)
+            if cam is None:
+                return None
+            result = cam.result
+            cam.result = None
+        return result
+
+    def stats(self):
+        with self._cond:
+            cams = {name: {"frames": cam.frames, "dropped": cam.dropped}
+                    for name, cam in self._cameras.items()}
+        return {
+            "batches": self.batches,
+            "frames": self.frames,
+            "mean_batch": self.frames / self.batches if self.batches else 0.0,
+            "last_infer_ms": self.last_infer_time * 1e3,
+            "cameras": cams,
+        }
+
+    def _pending(self):
+        return [(name, cam) for name, cam in self._cameras.items() if cam.pending_seq is not None]
+
+    def _take_batch(self):
+        """대기 중인 프레임을 모아 (먼저 들어온 순) 최대 max_batch 장. 멈추면 None"""
+        with self._cond:
+            while self._running and not self._pending():
+                self._cond.wait()
+            if not self._running:
+                return None
+
+            # 다른 카메라 프레임이 더 올 때까지 잠깐 (전부 찼거나 시간이 지나면 바로)
+            deadline = time.monotonic() + self.gather_time
+            while self._running:
+                n = len(self._pending())
+                if n >= min(self.max_batch, len(self._cameras)):
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            pending = sorted(self._pending(), key=lambda item: item[1].submit_time)[:self.max_batch]
+            batch = []
+            for name, cam in pending:
+                # 스레드 밖에서 AGC / 추론하는 동안 submit 이 덮어쓰지 않도록 raw 는 여기서 AGC
+                cam.agc.apply(cam.raw, out=cam.gray)
+                batch.append((name, cam, cam.pending_seq))
+                cam.pending_seq = None
+            return batch
+
+    def _load(self):
+        t0 = time.perf_counter()
+        try:
+            self._detect = BATCH_DETECTORS[self.detector](self.max_batch)
+        except Exception as e:
+            self.error = e
+            print(f"[service] load failed: {e!r}", file=sys.stderr)
+            return False
+        self.load_time = time.perf_counter() - t0
+        print(f"[service] {self.detector} loaded in {self.load_time:.2f}s", file=sys.stderr)
+        return True
+
+    def _fail(self):
+        with self._cond:
+            self._running = False
+            for cam in self._cameras.values():
+                cam.pending_seq = None
+
+    def _run(self):
+        if not self._load():
+            self._fail()
+            return
+
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+
+            t0 = time.perf_counter()
+            try:
+                boxes = self._detect([cam.gray for _, cam, _ in batch])
+            except Exception as e:   # 모델 / 런타임 오류: 모든 카메라가 같은 모델이라 서비스 중단
+                self.error = e
+                print(f"[service] detect failed: {e!r}", file=sys.stderr)
+                self._fail()
+                return
+            self.last_infer_time = time.perf_counter() - t0
+
+            with self._cond:
+                self.batches += 1
+                self.frames += len(batch)
+                for (_, cam, seq), cam_boxes in zip(batch, boxes):
+                    cam.result = cam.latest = (seq, cam_boxes)
+                    cam.frames += 1
+
+
+def open_camera(spec):
+    """
+    명령줄 카메라 지정 → frame source
+      *.lrec / *.lrcz → replay.ReplayReader (최대 속도, 압축 여부는 open_recording 이 magic 으로 구분)
+      /dev/spidev*    → vospi.SpiCapture
+      그 외           → FrameReader (RAW shm 경로, 예: /dev/shm/lepton_raw)
+    """
+    if spec.endswith((".lrec", ".lrcz")):
+        from replay import ReplayReader
+        return ReplayReader(spec)
+    if spec.startswith("/dev/spidev"):
+        from vospi import SpiCapture
+        return SpiCapture(spec)
+    return FrameReader(raw_file=spec)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Batched person detection for several Lepton cameras")
+    parser.add_argument("cameras", nargs="+", help="RAW shm path, /dev/spidevX.Y or .lrec/.lrcz file per camera")
+    parser.add_argument("--detector", choices=list(BATCH_DETECTORS), default="onnx")
+    parser.add_argument("--batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--interval", type=float, default=0.0,
+                        help="seconds between detections per camera (0 = every new frame)")
+    args = parser.parse_args(argv)
+
+    sources = [open_camera(spec) for spec in args.cameras]
+    last_seq = [None] * len(sources)
+    last_submit = [0.0] * len(sources)
+
+    service = InferenceService(args.detector, max_batch=args.batch).start()
+    last_stats = time.monotonic()
+    try:
+        while service.error is None:
+            now = time.monotonic()
+            for i, src in enumerate(sources):
+                if now - last_submit[i] < args.interval:
+                    continue
+                raw = src.get_raw16_frame(since_seq=last_seq[i])
+                if raw is None:
+                    continue
+                last_seq[i] = src.raw_seq
+                last_submit[i] = now
+                service.submit(i, raw, src.raw_seq)
+
+            for i, spec in enumerate(args.cameras):
+                result = service.poll(i)
+                if result is not None:
+                    print(f"{spec} seq={result[0]} boxes={result[1]}", flush=True)
+
+            if now - last_stats > 10.0:
+                print(f"[service] {service.stats()}", file=sys.stderr)
+                last_stats = now
+            time.sleep(WAIT_POLL_INTERVAL)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        service.stop()
+        for src in sources:
+            src.close()
+        print(f"[service] {service.stats()}", file=sys.stderr)
+    return 0 if service.error is None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,200 @@
+# latency.py  (캡처 → 읽기 → 검출 → 온도 → 화면 단계별 지연 측정)
+#
+#   python final_temp.py --latency                    # /dev/shm/lepton_latency.json 에 주기적으로 dump
+#   python final_temp.py --latency /tmp/lat.json
+#   python latency.py                                 # 다른 터미널에서 dump 를 읽어 표로 (1초마다)
+#   python latency.py /tmp/lat.json --once
+#
+# 프레임마다 단계 시각(time.monotonic_ns)을 미리 할당한 (WINDOW, 단계 수) int64 ring 의 한 줄에 적는다.
+#   capture      : producer 가 shm 헤더에 적은 캡처 시각 (raw_timestamp_ns, 같은 monotonic 시계)
+#   read         : 메인 루프가 프레임을 받은 시각
+#   detect_start : 이번 프레임에 적용된 감지 결과의 추론 시작 / 끝
+#   detect_end     (yolo / onnx 는 worker 스레드에서 끝난 시각이라 몇 프레임 전일 수 있음)
+#   temp         : 얼굴 온도 계산 끝
+#   render       : imshow (headless 면 결과 publish) 끝
+# 구간 지연과 p50 / p95 / p99 는 dump 할 때만 최근 WINDOW 프레임으로 계산하므로
+# 루프 안에서는 배열에 정수 몇 개 쓰는 비용뿐이다. 적히지 않은 단계(감지 결과가 없던 프레임 등)는 0 → 제외.
+# dropped 는 raw_seq 가 건너뛴 프레임 수 (seq 는 프레임당 2 씩 증가).
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+STAGES = ("capture", "read", "detect_start", "detect_end", "temp", "render")
+CAPTURE, READ, DETECT_START, DETECT_END, TEMP, RENDER = range(len(STAGES))
+
+# (이름, 시작 단계, 끝 단계)
+INTERVALS = (
+    ("capture->read", CAPTURE, READ),       # producer → shm → 메인 루프 (대기 포함)
+    ("read->temp", READ, TEMP),             # 프레임 처리 (검출 + 얼굴 중심 + 온도)
+    ("detect", DETECT_START, DETECT_END),   # 추론 한 번
+    ("detect->temp", DETECT_END, TEMP),     # 감지 결과가 적용될 때까지 걸린 시간
+    ("temp->render", TEMP, RENDER),         # 그리기 / imshow / publish
+    ("capture->render", CAPTURE, RENDER),   # 화면에 보이는 온도의 나이
+)
+
+# 통계를 내는 최근 프레임 수 (9Hz 면 약 2분)
+WINDOW = 1024
+
+DUMP_INTERVAL = 5.0
+
+# tmpfs 라 dump 가 SD 카드 쓰기를 기다리지 않음
+LATENCY_FILE = "/dev/shm/lepton_latency.json"
+
+# 이보다 오래됐거나 미래인 캡처 시각은 다른 시계로 보고 버림 (replay 녹화 시각 등)
+MAX_CAPTURE_AGE_NS = 10 * 1_000_000_000
+
+PERCENTILES = (50, 95, 99)
+
+
+def add_latency_arg(parser):
+    """argparse 에 --latency [PATH] 추가"""
+    parser.add_argument("--latency", nargs="?", const=LATENCY_FILE, default=None, metavar="PATH",
+                        help=f"record per-stage latency and dump stats to PATH (default {LATENCY_FILE})")
+
+
+def open_monitor(args):
+    """--latency 가 있으면 LatencyMonitor, 아니면 None"""
+    if args.latency is None:
+        return None
+    return LatencyMonitor(args.latency)
+
+
+class LatencyMonitor:
+    """
+    프레임 단위 단계 시각 기록 + 주기적 통계 dump.
+
+        lat.begin(source.raw_seq, source.raw_timestamp_ns)   # 프레임 받은 직후 (read 시각 기록)
+        lat.mark(TEMP)                                       # 단계 끝날 때마다
+        lat.mark(DETECT_START, t_ns)                         # 다른 곳에서 잰 시각이면 직접
+        lat.end()                                            # 프레임 끝 (dump 주기 확인)
+    """
+
+    def __init__(self, path=LATENCY_FILE, window=WINDOW, dump_interval=DUMP_INTERVAL):
+        self.path = path
+        self.window = window
+        self.dump_interval = dump_interval
+
+        self._stamps = np.zeros((window, len(STAGES)), dtype=np.int64)
+        self._row = self._stamps[0]
+        self._index = -1
+        self._filled = 0
+
+        self.frames = 0
+        self.dropped = 0
+        self._last_seq = None
+
+        self._start = time.monotonic()
+        self._next_dump = self._start + dump_interval
+
+    def begin(self, seq=None, capture_ns=None):
+        now = time.monotonic_ns()
+
+        self._index = (self._index + 1) % self.window
+        self._filled = min(self._filled + 1, self.window)
+        row = self._row = self._stamps[self._index]
+        row[:] = 0
+        row[READ] = now
+        if capture_ns is not None and 0 <= now - capture_ns < MAX_CAPTURE_AGE_NS:
+            row[CAPTURE] = capture_ns
+
+        if seq is not None:
+            if self._last_seq is not None:
+                gap = (seq - self._last_seq) // 2 - 1
+                if gap > 0:
+                    self.dropped += gap
+            self._last_seq = seq
+        self.frames += 1
+
+    def mark(self, stage, t_ns=None):
+        self._row[stage] = time.monotonic_ns() if t_ns is None else t_ns
+
+    def end(self):
+        if time.monotonic() >= self._next_dump:
+            self.dump()
+
+    def stats(self):
+        """구간별 {count, p50, p95, p99, max} (ms) + frames / dropped"""
+        stamps = self._stamps[:self._filled]
+        intervals = {}
+        for name, a, b in INTERVALS:
+            start, stop = stamps[:, a], stamps[:, b]
+            valid = (start > 0) & (stop > 0)
+            ms = (stop[valid] - start[valid]) / 1e6
+            item = {"count": int(ms.size)}
+            if ms.size:
+                for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+                    item[f"p{p}"] = round(float(v), 3)
+                item["max"] = round(float(ms.max()), 3)
+            intervals[name] = item
+
+        elapsed = time.monotonic() - self._start
+        return {
+            "time": time.time(),
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "fps": round(self.frames / elapsed, 2) if elapsed > 0 else 0.0,
+            "window": int(self._filled),
+            "intervals": intervals,
+        }
+
+    def dump(self):
+        """stats() 를 path 에 JSON 으로 (임시 파일 → rename 이라 읽는 쪽이 반쯤 쓴 파일을 보지 않음)"""
+        self._next_dump = time.monotonic() + self.dump_interval
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self.stats(), f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[latency] dump failed: {e}", file=sys.stderr)
+
+    def close(self):
+        self.dump()
+
+
+def format_stats(stats):
+    lines = [f"frames {stats['frames']}  dropped {stats['dropped']}  fps {stats['fps']}  "
+             f"(last {stats['window']} frames, ms)",
+             f"{'interval':<16} {'count':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"]
+    for name, item in stats["intervals"].items():
+        if item["count"] == 0:
+            lines.append(f"{name:<16} {0:>6} {'-':>8} {'-':>8} {'-':>8} {'-':>8}")
+            continue
+        lines.append(f"{name:<16} {item['count']:>6} {item['p50']:>8.2f} {item['p95']:>8.2f} "
+                     f"{item['p99']:>8.2f} {item['max']:>8.2f}")
+    return "\n".join(lines)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Show latency stats dumped by --latency")
+    parser.add_argument("path", nargs="?", default=LATENCY_FILE)
+    parser.add_argument("--once", action="store_true")
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    last_time = None
+    try:
+        while True:
+            try:
+                with open(args.path) as f:
+                    stats = json.load(f)
+            except FileNotFoundError:
+                stats = None
+            if stats is None:
+                print(f"[latency] {args.path} not found (run a script with --latency)", file=sys.stderr)
+            elif stats["time"] != last_time:
+                print(format_stats(stats) + "\n", flush=True)
+                last_time = stats["time"]
+            if args.once:
+                return 0 if stats is not None else 1
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
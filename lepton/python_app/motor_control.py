@@ -0,0 +1,326 @@
+# motor_control.py  (카메라 pan 서보를 별도 스레드에서 움직이는 controller)
+#
+#   servo = ServoController(make_backend("gpio")).start()
+#   servo.set_target(120)        # 바로 반환 (메인 루프는 기다리지 않음)
+#   servo.stop()
+#
+#   명령줄 (실제 서보 / PC 에서는 fake):
+#     python motor_control.py 90 30 150 90
+#     python motor_control.py --backend fake --speed 60 0 180
+#
+# motor_control/test.py 의 set_angle 은 ChangeDutyCycle → sleep(0.2) → duty 0 이라
+# vision 루프에서 부르면 움직일 때마다 200ms 씩 멈춘다. 여기서는
+# - set_target() 은 목표 각도만 바꾸고 바로 반환 (처리 전 이전 목표는 덮어씀 = 최신 목표만 남음)
+# - controller 스레드가 UPDATE_RATE 로 목표를 향해 MAX_SPEED(°/s) 이하로 조금씩 이동 (slew limit)
+# - PWM 값은 각도가 MIN_STEP 이상 바뀔 때만 다시 씀 (rate limit, 같은 duty 반복 X)
+# - 목표에 도착해 RELEASE_AFTER 초 지나면 duty 0 (test.py 처럼 떨림 / 발열 방지)
+# PWM 출력은 backend 로 분리: RPi.GPIO 소프트웨어 PWM, sysfs 하드웨어 PWM, 테스트용 fake.
+import argparse
+import bisect
+import collections
+import os
+import sys
+import threading
+import time
+
+# BCM12 (board pin 32), 하드웨어 PWM0 채널과 같은 핀
+SERVO_PIN = 12
+PWM_FREQ = 50
+
+MIN_ANGLE = 0.0
+MAX_ANGLE = 180.0
+CENTER_ANGLE = 90.0
+
+# slew limit (°/s)
+MAX_SPEED = 180.0
+
+# controller 스레드 갱신 주기 (Hz), 50Hz PWM 한 주기마다 한 번
+UPDATE_RATE = 50.0
+
+# 이보다 작은 각도 변화는 PWM 을 다시 쓰지 않음 (°)
+MIN_STEP = 0.5
+
+# 목표 도착 후 이 시간(초)이 지나면 펄스를 끔 (None 이면 계속 유지)
+RELEASE_AFTER = 0.3
+
+# angle_at() 용으로 기억하는 (시각, 각도) 수 (50Hz 면 약 1.3초)
+ANGLE_HISTORY = 64
+
+# sysfs PWM: BCM12 를 PWM0 으로 쓰려면 /boot/config.txt 에 dtoverlay=pwm,pin=12,func=4
+SYSFS_PWM_CHIP = "/sys/class/pwm/pwmchip0"
+SYSFS_PWM_CHANNEL = 0
+
+
+def angle_to_duty(angle):
+    """각도(0~180) → duty %, test.py 와 같은 식 (50Hz 에서 0.4ms ~ 2.4ms 펄스)"""
+    return 2.0 + angle / 18.0
+
+
+class GpioPwm:
+    """RPi.GPIO 소프트웨어 PWM (motor_control/test.py 와 같은 설정)"""
+
+    def __init__(self, pin=SERVO_PIN, freq=PWM_FREQ):
+        import RPi.GPIO as GPIO
+        self._gpio = GPIO
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(pin, GPIO.OUT)
+        self._pwm = GPIO.PWM(pin, freq)
+        self._pwm.start(0)
+
+    def set_duty(self, duty):
+        self._pwm.ChangeDutyCycle(duty)
+
+    def close(self):
+        self._pwm.stop()
+        self._gpio.cleanup()
+
+
+class SysfsPwm:
+    """
+    커널 하드웨어 PWM (/sys/class/pwm). 소프트웨어 PWM 과 달리 CPU 부하에 펄스 폭이 흔들리지 않음.
+    duty 는 % 로 받아 ns 로 변환.
+    """
+
+    def __init__(self, chip=SYSFS_PWM_CHIP, channel=SYSFS_PWM_CHANNEL, freq=PWM_FREQ):
+        self._dir = os.path.join(chip, f"pwm{channel}")
+        if not os.path.isdir(self._dir):
+            self._write(os.path.join(chip, "export"), channel)
+            # export 직후 udev 가 권한을 바꿀 때까지 잠깐
+            deadline = time.monotonic() + 1.0
+            while not os.path.isdir(self._dir) and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self._chip = chip
+        self._channel = channel
+        self._period = int(1e9 / freq)
+        self._write_attr("period", self._period)
+        self._write_attr("duty_cycle", 0)
+        self._write_attr("enable", 1)
+
+    @staticmethod
+    def _write(path, value):
+        with open(path, "w") as f:
+            f.write(str(value))
+
+    def _write_attr(self, name, value):
+        self._write(os.path.join(self._dir, name), value)
+
+    def set_duty(self, duty):
+        self._write_attr("duty_cycle", int(self._period * duty / 100.0))
+
+    def close(self):
+        self._write_attr("duty_cycle", 0)
+        self._write_attr("enable", 0)
+        self._write(os.path.join(self._chip, "unexport"), self._channel)
+
+
+class FakePwm:
+    """하드웨어 없이 (PC / 테스트). set_duty 호출을 (monotonic 시각, duty) 로 기록"""
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.history = []
+        self.duty = 0.0
+
+    def set_duty(self, duty):
+        self.duty = duty
+        self.history.append((time.monotonic(), duty))
+        if self.verbose:
+            print(f"[servo] duty {duty:.2f}%", file=sys.stderr)
+
+    def close(self):
+        pass
+
+
+# name → backend 생성 함수
+BACKENDS = {
+    "gpio": GpioPwm,
+    "sysfs": SysfsPwm,
+    "fake": FakePwm,
+}
+
+
+def make_backend(name="gpio", **kwargs):
+    if name not in BACKENDS:
+        raise ValueError(f"unknown PWM backend: {name} (choices: {', '.join(BACKENDS)})")
+    return BACKENDS[name](**kwargs)
+
+
+class ServoController:
+    """
+    목표 각도를 받아 별도 스레드에서 천천히 따라가는 서보 controller.
+
+    - set_target(angle): 목표 변경 (범위로 clip), 바로 반환. 아직 반영 안 된 이전 목표는 버림
+    - angle            : 지금 PWM 으로 내보내고 있는 각도 (controller 스레드가 갱신)
+    - target           : 마지막 목표 각도
+    - moving()         : 아직 목표에 도착 전인지
+    - angle_at(t)      : time.monotonic() 시각 t 에 내보내고 있던 각도 (캡처 시점 카메라 방향 계산용)
+    목표에 도착해 있고 펄스도 꺼진 동안 스레드는 새 목표가 올 때까지 잠들어 있다.
+    """
+
+    def __init__(self, backend, min_angle=MIN_ANGLE, max_angle=MAX_ANGLE, max_speed=MAX_SPEED,
+                 rate=UPDATE_RATE, min_step=MIN_STEP, release_after=RELEASE_AFTER,
+                 initial_angle=CENTER_ANGLE):
+        self.backend = backend
+        self.min_angle = min_angle
+        self.max_angle = max_angle
+        self.max_speed = max_speed
+        self.rate = rate
+        self.min_step = min_step
+        self.release_after = release_after
+
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+        self.target = self._clip(initial_angle)
+        self.angle = self.target
+        self._written = None         # 마지막으로 PWM 에 쓴 각도 (펄스 꺼져 있으면 None)
+        self._arrived_at = None      # 목표에 도착한 시각
+        # 각도가 바뀔 때마다 (monotonic 시각, 각도)
+        self._history = collections.deque([(time.monotonic(), self.angle)], maxlen=ANGLE_HISTORY)
+
+        self.commands = 0            # set_target 호출 수
+        self.coalesced = 0           # 반영 전에 더 새 목표로 덮어쓴 횟수
+        self.writes = 0              # 실제 set_duty 횟수
+        self._pending = False
+
+    def _clip(self, angle):
+        return min(self.max_angle, max(self.min_angle, float(angle)))
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, center=False):
+        """스레드 종료 (center=True 면 먼저 CENTER_ANGLE 로 돌아갈 때까지 기다림)"""
+        if center and self._thread is not None:
+            self.set_target(CENTER_ANGLE)
+            self.wait(timeout=2.0)
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.backend.set_duty(0)
+        self.backend.close()
+
+    def set_target(self, angle):
+        angle = self._clip(angle)
+        with self._cond:
+            self.commands += 1
+            if self._pending:
+                self.coalesced += 1
+            self.target = angle
+            self._pending = True
+            self._cond.notify()
+
+    def moving(self):
+        with self._cond:
+            return self.angle != self.target
+
+    def angle_at(self, t):
+        """시각 t (time.monotonic) 의 각도. history 보다 오래됐으면 가장 오래된 값"""
+        with self._cond:
+            history = list(self._history)
+        i = bisect.bisect_right(history, (t, float("inf"))) - 1
+        return history[max(0, i)][1]
+
+    def wait(self, timeout=None):
+        """목표에 도착할 때까지 기다림 (테스트 / 명령줄용, vision 루프에서는 쓰지 않음)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.moving():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(1.0 / self.rate)
+        return True
+
+    def _write(self, angle):
+        self.backend.set_duty(angle_to_duty(angle))
+        self._written = angle
+        self.writes += 1
+
+    def _release(self):
+        self.backend.set_duty(0)
+        self._written = None
+
+    def _run(self):
+        period = 1.0 / self.rate
+        last = time.monotonic()
+        # 시작 위치로 한 번
+        self._write(self.angle)
+        self._arrived_at = last
+
+        while True:
+            with self._cond:
+                # 도착 + 펄스 꺼짐 → 새 목표까지 잠듦
+                while self._running and not self._pending and self._written is None:
+                    self._cond.wait()
+                    last = time.monotonic()
+                if not self._running:
+                    return
+                self._pending = False
+                target = self.target
+
+            now = time.monotonic()
+            dt = now - last
+            last = now
+
+            # slew limit: 이번 주기에 움직일 수 있는 만큼만
+            max_delta = self.max_speed * dt
+            delta = target - self.angle
+            if abs(delta) <= max_delta:
+                angle = target
+            else:
+                angle = self.angle + (max_delta if delta > 0 else -max_delta)
+
+            with self._cond:
+                if angle != self.angle:
+                    self._history.append((now, angle))
+                self.angle = angle
+
+            if angle != target:
+                self._arrived_at = None
+                if self._written is None or abs(angle - self._written) >= self.min_step:
+                    self._write(angle)
+            else:
+                if self._written is None or self._written != angle:
+                    # 도착: 마지막 위치는 min_step 보다 작아도 정확히 씀
+                    self._write(angle)
+                    self._arrived_at = now
+                elif self._arrived_at is None:
+                    self._arrived_at = now
+                elif self.release_after is not None and now - self._arrived_at >= self.release_after:
+                    self._release()
+                    continue
+
+            time.sleep(period)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Move the pan servo through a list of angles")
+    parser.add_argument("angles", nargs="*", type=float, default=[CENTER_ANGLE])
+    parser.add_argument("--backend", choices=list(BACKENDS), default="gpio")
+    parser.add_argument("--speed", type=float, default=MAX_SPEED, help="max speed (deg/s)")
+    args = parser.parse_args(argv)
+
+    kwargs = {"verbose": True} if args.backend == "fake" else {}
+    servo = ServoController(make_backend(args.backend, **kwargs), max_speed=args.speed).start()
+    try:
+        for angle in args.angles:
+            t0 = time.monotonic()
+            servo.set_target(angle)
+            servo.wait()
+            print(f"[servo] {servo.angle:.1f} deg in {time.monotonic() - t0:.2f}s")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servo.stop()
+        print(f"[servo] {servo.commands} commands, {servo.writes} PWM writes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,207 @@
+# onnx_detect.py  (yolov8n ONNX 를 cv2.dnn / onnxruntime 으로 직접 돌리는 person 검출기)
+#
+#   ONNX 만들기 (ultralytics 가 있는 PC 에서 한 번):
+#     python onnx_detect.py export                 # yolov8n.pt → yolov8n.onnx (입력 1x3x128x160 고정)
+#     python onnx_detect.py export --dynamic       # batch 크기 가변 (inference_service 여러 카메라 batch)
+#   사용:
+#     python final_temp.py --detector onnx
+#   ultralytics 와 비교:
+#     python bench_detect.py
+#
+# ultralytics YOLO.__call__ 은 매번 letterbox, tensor 생성, Results 객체, .cpu().numpy() 를 거치는데
+# 입력이 항상 160x120 1채널 열화상이라 전부 고정할 수 있다.
+# - 입력 blob (1, 3, 128, 160) float32 는 한 번만 만들고, 위아래 4줄 패딩(114/255)은 그대로 둔 채
+#   AGC 결과를 /255 해서 가운데 120줄에 바로 써 넣음 (회색이라 3채널 같은 값)
+#   (ultralytics 도 160x120 을 stride 32 배수인 160x128 로 패딩해서 돌리므로 같은 입력)
+# - 출력 (1, 4 + 80, N) 에서 person(class 0) 점수만 보고 conf 필터 → xywh→xyxy → NMS 를 NumPy 로
+import sys
+
+import cv2
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT
+from agc import Agc
+from tracker import iou_matrix
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+ONNX_MODEL = "yolov8n.onnx"
+
+# 모델 입력 (stride 32 배수), 세로 패딩은 위아래 반씩
+INPUT_W = 160
+INPUT_H = 128
+PAD_Y = (INPUT_H - HEIGHT) // 2
+
+# ultralytics letterbox 패딩 색 (114, 114, 114)
+PAD_VALUE = 114.0 / 255.0
+
+# ultralytics predict 기본값과 같은 기준 (conf 는 스크립트들이 쓰던 0.25)
+CONF_THRESHOLD = 0.25
+IOU_THRESHOLD = 0.7
+
+# conf 를 넘은 후보가 너무 많으면 점수 상위만 NMS (ultralytics max_nms 와 같은 역할)
+MAX_CANDIDATES = 300
+
+PERSON_CLASS = 0
+
+
+def nms(boxes, scores, iou_threshold=IOU_THRESHOLD):
+    """
+    (N, 4) xyxy, (N,) → 남길 index (점수 높은 순).
+    IoU 행렬은 한 번의 broadcast 로 만들고, 남기는 박스마다 그 행으로 나머지를 한 번에 억제
+    (Python 반복은 남는 박스 수만큼만).
+    """
+    order = np.argsort(-scores, kind="stable")
+    over = iou_matrix(boxes[order], boxes[order]) > iou_threshold
+
+    n = order.size
+    suppressed = np.zeros(n, dtype=bool)
+    keep = []
+    i = 0
+    while True:
+        keep.append(i)
+        suppressed |= over[i]
+        rest = np.flatnonzero(~suppressed[i + 1:])
+        if rest.size == 0:
+            break
+        i += 1 + int(rest[0])
+    return order[keep]
+
+
+class OnnxPersonDetector:
+    """
+    yolov8n ONNX person 검출기 (입력 크기 고정, 버퍼 재사용).
+
+    backend
+      "ort" : onnxruntime CPU
+      "dnn" : cv2.dnn
+      None  : onnxruntime 이 설치돼 있으면 ort, 없으면 dnn
+    detect(raw_frame)       : RAW16 → AGC → (boxes, scores)
+    detect_gray(gray)       : 이미 만든 8bit grayscale (H, W) → (boxes, scores)
+    detect_gray_batch(grays): 여러 장을 한 번의 forward 로 → [(boxes, scores), ...]
+                              (max_batch 장까지, batch 가변(--dynamic) 모델이 아니면 한 장씩)
+    반환 박스는 (x1, y1, x2, y2) int (프레임 안으로 clip), 점수 높은 순.
+    """
+
+    def __init__(self, model_path=ONNX_MODEL, backend=None, conf=CONF_THRESHOLD, iou=IOU_THRESHOLD,
+                 max_batch=1):
+        if backend is None:
+            backend = "ort" if ort is not None else "dnn"
+        if backend not in ("ort", "dnn"):
+            raise ValueError(f"unknown ONNX backend: {backend}")
+        if backend == "ort" and ort is None:
+            raise ImportError("onnxruntime is not installed (use backend='dnn')")
+
+        self.backend = backend
+        self.conf = conf
+        self.iou = iou
+        self.max_batch = max_batch
+        # batch 축이 고정(1)인 모델이면 False → detect_gray_batch 가 한 장씩 forward
+        self.batched = max_batch > 1
+
+        if backend == "ort":
+            self._session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+            model_input = self._session.get_inputs()[0]
+            self._input_name = model_input.name
+            if isinstance(model_input.shape[0], int) and model_input.shape[0] == 1:
+                self.batched = False
+        else:
+            self._net = cv2.dnn.readNetFromONNX(model_path)
+
+        self._agc = Agc()
+        self._gray = np.empty((HEIGHT, WIDTH), dtype=np.uint8)
+
+        self._blob = np.full((max_batch, 3, INPUT_H, INPUT_W), PAD_VALUE, dtype=np.float32)
+
+    def _fill_blob(self, gray, index=0):
+        plane = self._blob[index, 0, PAD_Y:PAD_Y + HEIGHT, :WIDTH]
+        np.multiply(gray, np.float32(1.0 / 255.0), out=plane)
+        self._blob[index, 1, PAD_Y:PAD_Y + HEIGHT, :WIDTH] = plane
+        self._blob[index, 2, PAD_Y:PAD_Y + HEIGHT, :WIDTH] = plane
+
+    def forward(self, n=1):
+        """blob 앞 n 장으로 추론 → (n, 4 + classes, N) float32"""
+        blob = self._blob[:n]
+        if self.backend == "ort":
+            return self._session.run(None, {self._input_name: blob})[0]
+        self._net.setInput(blob)
+        return self._net.forward()
+
+    def postprocess(self, pred):
+        """(4 + classes, N) → person 박스 (boxes, scores)"""
+        scores = pred[4 + PERSON_CLASS]
+        cand = np.flatnonzero(scores > self.conf)
+        if cand.size == 0:
+            return [], []
+        if cand.size > MAX_CANDIDATES:
+            cand = cand[np.argpartition(-scores[cand], MAX_CANDIDATES)[:MAX_CANDIDATES]]
+
+        cx, cy, w, h = pred[:4, cand]
+        xyxy = np.stack([cx - w * 0.5, cy - h * 0.5 - PAD_Y,
+                         cx + w * 0.5, cy + h * 0.5 - PAD_Y], axis=1)
+        scores = scores[cand]
+
+        keep = nms(xyxy, scores, self.iou)
+
+        boxes = xyxy[keep]
+        np.clip(boxes[:, 0::2], 0, WIDTH - 1, out=boxes[:, 0::2])
+        np.clip(boxes[:, 1::2], 0, HEIGHT - 1, out=boxes[:, 1::2])
+        # yolo_person_boxes 처럼 int() 버림
+        boxes = boxes.astype(np.int64).tolist()
+        return [tuple(b) for b in boxes], scores[keep].tolist()
+
+    def detect_gray(self, gray):
+        self._fill_blob(gray)
+        return self.postprocess(self.forward()[0])
+
+    def detect_gray_batch(self, grays):
+        results = []
+        step = self.max_batch if self.batched else 1
+        for start in range(0, len(grays), step):
+            chunk = grays[start:start + step]
+            for i, gray in enumerate(chunk):
+                self._fill_blob(gray, i)
+            try:
+                preds = self.forward(len(chunk))
+            except cv2.error:
+                if len(chunk) == 1:
+                    raise
+                # cv2.dnn 에서 batch 고정 모델 → 이후로는 한 장씩
+                self.batched = False
+                return results + self.detect_gray_batch(grays[start:])
+            results.extend(self.postprocess(pred) for pred in preds)
+        return results
+
+    def detect(self, raw_frame):
+        return self.detect_gray(self._agc.apply(raw_frame, out=self._gray))
+
+    def __call__(self, raw_frame):
+        """detect() 의 박스만 (detect_worker.yolo_person_boxes 와 같은 형태)"""
+        return self.detect(raw_frame)[0]
+
+
+def export(weights="yolov8n.pt", dynamic=False):
+    """
+    ultralytics 로 입력 크기 고정 ONNX export (Pi 에는 결과 .onnx 만 복사하면 됨).
+    dynamic=True 면 batch 축만 가변 (입력 해상도는 그대로 128x160 으로 씀).
+    """
+    from ultralytics import YOLO
+    return YOLO(weights).export(format="onnx", imgsz=(INPUT_H, INPUT_W), dynamic=dynamic, simplify=True)
+
+
+def main(argv):
+    if len(argv) >= 1 and argv[0] == "export":
+        dynamic = "--dynamic" in argv
+        args = [a for a in argv[1:] if a != "--dynamic"]
+        path = export(args[0] if args else "yolov8n.pt", dynamic=dynamic)
+        print(f"[onnx] exported {path}")
+        return 0
+    print("usage: python onnx_detect.py export [weights.pt] [--dynamic]")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,161 @@
+# pan_tracker.py  (선택한 사람이 화면 가운데 오도록 pan 서보를 PID 로 돌리기)
+#
+#   python final_temp.py --pan gpio           # 가장 뜨거운 사람을 따라감 (BCM12 서보)
+#   python final_temp.py --pan fake           # 서보 없이 (PC), 명령만 계산
+#   python gray_final.py --pan sysfs          # 하드웨어 PWM
+#
+# 매 프레임 update(center, capture_ns):
+# 1) 사람 방향(bearing) = 캡처 시점의 서보 각도(servo.angle_at) + 화면 가운데로부터의 가로 오프셋(°)
+#    → 카메라가 돌고 있는 중이어도 방향이 서보 각도 좌표계로 고정됨
+# 2) bearing 속도(°/s) 를 EMA 로 추정하고, 캡처 시각 → 지금까지 지난 시간만큼 앞으로 예측
+#    (SPI 캡처 / shm / 검출 / 온도 계산에 걸린 지연 보상)
+# 3) 예측 방향 - 지금 서보 각도 = 오차 → PID → servo.set_target (ServoController 가 slew limit 처리)
+#    오차가 deadband 안이면 명령을 보내지 않아 서보가 멈추고 RELEASE_AFTER 뒤 펄스가 꺼진다
+# 메인 루프는 set_target 만 하므로 서보가 움직이는 동안 기다리지 않는다.
+import time
+
+from read_frame import WIDTH
+from motor_control import ServoController, make_backend, BACKENDS
+
+# Lepton 3.5 가로 화각 (°)
+HFOV_DEG = 57.0
+
+# 서보 각도가 커질 때 화면이 오른쪽(x 증가)으로 가면 1, 반대로 달았으면 -1
+PAN_DIRECTION = 1
+
+# PID (오차 단위 °, 출력은 이번에 더할 각도 °)
+KP = 0.6
+KI = 0.4
+KD = 0.02
+INTEGRAL_LIMIT = 10.0      # ° * s, anti-windup
+
+# 가운데에서 이 각도(°) 안이면 명령 없음 + integral 초기화 (서보 떨림 방지, 1px ≈ 0.36°)
+DEADBAND_DEG = 1.0
+
+# bearing 속도 EMA, 예측에 쓰는 최대 지연 (오래된 프레임으로 너무 멀리 외삽하지 않게)
+VELOCITY_ALPHA = 0.3
+MAX_PREDICT_TIME = 0.5
+
+# 대상이 이 시간(초) 이상 안 보이면 PID 상태 초기화
+LOST_TIMEOUT = 1.0
+
+# 더 뜨거운 사람으로 대상을 바꾸는 온도 차 (°C)
+SWITCH_HYSTERESIS = 0.5
+
+# 캡처 시각이 이보다 오래됐거나 미래면 다른 시계로 보고 지금 시각 사용 (replay 녹화 시각 등)
+MAX_CAPTURE_AGE_NS = 10 * 1_000_000_000
+
+
+def add_pan_arg(parser):
+    """argparse 에 --pan BACKEND 추가"""
+    parser.add_argument("--pan", choices=list(BACKENDS), default=None,
+                        help="keep the hottest person centered with the pan servo (PWM backend)")
+
+
+def open_pan_tracker(args):
+    """--pan 이 있으면 PanTracker (서보 스레드 시작), 아니면 None"""
+    if args.pan is None:
+        return None
+    return PanTracker(ServoController(make_backend(args.pan)).start())
+
+
+def select_target(tracks, current_id=None, hysteresis=SWITCH_HYSTERESIS):
+    """
+    얼굴 중심과 온도가 있는 track 중 가장 뜨거운 것.
+    지금 따라가는 track 이 아직 있으면 hysteresis 이상 더 뜨거운 사람이 있을 때만 바꿈.
+    """
+    candidates = [tr for tr in tracks if tr.temp is not None and tr.shifted_center() is not None]
+    if not candidates:
+        return None
+    hottest = max(candidates, key=lambda tr: tr.temp)
+    for tr in candidates:
+        if tr.id == current_id:
+            return hottest if hottest.temp > tr.temp + hysteresis else tr
+    return hottest
+
+
+class PanTracker:
+    """
+    가로 픽셀 오프셋 → pan 서보 명령 (PID + 캡처 지연 보상).
+
+    - update(center, capture_ns): 대상 얼굴 중심 (x, y) 와 그 프레임 캡처 시각 (monotonic_ns).
+                                  center 가 None 이면 대상 없음 (LOST_TIMEOUT 뒤 PID 초기화)
+    - target_id                 : select_target 으로 고른 track id (호출하는 쪽이 관리)
+    """
+
+    def __init__(self, servo, hfov=HFOV_DEG, direction=PAN_DIRECTION, kp=KP, ki=KI, kd=KD,
+                 deadband=DEADBAND_DEG):
+        self.servo = servo
+        self.deg_per_px = hfov / WIDTH
+        self.direction = direction
+        self.kp, self.ki, self.kd = kp, ki, kd
+        self.deadband = deadband
+
+        self.target_id = None
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.velocity = 0.0          # bearing 속도 (°/s)
+        self.error = None
+        self._prev_error = None
+        self._prev_t = None          # 이전 update 의 캡처 시각 (초)
+        self._prev_bearing = None
+        self._last_seen = None
+
+    def bearing(self, x, t):
+        """캡처 시각 t (초) 에 화면 x 에 있던 대상의 방향 (서보 각도 좌표계)"""
+        offset = (x - (WIDTH - 1) / 2.0) * self.deg_per_px * self.direction
+        return self.servo.angle_at(t) + offset
+
+    def update(self, center, capture_ns=None):
+        now_ns = time.monotonic_ns()
+        now = now_ns / 1e9
+
+        if center is None:
+            if self._last_seen is not None and now - self._last_seen > LOST_TIMEOUT:
+                self.reset()
+            return None
+
+        if capture_ns is None or not 0 <= now_ns - capture_ns < MAX_CAPTURE_AGE_NS:
+            capture_ns = now_ns
+        t = capture_ns / 1e9
+        self._last_seen = now
+
+        bearing = self.bearing(center[0], t)
+
+        dt = None if self._prev_t is None else t - self._prev_t
+        if dt is not None and dt > 0:
+            v = (bearing - self._prev_bearing) / dt
+            self.velocity += VELOCITY_ALPHA * (v - self.velocity)
+        self._prev_t = t
+        self._prev_bearing = bearing
+
+        # 지연 보상: 캡처 이후 지난 시간만큼 대상이 더 움직였다고 보고 앞으로
+        predicted = bearing + self.velocity * min(now - t, MAX_PREDICT_TIME)
+
+        error = predicted - self.servo.angle
+        if abs(error) < self.deadband:
+            # 가운데 도착: 명령을 보내지 않고 적분도 비움.
+            # 출력은 서보 각도에 더해지므로(그 자체로 적분) 남은 integral 이 있으면
+            # 오차 0 이어도 매 프레임 조금씩 밀려서 서보가 멈추지 않고 release 도 안 됨
+            self.integral = 0.0
+            self._prev_error = 0.0
+            self.error = 0.0
+            return 0.0
+
+        derivative = 0.0
+        if dt is not None and dt > 0:
+            self.integral += error * dt
+            self.integral = max(-INTEGRAL_LIMIT, min(INTEGRAL_LIMIT, self.integral))
+            derivative = (error - self._prev_error) / dt
+        self._prev_error = error
+        self.error = error
+
+        output = self.kp * error + self.ki * self.integral + self.kd * derivative
+        if output != 0.0:
+            self.servo.set_target(self.servo.angle + output)
+        return output
+
+    def stop(self):
+        self.servo.stop()
@@ -1,55 +1,95 @@
+import argparse
 import os
-import mmap
+import sys
 import time
 import numpy as np
 import cv2
 
-WIDTH = 160
-HEIGHT = 120
-RAW_SIZE = WIDTH * HEIGHT * 2
+from read_frame import open_source, live_source_selected, RAW_FILE, WIDTH, HEIGHT
+from temp_lut import raw_frame_to_celsius, raw_frame_to_display
+from results import add_output_args, open_publisher
 
-SHM_RAW = "/dev/shm/lepton_raw"
+SHM_RAW = RAW_FILE
 
-print("Waiting for RAW shared memory...")
 
-while not os.path.exists(SHM_RAW):
-    time.sleep(0.1)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Lepton RAW temperature stats + heatmap")
+    add_output_args(parser)
+    return parser.parse_args(argv)
 
-fd_raw = os.open(SHM_RAW, os.O_RDONLY)
-mm_raw = mmap.mmap(fd_raw, RAW_SIZE, mmap.MAP_SHARED, mmap.PROT_READ)
 
-print("[OK] Connected to /dev/shm/lepton_raw")
+def main(argv=None):
+    args = parse_args(argv)
 
-# 창 한 번만 생성
-cv2.namedWindow("TEMP", cv2.WINDOW_NORMAL)
+    # --headless: 창 / heatmap 없이 max / median / center 만 publisher 로
+    publisher = open_publisher(args)
 
-while True:
-    mm_raw.seek(0)
-    buf = mm_raw.read(RAW_SIZE)
+    # 상태 메시지는 stderr (headless 의 stdout 은 JSON lines 전용)
+    # live shm 일 때만 C++ 가 세그먼트를 만들 때까지 기다림 (LEPTON_REPLAY / LEPTON_SPI 면 바로)
+    if live_source_selected():
+        print("Waiting for RAW shared memory...", file=sys.stderr)
+        while not os.path.exists(SHM_RAW):
+            time.sleep(0.1)
 
-    raw = np.frombuffer(buf, dtype=np.uint16).reshape((HEIGHT, WIDTH))
+    reader = open_source()
 
-    # Radiometry 절대온도 계산
-    temp = (raw / 100.0) - 273.15
+    # 매 프레임 새로 만들지 않고 재사용하는 버퍼
+    temp = np.empty((HEIGHT, WIDTH), dtype=np.float32)
+    norm = np.empty((HEIGHT, WIDTH), dtype=np.uint8)
 
-    # ------------- 핵심 추가 부분 --------------
-    max_temp = np.max(temp)              # 최대 온도
-    median_temp = np.median(temp)        # 전체 프레임 median 온도
-    center_temp = temp[HEIGHT//2, WIDTH//2]  # 중심 점 온도
+    print(f"[OK] Connected to {type(reader).__name__}", file=sys.stderr)
 
-    print(f"🔥 Max: {max_temp:.2f}°C   |   Median: {median_temp:.2f}°C   |   Center: {center_temp:.2f}°C")
-    # ---------------------------------------
+    # 창 한 번만 생성
+    if not args.headless:
+        cv2.namedWindow("TEMP", cv2.WINDOW_NORMAL)
 
-    # Heatmap for viewing
-    norm = cv2.normalize(temp, None, 0, 255, cv2.NORM_MINMAX)
-    norm = norm.astype(np.uint8)
-    color = cv2.applyColorMap(norm, cv2.COLORMAP_INFERNO)
+    try:
+        while True:
+            # 새 프레임이 올 때까지 잠들어 있음, 안 오면 계산/출력 건너뛰기
+            # RAW 만 쓰므로 RGB 는 읽지 않음 (프레임당 RGB 복사 / 변환 없음)
+            raw = reader.wait_raw16_frame(timeout=0.5)
+            if raw is None:
+                if not args.headless and cv2.waitKey(1) == 27:
+                    break
+                continue
 
-    cv2.imshow("TEMP", color)
+            # Radiometry 절대온도 계산 (LUT np.take, float32 버퍼 재사용)
+            raw_frame_to_celsius(raw, out=temp)
 
-    if cv2.waitKey(1) == 27:
-        break
+            # ------------- 핵심 추가 부분 --------------
+            max_temp = np.max(temp)              # 최대 온도
+            median_temp = np.median(temp)        # 전체 프레임 median 온도
+            center_temp = temp[HEIGHT//2, WIDTH//2]  # 중심 점 온도
 
-mm_raw.close()
-os.close(fd_raw)
-cv2.destroyAllWindows()
+            if publisher is not None:
+                publisher.publish(reader.raw_seq, reader.raw_timestamp_ns, [],
+                                  max=round(float(max_temp), 2),
+                                  median=round(float(median_temp), 2),
+                                  center=round(float(center_temp), 2))
+            else:
+                print(f"🔥 Max: {max_temp:.2f}°C   |   Median: {median_temp:.2f}°C   |   Center: {center_temp:.2f}°C")
+            # ---------------------------------------
+
+            if args.headless:
+                continue
+
+            # Heatmap for viewing (프레임 min/max 범위 → 0~255 LUT)
+            raw_frame_to_display(raw, out=norm)
+            color = cv2.applyColorMap(norm, cv2.COLORMAP_INFERNO)
+
+            cv2.imshow("TEMP", color)
+
+            if cv2.waitKey(1) == 27:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+        if publisher is not None:
+            publisher.close()
+        if not args.headless:
+            cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
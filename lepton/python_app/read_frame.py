@@ -1,4 +1,9 @@
 # read_frame.py
+import os
+import time
+import ctypes
+import ctypes.util
+import platform
 import numpy as np
 import mmap
 
@@ -9,21 +14,596 @@ HEIGHT = 120
 RAW_FILE = "/dev/shm/lepton_raw"
 RGB_FILE = "/dev/shm/lepton_frame"
 
+RING_FILE = "/dev/shm/lepton_ring"
+
+RAW_SIZE = WIDTH * HEIGHT * 2
+RGB_SIZE = WIDTH * HEIGHT * 3
+
+# 픽셀 데이터 뒤에 붙는 seqlock 헤더 (raspberrypi_video/LeptonShm.h 와 같은 레이아웃)
+#   u32 magic, u32 version, u32 seq, u32 header_size,
+#   u64 timestamp_ns (CLOCK_MONOTONIC), u16 width, u16 height,
+#   capture stats (u32 x5, RAW 만), reserved...
+SHM_MAGIC = 0x5450454C   # "LEPT"
+SHM_VERSION = 1
+SHM_HEADER_SIZE = 64
+
+_HDR_SEQ = 2             # u32 index
+_HDR_TIMESTAMP = 2       # u64 index
+_HDR_STATS = 7           # u32 index, LeptonCaptureStats 시작
+
+# LeptonCaptureStats 필드 순서
+CAPTURE_STATS_FIELDS = ("frames", "packets_dropped", "crc_errors", "discard_packets", "resyncs")
+
+# /dev/shm/lepton_ring 레이아웃 (LeptonShm.h 의 LeptonRingHeader / LeptonRingSlot)
+#   header: u32 magic, u32 version, u32 depth, u32 head, u32 slots_offset, u32 frames_offset, ...
+#   slot  : u32 seq, u32 frame_no, u64 timestamp_ns
+RING_MAGIC = 0x474E4952  # "RING"
+RING_VERSION = 1
+
+_RING_DEPTH = 2          # u32 index
+_RING_HEAD = 3
+_RING_SLOTS_OFFSET = 4
+_RING_FRAMES_OFFSET = 5
+
+_RING_SLOT_DTYPE = np.dtype([("seq", "<u4"), ("frame_no", "<u4"), ("timestamp_ns", "<u8")])
+
+# 쓰는 중(seq 홀수)이거나 복사 도중 seq 가 바뀌었을 때 재시도하는 최대 시간 (초)
+# C++ 는 한 프레임 쓰는 데 수 ms 정도 걸림
+SEQLOCK_TIMEOUT = 0.05
+
+# futex 를 못 쓸 때(헤더 없는 producer, 지원 안 되는 아키텍처) wait_frame 의 polling 주기 (초)
+WAIT_POLL_INTERVAL = 0.005
+
+# wait_frame: C++ 는 RAW 다음에 RGB 를 쓰므로 RAW 가 깨운 뒤 같은 캡처 시각의 RGB 를 기다리는 최대 시간 (초)
+# (RGB 를 안 쓰는 producer 면 이만큼만 기다리고 있는 RGB 를 그대로)
+RGB_PAIR_TIMEOUT = 0.05
+
+# SYS_futex 번호 (아키텍처마다 다름)
+_SYS_FUTEX = {
+    "x86_64": 202,
+    "aarch64": 98,
+    "armv7l": 240,
+    "armv6l": 240,
+    "i686": 240,
+}.get(platform.machine())
+_FUTEX_WAIT = 0
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+_libc = None
+if _SYS_FUTEX is not None:
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    except OSError:
+        _libc = None
+
+
+def _futex_wait(addr, expected, timeout):
+    """
+    *addr == expected 인 동안 최대 timeout 초 잠듦 (C++ 쪽 FUTEX_WAKE 로 깨어남).
+    futex 를 쓸 수 없으면 False 반환 → 호출한 쪽에서 polling 으로 대체.
+    """
+    if _libc is None:
+        return False
+
+    ts = None
+    if timeout is not None:
+        sec = int(timeout)
+        ts = ctypes.byref(_Timespec(sec, int((timeout - sec) * 1e9)))
+
+    ret = _libc.syscall(_SYS_FUTEX, ctypes.c_void_p(addr), _FUTEX_WAIT,
+                        ctypes.c_uint32(expected), ts, None, 0)
+    if ret == -1 and ctypes.get_errno() == 38:   # ENOSYS
+        return False
+    # EAGAIN(값이 이미 바뀜), ETIMEDOUT, EINTR 는 모두 호출한 쪽에서 seq 재확인
+    return True
+
+
+def _wait_word(addr, read_word, ready, timeout):
+    """
+    shm 안의 u32 word 가 ready(word) 를 만족할 때까지 잠듦.
+    만족하면 True, timeout(초) 이 지나면 False.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    while True:
+        word = read_word()
+        if ready(word):
+            return True
+
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+
+        if not _futex_wait(addr, word, remaining):
+            time.sleep(WAIT_POLL_INTERVAL if remaining is None
+                       else min(WAIT_POLL_INTERVAL, remaining))
+
+
+class _ShmSegment:
+    """
+    C++ LeptonThread 가 만든 shm 세그먼트 하나.
+    - 헤더가 있으면 seqlock 으로 찢어지지 않은 프레임만 복사
+    - 헤더가 없는 예전 producer(파일 크기 == 픽셀 크기)면 그냥 복사
+    """
+
+    def __init__(self, path, shape, dtype):
+        data_size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+        with open(path, "rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            has_header = file_size >= data_size + SHM_HEADER_SIZE
+            map_size = data_size + SHM_HEADER_SIZE if has_header else data_size
+            self.mm = mmap.mmap(f.fileno(), map_size, access=mmap.ACCESS_READ)
+
+        self.data = np.frombuffer(self.mm, dtype=dtype,
+                                  count=int(np.prod(shape))).reshape(shape)
+
+        self.hdr32 = None
+        self.hdr64 = None
+        if has_header:
+            hdr32 = np.frombuffer(self.mm, dtype=np.uint32,
+                                  count=SHM_HEADER_SIZE // 4, offset=data_size)
+            if hdr32[0] == SHM_MAGIC and hdr32[1] == SHM_VERSION:
+                self.hdr32 = hdr32
+                self.hdr64 = np.frombuffer(self.mm, dtype=np.uint64,
+                                           count=SHM_HEADER_SIZE // 8, offset=data_size)
+
+    def seq(self):
+        """현재 seq (헤더 없으면 None). 홀수면 C++ 가 쓰는 중"""
+        if self.hdr32 is None:
+            return None
+        return int(self.hdr32[_HDR_SEQ])
+
+    def stats(self):
+        """C++ 가 헤더에 적어둔 캡처 통계 dict (헤더 없으면 None)"""
+        if self.hdr32 is None:
+            return None
+        values = self.hdr32[_HDR_STATS:_HDR_STATS + len(CAPTURE_STATS_FIELDS)]
+        return dict(zip(CAPTURE_STATS_FIELDS, map(int, values)))
+
+    def timestamp(self):
+        """마지막으로 완성된 프레임의 캡처 시각 (헤더 없으면 None)"""
+        if self.hdr64 is None:
+            return None
+        return int(self.hdr64[_HDR_TIMESTAMP])
+
+    def seq_address(self):
+        """futex 로 기다릴 seq 의 메모리 주소 (헤더 없으면 None)"""
+        if self.hdr32 is None:
+            return None
+        return self.hdr32.ctypes.data + _HDR_SEQ * 4
+
+    def read_into(self, out):
+        """
+        seqlock 읽기: seq(짝수) → 복사 → seq 재확인.
+        반환: (seq, timestamp_ns, torn) / 헤더 없으면 (None, None, False)
+        """
+        if self.hdr32 is None:
+            np.copyto(out, self.data)
+            return None, None, False
+
+        hdr32 = self.hdr32
+        # 쓰는 중(홀수)이면 그 직전에 완성된 프레임의 seq
+        last_even = int(hdr32[_HDR_SEQ]) & ~1
+        deadline = time.monotonic() + SEQLOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            seq1 = int(hdr32[_HDR_SEQ])
+            if seq1 & 1:
+                # 아직 C++에서 쓰는 중 → 잠깐 쉬고 재시도
+                time.sleep(0.0002)
+                continue
+            last_even = seq1
+
+            np.copyto(out, self.data)
+            ts = int(self.hdr64[_HDR_TIMESTAMP])
+
+            if int(hdr32[_HDR_SEQ]) == seq1:
+                return seq1, ts, False
+
+        # 계속 찢어지면 마지막 복사본이라도 넘기되 (예전 동작과 동일) torn 으로 표시.
+        # seq 는 마지막으로 본 짝수 seq → 다음 wait 가 같은 프레임으로 바로 깨지 않음
+        np.copyto(out, self.data)
+        return last_even, int(self.hdr64[_HDR_TIMESTAMP]), True
+
+    def close(self):
+        # view 가 살아있으면 mmap.close() 가 BufferError 를 내므로 먼저 해제
+        self.data = None
+        self.hdr32 = None
+        self.hdr64 = None
+        self.mm.close()
+
+
+def _is_new(seq, since_seq):
+    """seq 가 since_seq 이후의 새 프레임인지 (헤더가 없으면 항상 새 프레임으로 취급)"""
+    if seq is None or since_seq is None:
+        return True
+    # 쓰는 중(홀수)이면 직전 완성 프레임은 seq - 1
+    return (seq & ~1) != since_seq
+
+
+class FrameReader:
+    """
+    /dev/shm 세그먼트를 한 번만 mmap 해두고 계속 재사용하는 reader.
+
+    - copy=True  (기본): 미리 할당한 버퍼에 seqlock 으로 온전한 프레임만 복사해서 반환.
+                        매 호출마다 같은 버퍼를 덮어쓰므로 다음 프레임까지 보관하려면 .copy() 필요.
+    - copy=False       : mmap 위의 np.ndarray view 를 그대로 반환 (복사 0번).
+                        C++ 쪽이 계속 덮어쓰므로 읽는 도중 값이 바뀔 수 있음.
+
+    마지막으로 읽은 프레임의 seq / 캡처 시각(time.monotonic_ns 기준)은
+    raw_seq, raw_timestamp_ns, rgb_seq, rgb_timestamp_ns 에 남는다.
+    seqlock 이 SEQLOCK_TIMEOUT 안에 온전한 프레임을 못 얻으면 찢어졌을 수 있는 복사본을 돌려주고
+    raw_torn / rgb_torn 을 True 로, torn_frames 를 1 늘린다.
+    """
+
+    def __init__(self, raw_file=RAW_FILE, rgb_file=RGB_FILE, copy=True):
+        self.raw_file = raw_file
+        self.rgb_file = rgb_file
+        self.copy = copy
+
+        self._raw_seg = None
+        self._rgb_seg = None
+
+        # copy=True 일 때 재사용할 출력 버퍼
+        self._raw_buf = np.empty((HEIGHT, WIDTH), dtype=np.uint16)
+        self._rgb_buf = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+        self.raw_seq = None
+        self.raw_timestamp_ns = None
+        self.rgb_seq = None
+        self.rgb_timestamp_ns = None
+        self.raw_torn = False        # 마지막 프레임이 seqlock 을 포기하고 읽은 것인지
+        self.rgb_torn = False
+        self.torn_frames = 0         # 그렇게 읽은 프레임 수 (RAW + RGB 누적)
+
+    def _raw(self):
+        if self._raw_seg is None:
+            self._raw_seg = _ShmSegment(self.raw_file, (HEIGHT, WIDTH), np.uint16)
+        return self._raw_seg
+
+    def _rgb(self):
+        if self._rgb_seg is None:
+            self._rgb_seg = _ShmSegment(self.rgb_file, (HEIGHT, WIDTH, 3), np.uint8)
+        return self._rgb_seg
+
+    def current_seq(self):
+        """RAW 세그먼트의 현재 seq (헤더 없는 예전 producer 면 None)"""
+        return self._raw().seq()
+
+    def has_new_frame(self, since_seq):
+        """since_seq 이후로 완성된 새 RAW 프레임이 있는지"""
+        return _is_new(self._raw().seq(), since_seq)
+
+    def capture_stats(self):
+        """
+        SPI 캡처 통계 (누적): frames, packets_dropped, crc_errors, discard_packets, resyncs.
+        헤더 없는 예전 producer 면 None.
+        """
+        return self._raw().stats()
+
+    def get_raw16_frame(self, out=None, since_seq=None):
+        """
+        RAW16 프레임 반환.
+        since_seq 를 주면 그 seq 이후 새 프레임이 없을 때 None 반환 (같은 프레임 반복 처리 방지).
+        """
+        seg = self._raw()
+        if not _is_new(seg.seq(), since_seq):
+            return None
+
+        if out is None:
+            if not self.copy:
+                self.raw_seq = seg.seq()
+                return seg.data
+            out = self._raw_buf
+
+        self.raw_seq, self.raw_timestamp_ns, self.raw_torn = seg.read_into(out)
+        self.torn_frames += self.raw_torn
+        return out
+
+    def get_rgb_frame(self, out=None, since_seq=None):
+        seg = self._rgb()
+        if not _is_new(seg.seq(), since_seq):
+            return None
+        if out is None:
+            if not self.copy:
+                self.rgb_seq = seg.seq()
+                return seg.data
+            out = self._rgb_buf
+
+        self.rgb_seq, self.rgb_timestamp_ns, self.rgb_torn = seg.read_into(out)
+        self.torn_frames += self.rgb_torn
+        return out
+
+    def get_frame(self, since_seq=None):
+        """
+        (rgb, raw) 반환.
+        since_seq 를 주면 새 RAW 프레임이 없을 때 None 반환.
+        """
+        if not self.has_new_frame(since_seq):
+            return None
+        return self.get_rgb_frame(), self.get_raw16_frame()
+
+    @staticmethod
+    def _wait_new(seg, since_seq, timeout):
+        """
+        seg 에 since_seq 이후 프레임이 완성될 때까지 잠듦 (timeout 이면 False).
+        C++ 가 seq 에 FUTEX_WAKE 를 걸어주므로 CPU 를 쓰지 않고 기다린다.
+        """
+        if seg.seq() is None:
+            # 헤더 없는 예전 producer: 새 프레임인지 알 수 없으니 한 주기 쉬고 그냥 읽는다
+            time.sleep(WAIT_POLL_INTERVAL if timeout is None
+                       else min(WAIT_POLL_INTERVAL, timeout))
+            return True
+
+        def ready(seq):
+            return not (seq & 1) and _is_new(seq, since_seq)
+
+        return _wait_word(seg.seq_address(), seg.seq, ready, timeout)
+
+    def wait_raw16_frame(self, timeout=None, since_seq=None, out=None):
+        """
+        새 RAW 프레임이 완성될 때까지 잠들었다가 RAW 만 반환 (RGB 는 읽지 않음).
+        since_seq 를 안 주면 마지막으로 읽은 raw_seq 이후, timeout(초) 안에 없으면 None.
+        """
+        if since_seq is None:
+            since_seq = self.raw_seq
+        if not self._wait_new(self._raw(), since_seq, timeout):
+            return None
+        return self.get_raw16_frame(out=out)
+
+    def wait_rgb_frame(self, timeout=None, since_seq=None, out=None):
+        """wait_raw16_frame 의 RGB 판 (RGB 세그먼트의 seq 를 기다림, RAW 는 읽지 않음)"""
+        if since_seq is None:
+            since_seq = self.rgb_seq
+        if not self._wait_new(self._rgb(), since_seq, timeout):
+            return None
+        return self.get_rgb_frame(out=out)
+
+    def wait_frame(self, timeout=None, since_seq=None):
+        """
+        새 RAW 프레임이 완성될 때까지 잠들었다가 (rgb, raw) 반환.
+        - since_seq 를 안 주면 마지막으로 읽은 raw_seq 이후의 프레임을 기다림
+        - timeout(초) 안에 새 프레임이 없으면 None
+        C++ 는 RAW 를 먼저 쓰고 RGB 를 쓰므로, RAW 를 읽은 뒤 RGB 헤더의 캡처 시각이
+        같은 프레임이 될 때까지 (최대 RGB_PAIR_TIMEOUT) 기다렸다가 읽는다 (한 프레임 전 RGB 방지).
+        """
+        raw = self.wait_raw16_frame(timeout=timeout, since_seq=since_seq)
+        if raw is None:
+            return None
+
+        rgb_seg = self._rgb()
+        raw_ts = self.raw_timestamp_ns
+        if raw_ts is not None and rgb_seg.seq() is not None:
+            def ready(seq):
+                ts = rgb_seg.timestamp()
+                return not (seq & 1) and ts is not None and ts >= raw_ts
+
+            _wait_word(rgb_seg.seq_address(), rgb_seg.seq, ready, RGB_PAIR_TIMEOUT)
+        return self.get_rgb_frame(), raw
+
+    def close(self):
+        if self._raw_seg is not None:
+            self._raw_seg.close()
+            self._raw_seg = None
+        if self._rgb_seg is not None:
+            self._rgb_seg.close()
+            self._rgb_seg = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RingReader:
+    """
+    /dev/shm/lepton_ring (C++ 가 최근 depth 개 RAW 프레임을 보관하는 ring buffer) reader.
+
+    - latest()  : 가장 최근 완성 프레임
+    - iter_new(): 마지막으로 본 프레임 이후 것들을 순서대로 (frame_no, timestamp_ns, frame)
+                  너무 밀려서 덮어써진 프레임 수는 dropped 에 누적
+    - stack()   : (depth, 120, 160) zero-copy view (slot 순서, 시간순 아님 → slot_frame_nos() 참고)
+    - wait()    : 새 프레임이 올 때까지 futex 로 잠듦
+
+    latest()/iter_new() 가 돌려주는 배열은 내부 버퍼를 재사용하므로 보관하려면 .copy() 필요.
+    """
+
+    def __init__(self, path=RING_FILE):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.hdr = np.frombuffer(self.mm, dtype=np.uint32, count=SHM_HEADER_SIZE // 4)
+        if self.hdr[0] != RING_MAGIC or self.hdr[1] != RING_VERSION:
+            self.hdr = None
+            self.mm.close()
+            raise ValueError(f"{path} is not a lepton ring buffer (magic/version mismatch)")
+
+        self.depth = int(self.hdr[_RING_DEPTH])
+        self.slots = np.frombuffer(self.mm, dtype=_RING_SLOT_DTYPE, count=self.depth,
+                                   offset=int(self.hdr[_RING_SLOTS_OFFSET]))
+        self.frames = np.frombuffer(self.mm, dtype=np.uint16,
+                                    count=self.depth * HEIGHT * WIDTH,
+                                    offset=int(self.hdr[_RING_FRAMES_OFFSET])
+                                    ).reshape((self.depth, HEIGHT, WIDTH))
+
+        self._seq = self.slots["seq"]
+        self._ts = self.slots["timestamp_ns"]
+        self._buf = np.empty((HEIGHT, WIDTH), dtype=np.uint16)
+
+        self.last_frame_no = 0     # 마지막으로 읽은 frame_no
+        self.timestamp_ns = None   # 마지막으로 읽은 프레임의 캡처 시각
+        self.dropped = 0           # 읽기 전에 덮어써져서 놓친 프레임 수
+
+    def head(self):
+        """가장 최근 완성된 frame_no (0 = 아직 없음)"""
+        return int(self.hdr[_RING_HEAD])
+
+    def _read_slot(self, frame_no, out):
+        """slot seqlock 읽기. 그 사이 덮어써졌으면 None, 아니면 timestamp_ns"""
+        index = frame_no % self.depth
+        expect = 2 * frame_no
+
+        if int(self._seq[index]) != expect:
+            return None
+        np.copyto(out, self.frames[index])
+        ts = int(self._ts[index])
+        if int(self._seq[index]) != expect:
+            return None
+        return ts
+
+    def latest(self, out=None):
+        """가장 최근 프레임 (아직 한 장도 없으면 None)"""
+        if out is None:
+            out = self._buf
+
+        deadline = time.monotonic() + SEQLOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            head = self.head()
+            if head == 0:
+                return None
+            ts = self._read_slot(head, out)
+            if ts is not None:
+                self.last_frame_no = head
+                self.timestamp_ns = ts
+                return out
+        return None
+
+    def iter_new(self, out=None):
+        """마지막으로 본 프레임 이후의 프레임을 오래된 것부터 yield (frame_no, timestamp_ns, frame)"""
+        if out is None:
+            out = self._buf
+
+        head = self.head()
+        start = self.last_frame_no + 1
+
+        # producer 가 다음에 덮어쓸 slot 은 제외하고 가장 오래된 frame_no
+        oldest = max(1, head - self.depth + 2)
+        if start < oldest:
+            self.dropped += oldest - start
+            start = oldest
+
+        for frame_no in range(start, head + 1):
+            self.last_frame_no = frame_no
+            ts = self._read_slot(frame_no, out)
+            if ts is None:
+                self.dropped += 1
+                continue
+            self.timestamp_ns = ts
+            yield frame_no, ts, out
+
+    def stack(self):
+        """(depth, 120, 160) uint16 zero-copy view. C++ 가 계속 덮어쓰므로 필요하면 복사해서 사용"""
+        return self.frames
+
+    def slot_frame_nos(self):
+        """stack() 각 slot 에 들어있는 frame_no (0 = 빈 slot)"""
+        return self.slots["frame_no"].copy()
+
+    def wait(self, timeout=None):
+        """last_frame_no 이후 새 프레임이 올 때까지 잠듦. 오면 True, timeout 이면 False"""
+        last = self.last_frame_no
+        addr = self.hdr.ctypes.data + _RING_HEAD * 4
+        return _wait_word(addr, self.head, lambda head: head != last, timeout)
+
+    def close(self):
+        self.hdr = None
+        self.slots = None
+        self.frames = None
+        self._seq = None
+        self._ts = None
+        self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 기존 스크립트 호환용: 모듈 전역 reader 하나를 만들어 두고 계속 재사용
+# (frame source 는 open_source() 참고, set_source() 로 직접 지정 가능)
+_reader = None
+
+
+def set_source(source):
+    """
+    전역 get_frame()/wait_frame() 이 읽을 frame source 교체.
+    FrameReader 와 같은 메서드(get_frame, wait_frame, get_raw16_frame, get_rgb_frame,
+    wait_raw16_frame, wait_rgb_frame, close)를 가진 객체면 된다. None 이면 다음 호출 때 기본 source 를 다시 연다.
+    """
+    global _reader
+    if _reader is not None and _reader is not source:
+        _reader.close()
+    _reader = source
+
+
+def live_source_selected():
+    """open_source() 가 live shm FrameReader 를 고르는지 (LEPTON_REPLAY / LEPTON_SPI 가 없을 때)"""
+    return not os.environ.get("LEPTON_REPLAY") and not os.environ.get("LEPTON_SPI")
+
+
+def open_source():
+    """
+    환경변수로 frame source 선택 (스크립트 수정 없이 바꿀 수 있게).
+      LEPTON_REPLAY=file.lrec  → replay.ReplayReader
+          LEPTON_REPLAY_SPEED  (0 = 최대 속도, 1 = 녹화 시각대로), LEPTON_REPLAY_LOOP=1 이면 반복
+      LEPTON_SPI=/dev/spidev0.0 → vospi.SpiCapture (C++ Qt 앱 없이 SPI 에서 직접)
+      없으면                    → live shm FrameReader
+    LEPTON_DENOISE=ema[:alpha] / median[:window] 이면 위 source 를 denoise.DenoisedReader 로 감싸서
+    RAW 대신 시간 필터를 거친 RAW 를 돌려준다.
+    """
+    # replay / vospi / denoise 가 read_frame 을 import 하므로 여기서 import
+    replay_path = os.environ.get("LEPTON_REPLAY")
+    spi_device = os.environ.get("LEPTON_SPI")
+    if replay_path:
+        from replay import ReplayReader
+        speed = float(os.environ.get("LEPTON_REPLAY_SPEED", "0"))
+        loop = os.environ.get("LEPTON_REPLAY_LOOP", "0") not in ("", "0")
+        source = ReplayReader(replay_path, speed=speed, loop=loop)
+    elif spi_device:
+        from vospi import SpiCapture
+        source = SpiCapture(spi_device)
+    else:
+        source = FrameReader()
+
+    denoise_spec = os.environ.get("LEPTON_DENOISE")
+    if denoise_spec:
+        from denoise import DenoisedReader, parse_filter_spec
+        source = DenoisedReader(source, parse_filter_spec(denoise_spec))
+    return source
+
+
+def _get_reader():
+    global _reader
+    if _reader is None:
+        _reader = open_source()
+    return _reader
+
+
+def get_source():
+    """전역 frame source (raw_seq / raw_timestamp_ns 등 마지막 프레임 정보를 볼 때)"""
+    return _get_reader()
+
+
 def get_raw16_frame():
-    with open(RAW_FILE, "rb") as f:
-        mm = mmap.mmap(f.fileno(), WIDTH * HEIGHT * 2, access=mmap.ACCESS_READ)
-        data = mm.read(WIDTH * HEIGHT * 2)
-        mm.close()
-    frame = np.frombuffer(data, dtype=np.uint16).reshape((HEIGHT, WIDTH))
-    return frame
+    return _get_reader().get_raw16_frame()
+
 
 def get_rgb_frame():
-    with open(RGB_FILE, "rb") as f:
-        mm = mmap.mmap(f.fileno(), WIDTH * HEIGHT * 3, access=mmap.ACCESS_READ)
-        data = mm.read(WIDTH * HEIGHT * 3)
-        mm.close()
-    frame = np.frombuffer(data, dtype=np.uint8).reshape((HEIGHT, WIDTH, 3))
-    return frame
+    return _get_reader().get_rgb_frame()
+
 
 def get_frame():
-    return get_rgb_frame(), get_raw16_frame()
+    return _get_reader().get_frame()
+
+
+def wait_frame(timeout=None):
+    """직전 get_frame()/wait_frame() 이후의 새 프레임을 기다려 (rgb, raw) 반환, timeout 이면 None"""
+    return _get_reader().wait_frame(timeout=timeout)
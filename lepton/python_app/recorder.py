@@ -0,0 +1,416 @@
+# recorder.py  (RAW16 프레임 무손실 압축 녹화 + 프레임 번호로 바로 찾아가는 index)
+#
+#   녹화 (Pi 에서, C++ 캡처가 돌고 있을 때):
+#     python recorder.py record out.lrcz 900            # 900 프레임 (~100초), zlib
+#     python recorder.py record out.lrcz 900 --codec lzma
+#   기존 .lrec → 압축:
+#     python recorder.py convert in.lrec out.lrcz
+#   정보:
+#     python recorder.py info out.lrcz
+#   재생은 .lrec 와 같음 (replay.open_recording 이 magic 을 보고 구분):
+#     LEPTON_REPLAY=out.lrcz python final_temp.py
+#
+#   코드에서:
+#     rec = CompressedRecorder("out.lrcz")
+#     rec.write(raw_frame, timestamp_ns)      # 복사만 하고 바로 반환, 압축 / 쓰기는 writer 스레드
+#     rec.close()
+#
+# 파일 형식 (.lrcz, little endian)
+#   header 32B : u32 magic "LRCZ", u32 version, u16 width, u16 height, u16 codec, u16 level,
+#                u32 keyframe_interval, u32 index_capacity, u32 count, u32 reserved
+#   index      : index_capacity 개 고정 크기 항목 (u64 offset, u64 timestamp_ns, u32 size, u32 flags)
+#                → 녹화 중에도 N 번째 항목 위치가 정해져 있어 seek / mmap 으로 바로 접근
+#   data       : 프레임마다 압축 블록 하나 (index 뒤부터 이어서)
+# 프레임 인코딩 (무손실, 절대 radiometric 값 그대로)
+#   keyframe (KEYFRAME_INTERVAL 마다): RAW
+#   나머지                            : 이전 프레임과의 차이 (uint16 wrap) 를 zigzag 로 작은 양수로
+#   → 상위 / 하위 바이트를 모아서 (byte shuffle) zlib / lzma
+#   사람이 가만히 있는 열화상은 프레임 차이가 센서 노이즈 정도라 상위 바이트가 거의 0 이 된다.
+# 임의 프레임 읽기는 가장 가까운 앞 keyframe 부터 차이를 더해 복원 (최대 KEYFRAME_INTERVAL - 1 번),
+# 순서대로 읽으면 프레임당 한 번.
+import argparse
+import lzma
+import os
+import queue
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT, FrameReader
+from replay import LRCZ_MAGIC, open_recording
+
+LRCZ_VERSION = 1
+LRCZ_HEADER_SIZE = 32
+
+_HEADER_DTYPE = np.dtype([("magic", "<u4"), ("version", "<u4"),
+                          ("width", "<u2"), ("height", "<u2"),
+                          ("codec", "<u2"), ("level", "<u2"),
+                          ("keyframe_interval", "<u4"), ("index_capacity", "<u4"),
+                          ("count", "<u4"), ("reserved", "<u4")])
+
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("timestamp_ns", "<u8"), ("size", "<u4"), ("flags", "<u4")])
+
+FLAG_KEYFRAME = 1
+
+CODECS = {"zlib": 1, "lzma": 2}
+DEFAULT_CODEC = "zlib"
+# zlib 6: 160x120 한 장 ~1ms (PC), 압축률은 lzma 와 비슷
+DEFAULT_LEVEL = {"zlib": 6, "lzma": 1}
+
+# keyframe 간격 (9Hz 면 10초), 임의 접근 비용과 압축률의 타협
+KEYFRAME_INTERVAL = 90
+
+# index 항목 수 (9Hz 로 약 2시간), 다 차면 이후 프레임은 버리고 dropped 로 셈
+INDEX_CAPACITY = 1 << 16
+
+# writer 스레드가 밀렸을 때 기다릴 수 있는 프레임 수 (넘치면 write() 가 버림)
+QUEUE_FRAMES = 32
+
+
+def _zigzag(d, out):
+    """int16 로 본 차이 → 0, -1, 1, -2 ... 가 0, 1, 2, 3 ... 이 되게 (uint16)"""
+    np.left_shift(d, 1, out=out.view(np.int16))
+    out.view(np.int16)[...] ^= np.right_shift(d, 15)
+    return out
+
+
+def _unzigzag(z, tmp):
+    """_zigzag 역변환, z 를 제자리에서 (uint16 → 같은 비트의 uint16 차이)"""
+    np.bitwise_and(z, 1, out=tmp)
+    np.negative(tmp, out=tmp)              # 0 → 0, 1 → 0xFFFF
+    z >>= 1
+    z ^= tmp
+    return z
+
+
+class _FrameCodec:
+    """프레임 한 장 인코딩 / 디코딩 (버퍼는 한 번만 할당)"""
+
+    def __init__(self, shape, codec, level):
+        self.shape = shape
+        self.codec = codec
+        self.level = level
+        n = shape[0] * shape[1]
+        self._work = np.empty(shape, dtype=np.uint16)
+        self._tmp = np.empty(shape, dtype=np.uint16)
+        self._bytes = self._work.reshape(-1).view(np.uint8).reshape(n, 2)
+        self._shuffled = np.empty(2 * n, dtype=np.uint8)
+        self._n = n
+
+    def _compress(self, data):
+        if self.codec == CODECS["lzma"]:
+            return lzma.compress(data, preset=self.level)
+        return zlib.compress(data, self.level)
+
+    def _decompress(self, data):
+        if self.codec == CODECS["lzma"]:
+            return lzma.decompress(data)
+        return zlib.decompress(data)
+
+    def encode(self, raw, prev=None):
+        """prev 가 None 이면 keyframe. 반환: 압축 bytes"""
+        if prev is None:
+            np.copyto(self._work, raw)
+        else:
+            np.subtract(raw, prev, out=self._tmp)
+            _zigzag(self._tmp.view(np.int16), self._work)
+        n = self._n
+        self._shuffled[:n] = self._bytes[:, 0]
+        self._shuffled[n:] = self._bytes[:, 1]
+        return self._compress(self._shuffled)
+
+    def decode(self, data, out, keyframe):
+        """keyframe 이면 out 에 RAW, 아니면 out(이전 프레임) 에 차이를 더함"""
+        shuffled = np.frombuffer(self._decompress(data), dtype=np.uint8)
+        n = self._n
+        self._bytes[:, 0] = shuffled[:n]
+        self._bytes[:, 1] = shuffled[n:]
+        if keyframe:
+            np.copyto(out, self._work)
+        else:
+            out += _unzigzag(self._work, self._tmp)
+        return out
+
+
+class CompressedRecorder:
+    """
+    RAW16 프레임을 .lrcz 로 녹화. write() 는 미리 할당한 버퍼에 복사만 하고 바로 반환하고,
+    차이 계산 / 압축 / 디스크 쓰기는 writer 스레드에서 한다.
+    writer 가 QUEUE_FRAMES 장 넘게 밀리거나 index 가 다 차면 그 프레임은 버리고 dropped 를 센다
+    (캡처 루프는 디스크를 기다리지 않음).
+    writer 스레드에서 쓰기 / 압축이 실패하면 (ENOSPC, EIO 등) 예외를 error 에 남기고 멈추며,
+    그 뒤 write() / close() 가 그 예외를 다시 던진다.
+    """
+
+    def __init__(self, path, width=WIDTH, height=HEIGHT, codec=DEFAULT_CODEC, level=None,
+                 keyframe_interval=KEYFRAME_INTERVAL, index_capacity=INDEX_CAPACITY,
+                 queue_frames=QUEUE_FRAMES):
+        if codec not in CODECS:
+            raise ValueError(f"unknown codec: {codec} (choices: {', '.join(CODECS)})")
+        self.path = path
+        self.shape = (height, width)
+        self.keyframe_interval = keyframe_interval
+        self.index_capacity = index_capacity
+
+        self.count = 0             # 파일에 쓴 프레임 수
+        self.dropped = 0           # 버린 프레임 수
+        self.bytes_written = 0     # 압축된 데이터 크기 합
+        self.error = None          # writer 스레드가 실패한 예외 (그 뒤 녹화 중단)
+
+        self._header = np.zeros(1, dtype=_HEADER_DTYPE)
+        self._header["magic"] = LRCZ_MAGIC
+        self._header["version"] = LRCZ_VERSION
+        self._header["width"] = width
+        self._header["height"] = height
+        self._header["codec"] = CODECS[codec]
+        self._header["level"] = DEFAULT_LEVEL[codec] if level is None else level
+        self._header["keyframe_interval"] = keyframe_interval
+        self._header["index_capacity"] = index_capacity
+
+        self._codec = _FrameCodec(self.shape, CODECS[codec], int(self._header["level"][0]))
+
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.pwrite(self._fd, self._header.tobytes(), 0)
+        # index 영역을 0 으로 (size 0 = 아직 없는 프레임)
+        os.ftruncate(self._fd, LRCZ_HEADER_SIZE + index_capacity * INDEX_DTYPE.itemsize)
+        self._data_end = LRCZ_HEADER_SIZE + index_capacity * INDEX_DTYPE.itemsize
+        self._entry = np.zeros(1, dtype=INDEX_DTYPE)
+
+        # 프레임 버퍼 pool: free 에서 번호를 꺼내 복사 → pending 으로 writer 에 전달 → 다시 free
+        self._bufs = np.empty((queue_frames,) + self.shape, dtype=np.uint16)
+        self._ts = np.zeros(queue_frames, dtype=np.uint64)
+        self._free = queue.SimpleQueue()
+        for i in range(queue_frames):
+            self._free.put(i)
+        self._pending = queue.SimpleQueue()
+        self._accepted = 0         # writer 로 넘긴 프레임 수 (index 자리 예약용)
+
+        self._prev = np.empty(self.shape, dtype=np.uint16)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, raw_frame, timestamp_ns=None, block=False):
+        """프레임 하나 녹화 요청. 버렸으면 False (block=True 면 버퍼가 빌 때까지 기다림, 변환용)"""
+        if raw_frame.shape != self.shape:
+            raise ValueError(f"frame shape {raw_frame.shape} != {self.shape}")
+        if self._fd is None:
+            raise ValueError("recorder is closed")
+        if self.error is not None:
+            raise self.error
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+
+        if self._accepted >= self.index_capacity:
+            self.dropped += 1
+            return False
+        try:
+            i = self._free.get(block=block)
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        if self.error is not None:
+            # 기다리는 동안 writer 가 실패함
+            self._free.put(i)
+            raise self.error
+        np.copyto(self._bufs[i], raw_frame)
+        self._ts[i] = timestamp_ns
+        self._accepted += 1
+        self._pending.put(i)
+        return True
+
+    def _run(self):
+        while True:
+            i = self._pending.get()
+            if i is None:
+                return
+            try:
+                self._write_frame(i)
+            except Exception as e:       # ENOSPC / EIO, 압축 실패 등
+                self.error = e
+                print(f"[record] writer failed after {self.count} frames: {e!r}", file=sys.stderr)
+                return
+            finally:
+                # 버퍼 반납 (실패했으면 write(block=True) 로 기다리던 쪽을 깨워 error 를 보게)
+                self._free.put(i)
+
+    def _write_frame(self, i):
+        raw = self._bufs[i]
+        keyframe = self.count % self.keyframe_interval == 0
+        data = self._codec.encode(raw, None if keyframe else self._prev)
+        np.copyto(self._prev, raw)
+        ts = self._ts[i]
+
+        # 데이터 먼저, index 항목은 그 다음 (중간에 끊겨도 index 에 있는 프레임은 온전함)
+        os.pwrite(self._fd, data, self._data_end)
+        entry = self._entry
+        entry["offset"] = self._data_end
+        entry["timestamp_ns"] = ts
+        entry["size"] = len(data)
+        entry["flags"] = FLAG_KEYFRAME if keyframe else 0
+        os.pwrite(self._fd, entry.tobytes(),
+                  LRCZ_HEADER_SIZE + self.count * INDEX_DTYPE.itemsize)
+
+        self._data_end += len(data)
+        self.bytes_written += len(data)
+        self.count += 1
+
+    def close(self):
+        """남은 프레임을 다 쓰고 header 의 count 를 갱신 (writer 가 실패했으면 그 예외를 던짐)"""
+        if self._fd is None:
+            return
+        self._pending.put(None)
+        self._thread.join()
+        try:
+            # 실패했어도 그때까지 index 에 들어간 프레임은 읽을 수 있게 count 는 남김
+            self._header["count"] = self.count
+            os.pwrite(self._fd, self._header.tobytes(), 0)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CompressedFrames:
+    """
+    .lrcz 의 프레임들을 (N, H, W) 배열처럼: len(), shape, frames[i] (→ 내부 버퍼, 보관하려면 .copy()).
+    순서대로 읽으면 프레임당 한 번 복원, 건너뛰면 가장 가까운 앞 keyframe 부터.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        header = np.fromfile(path, dtype=_HEADER_DTYPE, count=1)
+        if header.size == 0 or header["magic"][0] != LRCZ_MAGIC or header["version"][0] != LRCZ_VERSION:
+            raise ValueError(f"{path} is not a compressed lepton recording (magic/version mismatch)")
+        header = header[0]
+
+        height, width = int(header["height"]), int(header["width"])
+        capacity = int(header["index_capacity"])
+        self._mm = np.memmap(path, dtype=np.uint8, mode="r")
+        index = np.frombuffer(self._mm, dtype=INDEX_DTYPE, count=capacity, offset=LRCZ_HEADER_SIZE)
+
+        # 녹화 도중 끊긴 파일이면 header count 가 0 → 채워진 index 항목까지
+        empty = np.flatnonzero(index["size"] == 0)
+        count = int(empty[0]) if empty.size else capacity
+        if count == 0:
+            raise ValueError(f"{path} has no frames")
+
+        self.index = index[:count]
+        self.timestamps = self.index["timestamp_ns"]
+        self.shape = (count, height, width)
+        self.codec = int(header["codec"])
+        self.keyframe_interval = int(header["keyframe_interval"])
+        self._keyframes = np.flatnonzero(self.index["flags"] & FLAG_KEYFRAME)
+
+        self._codec = _FrameCodec((height, width), self.codec, int(header["level"]))
+        self._frame = np.empty((height, width), dtype=np.uint16)
+        self._current = -1
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _decode(self, i):
+        entry = self.index[i]
+        offset, size = int(entry["offset"]), int(entry["size"])
+        keyframe = bool(entry["flags"] & FLAG_KEYFRAME)
+        self._codec.decode(self._mm[offset:offset + size], self._frame, keyframe)
+        self._current = i
+
+    def __getitem__(self, i):
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"frame {i} out of range ({len(self)} frames)")
+        if i != self._current:
+            key = int(self._keyframes[np.searchsorted(self._keyframes, i, side="right") - 1])
+            # 지금 위치가 같은 keyframe 구간 안이고 앞이면 거기서부터 이어서
+            start = self._current + 1 if key <= self._current < i else key
+            for j in range(start, i + 1):
+                self._decode(j)
+        return self._frame
+
+    def compressed_size(self):
+        return int(self.index["size"].sum())
+
+
+def open_compressed(path):
+    """.lrcz → (timestamp_ns (N,), CompressedFrames) (replay.open_recording 과 같은 형태)"""
+    frames = CompressedFrames(path)
+    return frames.timestamps, frames
+
+
+def record(path, n_frames, timeout=2.0, **kwargs):
+    """live shm 에서 새 프레임 n_frames 장을 압축 녹화"""
+    with FrameReader() as reader, CompressedRecorder(path, **kwargs) as rec:
+        seen = 0
+        while seen < n_frames:
+            frame = reader.wait_frame(timeout=timeout)
+            if frame is None:
+                print("[record] no frame from /dev/shm (is the capture running?)", file=sys.stderr)
+                break
+            rec.write(frame[1], reader.raw_timestamp_ns)
+            seen += 1
+    return rec
+
+
+def convert(src, dst, **kwargs):
+    """.lrec → .lrcz (파일 변환이라 writer 가 밀리면 버리지 않고 기다림)"""
+    ts, raw = open_recording(src)
+    with CompressedRecorder(dst, width=raw.shape[2], height=raw.shape[1], **kwargs) as rec:
+        for i in range(len(ts)):
+            rec.write(raw[i], int(ts[i]), block=True)
+    return rec
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Compressed lossless RAW16 recorder (.lrcz)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("record")
+    p.add_argument("path")
+    p.add_argument("frames", nargs="?", type=int, default=900)
+    p.add_argument("--codec", choices=list(CODECS), default=DEFAULT_CODEC)
+    p = sub.add_parser("convert")
+    p.add_argument("src")
+    p.add_argument("dst")
+    p.add_argument("--codec", choices=list(CODECS), default=DEFAULT_CODEC)
+    p = sub.add_parser("info")
+    p.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command in ("record", "convert"):
+        t0 = time.monotonic()
+        if args.command == "record":
+            rec = record(args.path, args.frames, codec=args.codec)
+            path = args.path
+        else:
+            rec = convert(args.src, args.dst, codec=args.codec)
+            path = args.dst
+        raw_bytes = rec.count * rec.shape[0] * rec.shape[1] * 2
+        ratio = raw_bytes / rec.bytes_written if rec.bytes_written else 0.0
+        print(f"[record] {path}: {rec.count} frames, {rec.dropped} dropped, "
+              f"{rec.bytes_written / 1024:.0f} KiB ({ratio:.2f}x) in {time.monotonic() - t0:.2f}s")
+    else:
+        frames = CompressedFrames(args.path)
+        ts = frames.timestamps
+        span = (int(ts[-1]) - int(ts[0])) / 1e9
+        rate = (len(ts) - 1) / span if span > 0 else 0.0
+        raw_bytes = len(frames) * frames.shape[1] * frames.shape[2] * 2
+        codec = {v: k for k, v in CODECS.items()}[frames.codec]
+        print(f"{args.path}: {len(frames)} frames {frames.shape[2]}x{frames.shape[1]}, "
+              f"{span:.2f}s ({rate:.1f} Hz), {codec}, keyframe every {frames.keyframe_interval}, "
+              f"{raw_bytes / frames.compressed_size():.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
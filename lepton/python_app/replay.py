@@ -0,0 +1,334 @@
+# replay.py  (녹화된 RAW16 프레임 파일 → read_frame 과 같은 인터페이스로 재생)
+#
+# 하드웨어 없이 final_temp.py 같은 스크립트를 돌리거나 처리량을 재기 위한 frame source.
+#
+#   녹화 (Pi 에서, C++ 캡처가 돌고 있을 때):
+#     python replay.py record out.lrec 900          # 900 프레임 (~100초)
+#   재생 (스크립트 수정 없이 read_frame.get_frame()/wait_frame() 이 파일에서 읽음):
+#     LEPTON_REPLAY=out.lrec python final_temp.py                   # 최대 속도
+#     LEPTON_REPLAY=out.lrec LEPTON_REPLAY_SPEED=1 python final_temp.py  # 녹화 시각대로 (9Hz)
+#     LEPTON_REPLAY_LOOP=1 ...                                       # 끝나면 처음부터 반복
+#   (source 선택은 read_frame.open_source)
+#   파일 정보:
+#     python replay.py info out.lrec
+#
+# 파일 형식 (.lrec, little endian)
+#   header 16B : u32 magic "LREC", u32 version, u16 width, u16 height, u32 reserved
+#   record     : u64 timestamp_ns (CLOCK_MONOTONIC) + width*height u16 RAW
+#   레코드 크기가 고정이라 np.memmap 으로 바로 N 번째 프레임에 접근한다.
+# 무손실 압축 녹화 (.lrcz, 약 1/3 크기) 는 recorder.py, 재생은 같은 방법 (LEPTON_REPLAY=out.lrcz)
+import os
+import sys
+import time
+
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT, FrameReader
+from temp_lut import raw_frame_to_gray_rgb
+
+REC_MAGIC = 0x4345524C   # "LREC"
+REC_VERSION = 1
+REC_HEADER_SIZE = 16
+
+# recorder.py 의 압축 녹화 (.lrcz) magic, open_recording 이 구분용으로만 봄
+LRCZ_MAGIC = 0x5A43524C   # "LRCZ"
+
+_REC_HEADER_DTYPE = np.dtype([("magic", "<u4"), ("version", "<u4"),
+                              ("width", "<u2"), ("height", "<u2"), ("reserved", "<u4")])
+
+# 타임스탬프가 없는(0) 녹화를 실시간 재생할 때 쓰는 프레임 간격 (Lepton 9Hz)
+FRAME_PERIOD_NS = 1_000_000_000 // 9
+
+
+def record_dtype(width=WIDTH, height=HEIGHT):
+    return np.dtype([("timestamp_ns", "<u8"), ("raw", "<u2", (height, width))])
+
+
+class ReplayFinished(SystemExit):
+    """
+    loop=False 로 재생하다 파일 끝에 도달.
+    SystemExit 라서 수정 안 한 스크립트는 그냥 정상 종료되고,
+    필요한 곳에서는 except ReplayFinished 로 잡으면 된다.
+    """
+
+
+class RecordingWriter:
+    """RAW16 프레임을 .lrec 파일에 한 장씩 추가"""
+
+    def __init__(self, path, width=WIDTH, height=HEIGHT):
+        self.path = path
+        self.shape = (height, width)
+        self.count = 0
+
+        header = np.zeros(1, dtype=_REC_HEADER_DTYPE)
+        header["magic"] = REC_MAGIC
+        header["version"] = REC_VERSION
+        header["width"] = width
+        header["height"] = height
+
+        self._f = open(path, "wb")
+        self._f.write(header.tobytes())
+        self._rec = np.zeros(1, dtype=record_dtype(width, height))
+
+    def write(self, raw_frame, timestamp_ns=None):
+        if raw_frame.shape != self.shape:
+            raise ValueError(f"frame shape {raw_frame.shape} != {self.shape}")
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+
+        rec = self._rec
+        rec["timestamp_ns"] = timestamp_ns
+        rec["raw"][0] = raw_frame
+        self._f.write(rec.tobytes())
+        self.count += 1
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_recording(path):
+    """
+    .lrec 파일 → (timestamp_ns (N,), raw (N, H, W)) 읽기 전용 memmap.
+    압축 녹화(.lrcz, recorder.py) 면 raw 는 인덱싱할 때 복원하는 recorder.CompressedFrames
+    """
+    header = np.fromfile(path, dtype=_REC_HEADER_DTYPE, count=1)
+    if header.size and header["magic"][0] == LRCZ_MAGIC:
+        from recorder import open_compressed
+        return open_compressed(path)
+    if header.size == 0 or header["magic"][0] != REC_MAGIC or header["version"][0] != REC_VERSION:
+        raise ValueError(f"{path} is not a lepton recording (magic/version mismatch)")
+
+    dtype = record_dtype(int(header["width"][0]), int(header["height"][0]))
+    # 녹화 도중 끊긴 파일이면 마지막 불완전 레코드는 버림
+    count = (os.path.getsize(path) - REC_HEADER_SIZE) // dtype.itemsize
+    if count == 0:
+        raise ValueError(f"{path} has no frames")
+
+    recs = np.memmap(path, dtype=dtype, mode="r", offset=REC_HEADER_SIZE, shape=(count,))
+    return recs["timestamp_ns"], recs["raw"]
+
+
+class ReplayReader:
+    """
+    .lrec 녹화 파일을 FrameReader 와 같은 인터페이스로 재생.
+
+    speed
+      0   : 최대 속도. get_frame()/wait_frame() 할 때마다 다음 프레임
+      1.0 : 녹화 시각 간격대로 (2.0 이면 2배속)
+            get_frame() 은 지금 시각의 프레임 (live shm 처럼 같은 프레임이 반복될 수 있음),
+            wait_frame() 은 다음 프레임 시각까지 잠듦, 처리가 밀리면 지난 프레임은 건너뜀
+    loop
+      True 면 끝에서 처음으로, False 면 끝에서 처리량을 출력하고 ReplayFinished
+
+    RGB 는 녹화돼 있지 않으므로 RAW 를 회색조로 펴서 3채널로 만든다.
+    raw_seq 는 live shm 처럼 짝수 (2 * (재생 프레임 번호 + 1)) 이고
+    raw_timestamp_ns 는 녹화 당시 캡처 시각.
+    반환 배열은 내부 버퍼를 재사용하므로 보관하려면 .copy() 필요.
+    """
+
+    def __init__(self, path, speed=0.0, loop=False):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+
+        self._ts, self._raw = open_recording(path)
+        self.count = len(self._ts)
+
+        ts = self._ts.astype(np.int64)
+        if self.count > 1 and np.all(ts == ts[0]):
+            ts = np.arange(self.count, dtype=np.int64) * FRAME_PERIOD_NS
+        # 첫 프레임 기준 재생 시각 (초), 한 바퀴 길이 = 마지막 프레임 + 평균 간격
+        self._offsets = (ts - ts[0]) / 1e9
+        period = self._offsets[-1] / (self.count - 1) if self.count > 1 else FRAME_PERIOD_NS / 1e9
+        self._length = self._offsets[-1] + period
+
+        shape = self._raw.shape[1:]
+        self._raw_buf = np.empty(shape, dtype=np.uint16)
+        self._rgb_buf = np.empty(shape + (3,), dtype=np.uint8)
+
+        # 재생 프레임 번호 (loop 하면 count 를 넘어 계속 증가, 파일 위치는 % count)
+        self.frame_no = -1
+        self.served = 0           # 실제로 내보낸 프레임 수 (건너뛴 프레임 제외)
+        self._start = None        # 재생 시작 시각 (time.monotonic)
+
+        self.raw_seq = None
+        self.raw_timestamp_ns = None
+        self.rgb_seq = None
+        self.rgb_timestamp_ns = None
+
+    # ---- 재생 위치 ----
+
+    def _clock(self):
+        """재생 시작 후 흐른 '녹화 기준' 시간 (초)"""
+        if self._start is None:
+            self._start = time.monotonic()
+        return (time.monotonic() - self._start) * self.speed
+
+    def _due(self, frame_no):
+        lap, index = divmod(frame_no, self.count)
+        return lap * self._length + self._offsets[index]
+
+    def _due_frame_no(self, now):
+        """now 시각까지 나왔어야 하는 가장 최근 프레임 번호"""
+        lap, t = divmod(now, self._length)
+        index = int(np.searchsorted(self._offsets, t, side="right")) - 1
+        return int(lap) * self.count + max(0, index)
+
+    def _finish(self):
+        elapsed = 0.0 if self._start is None else time.monotonic() - self._start
+        fps = self.served / elapsed if elapsed > 0 else 0.0
+        print(f"[replay] {self.path}: {self.served} frames in {elapsed:.3f}s ({fps:.1f} fps)",
+              file=sys.stderr)
+        raise ReplayFinished(0)
+
+    def _serve(self, frame_no):
+        # 처리량 측정 시작 = 첫 프레임을 내보낸 시각 (속도와 상관없이)
+        if self._start is None:
+            self._start = time.monotonic()
+        if frame_no >= self.count and not self.loop:
+            self._finish()
+
+        index = frame_no % self.count
+        np.copyto(self._raw_buf, self._raw[index])
+
+        self.frame_no = frame_no
+        self.served += 1
+        self.raw_seq = self.rgb_seq = 2 * (frame_no + 1)
+        self.raw_timestamp_ns = self.rgb_timestamp_ns = int(self._ts[index])
+
+    def _latest_frame_no(self):
+        """지금 내보낼 프레임 번호 (최대 속도면 항상 다음 프레임)"""
+        if self.speed <= 0:
+            return self.frame_no + 1
+        return max(self.frame_no, self._due_frame_no(self._clock()))
+
+    def _rgb(self):
+        return raw_frame_to_gray_rgb(self._raw_buf, out=self._rgb_buf)
+
+    # ---- FrameReader 호환 ----
+
+    def current_seq(self):
+        return self.raw_seq
+
+    def has_new_frame(self, since_seq):
+        if since_seq is None or self.speed <= 0:
+            return True
+        return 2 * (self._latest_frame_no() + 1) != since_seq
+
+    def get_raw16_frame(self, out=None, since_seq=None):
+        if not self.has_new_frame(since_seq):
+            return None
+        frame_no = self._latest_frame_no()
+        if frame_no != self.frame_no:
+            self._serve(frame_no)
+        if out is None:
+            return self._raw_buf
+        np.copyto(out, self._raw_buf)
+        return out
+
+    def get_rgb_frame(self, out=None, since_seq=None):
+        if self.frame_no < 0:
+            self._serve(self._latest_frame_no())
+        rgb = self._rgb()
+        if out is None:
+            return rgb
+        np.copyto(out, rgb)
+        return out
+
+    def get_frame(self, since_seq=None):
+        raw = self.get_raw16_frame(since_seq=since_seq)
+        if raw is None:
+            return None
+        return self._rgb(), raw
+
+    def _wait_next(self, timeout):
+        """다음 프레임까지 잠들었다가 내보냄. 실시간 재생에서 timeout 안에 다음 프레임 시각이 안 오면 False"""
+        if self.speed > 0 and self.frame_no >= 0:
+            now = self._clock()
+            wait = (self._due(self.frame_no + 1) - now) / self.speed
+            if wait > 0:
+                if timeout is not None and wait > timeout:
+                    time.sleep(timeout)
+                    return False
+                time.sleep(wait)
+
+        self._serve(self._latest_frame_no() if self.speed > 0 else self.frame_no + 1)
+        return True
+
+    def wait_frame(self, timeout=None, since_seq=None):
+        """
+        다음 프레임까지 잠들었다가 (rgb, raw) 반환.
+        실시간 재생에서 timeout 안에 다음 프레임 시각이 안 오면 None.
+        """
+        if not self._wait_next(timeout):
+            return None
+        return self._rgb(), self._raw_buf
+
+    def wait_raw16_frame(self, timeout=None, since_seq=None, out=None):
+        """wait_frame 과 같지만 RAW 만 (회색조 RGB 변환 없음)"""
+        if not self._wait_next(timeout):
+            return None
+        if out is None:
+            return self._raw_buf
+        np.copyto(out, self._raw_buf)
+        return out
+
+    def wait_rgb_frame(self, timeout=None, since_seq=None, out=None):
+        if not self._wait_next(timeout):
+            return None
+        rgb = self._rgb()
+        if out is None:
+            return rgb
+        np.copyto(out, rgb)
+        return out
+
+    def close(self):
+        self._ts = None
+        self._raw = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record(path, n_frames, timeout=2.0):
+    """live shm 에서 새 프레임 n_frames 장을 캡처 시각과 함께 녹화"""
+    with FrameReader() as reader, RecordingWriter(path) as writer:
+        while writer.count < n_frames:
+            frame = reader.wait_frame(timeout=timeout)
+            if frame is None:
+                print("[record] no frame from /dev/shm (is the capture running?)", file=sys.stderr)
+                break
+            writer.write(frame[1], reader.raw_timestamp_ns)
+        return writer.count
+
+
+def main(argv):
+    if len(argv) >= 2 and argv[0] == "record":
+        n_frames = int(argv[2]) if len(argv) >= 3 else 900
+        count = record(argv[1], n_frames)
+        print(f"[record] {argv[1]}: {count} frames")
+    elif len(argv) == 2 and argv[0] == "info":
+        ts, raw = open_recording(argv[1])
+        span = (int(ts[-1]) - int(ts[0])) / 1e9
+        rate = (len(ts) - 1) / span if span > 0 else 0.0
+        print(f"{argv[1]}: {len(ts)} frames {raw.shape[2]}x{raw.shape[1]}, "
+              f"{span:.2f}s ({rate:.1f} Hz)")
+    else:
+        print("usage: python replay.py record <out.lrec> [frames] | info <file.lrec>")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,81 @@
+# result_viewer.py  (--headless 로 도는 스크립트의 결과를 받아 화면에 그리는 별도 프로세스)
+#
+#   python final_temp.py --headless --results unix &     # 측정 (창 없음)
+#   python result_viewer.py                              # 필요할 때만 띄워서 보기 (q 로 종료)
+#   python result_viewer.py --socket /tmp/other.sock
+#
+# 측정 쪽은 viewer 가 없으면 결과를 버리기만 하므로 viewer 를 켜고 끄는 것이 측정 루프에 영향을 주지 않는다.
+# 영상은 viewer 가 같은 frame source (/dev/shm, LEPTON_REPLAY 등) 에서 직접 읽고,
+# 박스 / 얼굴 중심 / 온도는 가장 최근에 받은 결과를 겹쳐 그린다.
+import argparse
+
+import cv2
+
+from read_frame import wait_frame
+from agc import Agc
+from results import RESULT_SOCKET, ResultSubscriber
+
+
+def draw_result(vis, result):
+    """결과 한 건(dict) 을 BGR 영상 위에 그리기"""
+    people = result["people"] if result is not None else []
+    for p in people:
+        x1, y1, x2, y2 = p["box"]
+        cv2.rectangle(vis, (x1, y1), (x2, y2), (255, 255, 255), 1)
+
+        if p["center"] is not None:
+            cv2.circle(vis, tuple(p["center"]), 3, (255, 255, 255), -1)
+
+        temp = p["temp"]
+        text = f"Person{p['id']}: {temp:.2f}C" if temp is not None else f"Person{p['id']}: --.-C"
+        cv2.putText(vis, text,
+                    (x1, max(10, y1 - 5)),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.45, (255, 255, 255), 1)
+
+    if not people:
+        cv2.putText(vis, "No person detected",
+                    (5, 15), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.45, (255, 255, 255), 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show results published with --results unix")
+    parser.add_argument("--socket", default=RESULT_SOCKET, help="UNIX datagram socket path")
+    args = parser.parse_args(argv)
+
+    subscriber = ResultSubscriber(args.socket)
+    agc = Agc()
+    result = None
+
+    window_name = "Thermal Results"
+    cv2.namedWindow(window_name)
+
+    try:
+        while True:
+            frame = wait_frame(timeout=0.5)
+            if frame is None:
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+                continue
+            _, raw_frame = frame
+
+            latest = subscriber.latest()
+            if latest is not None:
+                result = latest
+
+            vis = cv2.cvtColor(agc.apply(raw_frame), cv2.COLOR_GRAY2BGR)
+            draw_result(vis, result)
+            cv2.imshow(window_name, vis)
+
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        subscriber.close()
+        cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
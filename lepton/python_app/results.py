@@ -0,0 +1,147 @@
+# results.py  (검출/온도 결과를 화면 대신 JSON lines / UNIX socket 으로 내보내기)
+#
+#   python final_temp.py --headless                         # 창 없이, 결과는 stdout 에 JSON 한 줄씩
+#   python final_temp.py --headless --results out.jsonl     # 파일에 추가
+#   python final_temp.py --headless --results unix          # UNIX datagram socket (RESULT_SOCKET)
+#   python result_viewer.py                                 # 위 socket 을 받아 화면에 그리는 별도 프로세스
+#
+# 한 줄(= datagram 하나) 형식:
+#   {"seq": 1234, "ts_ns": 123456789, "people": [
+#       {"id": 1, "box": [x1, y1, x2, y2], "center": [cx, cy], "temp": 36.21}, ...]}
+#   seq / ts_ns 는 frame source 의 raw_seq / 캡처 시각 (time.monotonic_ns 기준),
+#   스크립트에 따라 people 항목에 "source" 같은 값이 더 붙거나 최상위에 통계가 붙는다.
+import errno
+import json
+import os
+import socket
+import sys
+
+# --results unix 일 때 쓰는 datagram socket 경로 (result_viewer.py 가 bind)
+RESULT_SOCKET = "/tmp/lepton_results.sock"
+
+
+def add_output_args(parser):
+    """argparse 에 --headless / --results 추가"""
+    parser.add_argument("--headless", action="store_true",
+                        help="no window / drawing; publish results instead (default: JSON lines on stdout)")
+    parser.add_argument("--results", default=None,
+                        help="where to publish results: '-' (stdout), a .jsonl file path, "
+                             f"'unix' ({RESULT_SOCKET}) or 'unix:<path>'")
+
+
+def open_publisher(args):
+    """--results 가 있거나 --headless 면 ResultPublisher, 아니면 None"""
+    target = args.results
+    if target is None:
+        if not args.headless:
+            return None
+        target = "-"
+    return ResultPublisher(target)
+
+
+def person(track_id, box, center=None, temp=None, **extra):
+    """people 항목 하나 (numpy 정수/실수도 JSON 으로 나가게 변환)"""
+    item = {
+        "id": int(track_id),
+        "box": [int(v) for v in box],
+        "center": None if center is None else [int(center[0]), int(center[1])],
+        "temp": None if temp is None else round(float(temp), 2),
+    }
+    item.update(extra)
+    return item
+
+
+class ResultPublisher:
+    """
+    결과 한 건 = JSON 한 줄.
+
+    target
+      "-" / "stdout"  : 표준출력 (줄마다 flush)
+      "unix"          : RESULT_SOCKET 으로 datagram
+      "unix:<path>"   : <path> 로 datagram
+      그 외           : 파일에 추가
+    UNIX socket 은 non-blocking 이라 받는 쪽이 없거나 밀려 있으면 그 결과는 버리고 dropped 만 센다
+    (메인 루프가 viewer 때문에 멈추지 않게).
+    """
+
+    def __init__(self, target="-"):
+        self.target = target
+        self.sent = 0
+        self.dropped = 0
+
+        self._sock = None
+        self._file = None
+        self._close_file = False
+
+        if target in ("-", "stdout"):
+            self._file = sys.stdout
+        elif target == "unix" or target.startswith("unix:"):
+            self._path = RESULT_SOCKET if target == "unix" else target[len("unix:"):]
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sock.setblocking(False)
+        else:
+            self._file = open(target, "a", buffering=1)
+            self._close_file = True
+
+    def publish(self, seq, timestamp_ns, people, **extra):
+        msg = {"seq": seq, "ts_ns": timestamp_ns, "people": people}
+        msg.update(extra)
+        line = json.dumps(msg, separators=(",", ":"))
+
+        if self._sock is None:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.sent += 1
+            return
+
+        try:
+            self._sock.sendto(line.encode(), self._path)
+            self.sent += 1
+        except OSError as e:
+            # viewer 없음(ENOENT / ECONNREFUSED) 이나 버퍼 가득(EAGAIN) 은 조용히 버림
+            if e.errno not in (errno.ENOENT, errno.ECONNREFUSED, errno.EAGAIN, errno.EWOULDBLOCK):
+                raise
+            self.dropped += 1
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._close_file:
+            self._file.close()
+        self._file = None
+
+
+class ResultSubscriber:
+    """
+    ResultPublisher("unix...") 의 받는 쪽. socket 을 bind 해두고 latest() 로 가장 최근 결과만.
+    """
+
+    def __init__(self, path=RESULT_SOCKET):
+        self.path = path
+        if os.path.exists(path):
+            os.unlink(path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(path)
+        self._sock.setblocking(False)
+        self.received = 0
+
+    def latest(self):
+        """쌓인 datagram 을 다 읽고 마지막 것만 dict 로 (새 결과 없으면 None)"""
+        data = None
+        while True:
+            try:
+                data = self._sock.recv(65536)
+                self.received += 1
+            except BlockingIOError:
+                break
+        if data is None:
+            return None
+        return json.loads(data)
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
@@ -1,47 +1,36 @@
 import os
-import mmap
 import time
 
-import numpy as np
 import cv2
 
-WIDTH = 160   # Lepton 3.5
-HEIGHT = 120
-CHANNELS = 3
-SHM_NAME = "/dev/shm/lepton_frame"
+from read_frame import open_source, live_source_selected, RGB_FILE
 
-FRAME_SIZE = WIDTH * HEIGHT * CHANNELS
+SHM_NAME = RGB_FILE
 
 def main():
-    print("Waiting for shared memory...")
-
     # C++에서 shm_open으로 만든 /lepton_frame은
     # 리눅스에서 /dev/shm/lepton_frame 파일로 보인다.
-    while not os.path.exists(SHM_NAME):
-        time.sleep(0.05)
+    # (LEPTON_REPLAY / LEPTON_SPI 면 기다리지 않고 그 source 에서, 회색조 RGB)
+    if live_source_selected():
+        print("Waiting for shared memory...")
+        while not os.path.exists(SHM_NAME):
+            time.sleep(0.05)
 
-    fd = os.open(SHM_NAME, os.O_RDONLY)
-    mm = mmap.mmap(fd, FRAME_SIZE, mmap.MAP_SHARED, mmap.PROT_READ)
+    reader = open_source()
 
     try:
         while True:
-            mm.seek(0)
-            buf = mm.read(FRAME_SIZE)
-
-            if len(buf) != FRAME_SIZE:
-                # 아직 C++에서 완전히 쓰기 전일 수 있음 → 스킵
-                continue
-
-            frame = np.frombuffer(buf, dtype=np.uint8)
-            frame = frame.reshape((HEIGHT, WIDTH, CHANNELS))
+            # 새 RGB 프레임이 완성될 때까지 잠들어 있음 (timeout 이면 None)
+            # RGB 세그먼트의 seq 를 기다리므로 RAW 만 바뀐 시점에 이전 RGB 를 보여주지 않음
+            rgb = reader.wait_rgb_frame(timeout=0.5)
 
-            cv2.imshow("Lepton 3.5 via Shared Memory", frame)
+            if rgb is not None:
+                cv2.imshow("Lepton 3.5 via Shared Memory", rgb)
 
             if cv2.waitKey(1) & 0xFF == 27:  # ESC
                 break
     finally:
-        mm.close()
-        os.close(fd)
+        reader.close()
         cv2.destroyAllWindows()
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+# temp_lut.py  (Lepton RAW16 → 섭씨 / 화면용 8bit 변환 lookup table)
+#
+# Lepton radiometric 출력은 0~65535 로 범위가 정해진 정수라서
+# 프레임 전체 변환을 float64 계산 대신 65536 칸짜리 표 한 번 np.take 로 처리한다.
+from functools import lru_cache
+
+import numpy as np
+
+RAW_LEVELS = 65536
+
+# raw 를 화면용 범위로 잡을 때 반올림 단위 (50 = 0.5°C)
+# 범위가 조금씩 흔들려도 같은 LUT 를 재사용하고 화면 깜빡임도 줄어든다
+DISPLAY_RANGE_STEP = 50
+
+
+def raw_to_celsius(raw_val: float, offset: float = 0.0) -> float:
+    """
+    Radiometric Lepton 3.x 가정:
+    raw ≈ Kelvin * 100  =>  T(°C) = raw/100 - 273.15 (+ offset 보정)
+    평균 raw 처럼 정수가 아닌 값도 받으므로 스칼라는 계산식 그대로 사용.
+    """
+    return raw_val * 0.01 - 273.15 + offset
+
+
+def celsius_to_raw(temp_c: float, offset: float = 0.0) -> int:
+    """raw_to_celsius 의 역변환 (가장 가까운 정수 raw, 0~65535 로 clip)"""
+    raw = int(round((temp_c - offset + 273.15) * 100.0))
+    return max(0, min(RAW_LEVELS - 1, raw))
+
+
+@lru_cache(maxsize=8)
+def celsius_lut(offset: float = 0.0):
+    """raw → °C float32 표 (offset 에 SKIN_OFFSET 같은 보정값을 넣으면 미리 더해둠)"""
+    lut = np.arange(RAW_LEVELS, dtype=np.float64) * 0.01 - 273.15 + offset
+    lut = lut.astype(np.float32)
+    lut.flags.writeable = False
+    return lut
+
+
+def raw_frame_to_celsius(raw_frame, offset: float = 0.0, out=None):
+    """RAW16 프레임 → °C float32 프레임 (np.take 한 번, out 을 주면 그 버퍼에 씀)"""
+    return np.take(celsius_lut(offset), raw_frame, out=out)
+
+
+@lru_cache(maxsize=32)
+def display_lut(raw_min: int, raw_max: int):
+    """raw_min~raw_max 를 0~255 로 펴는 uint8 표 (범위 밖은 0 / 255)"""
+    if raw_max <= raw_min:
+        raw_max = raw_min + 1
+    lut = np.arange(RAW_LEVELS, dtype=np.float32)
+    lut -= raw_min
+    lut *= 255.0 / (raw_max - raw_min)
+    np.clip(lut, 0, 255, out=lut)
+    lut = lut.astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+
+def display_range(raw_frame, step=DISPLAY_RANGE_STEP):
+    """프레임 min/max 를 step 단위로 바깥쪽으로 반올림한 (raw_min, raw_max)"""
+    raw_min = int(raw_frame.min()) // step * step
+    raw_max = -(-int(raw_frame.max()) // step) * step
+    return raw_min, raw_max
+
+
+def raw_frame_to_display(raw_frame, raw_min=None, raw_max=None, out=None):
+    """
+    RAW16 프레임 → 화면용 uint8 (np.take 한 번).
+    범위를 안 주면 프레임 min/max (display_range) 사용.
+    """
+    if raw_min is None or raw_max is None:
+        raw_min, raw_max = display_range(raw_frame)
+    return np.take(display_lut(raw_min, raw_max), raw_frame, out=out)
+
+
+def raw_frame_to_gray_rgb(raw_frame, out=None):
+    """
+    RAW16 프레임 → 회색조 3채널 uint8 (H, W, 3).
+    C++ 가 만든 컬러 프레임이 없는 frame source (replay / SPI 직접 읽기) 의 rgb 대용.
+    """
+    gray = raw_frame_to_display(raw_frame)
+    if out is None:
+        out = np.empty(raw_frame.shape + (3,), dtype=np.uint8)
+    np.copyto(out, gray[..., None])
+    return out
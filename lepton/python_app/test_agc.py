@@ -0,0 +1,63 @@
+# test_agc.py  (python -m pytest lepton/python_app)
+import numpy as np
+import pytest
+
+from agc import Agc, MIN_SPAN
+
+
+def make_frame(rng, n_people):
+    """22°C 배경(위아래 ±1°C 기울기) + 사람 크기 뜨거운 사각형 + 노이즈 + dead pixel (RAW16, 0.01K)"""
+    raw = rng.normal(29515, 15, size=(120, 160)) + np.linspace(-100, 100, 120)[:, None]
+    for _ in range(n_people):
+        x, y = rng.integers(0, 140), rng.integers(0, 80)
+        raw[y:y + 40, x:x + 20] += rng.uniform(800, 1300)
+    raw = np.rint(raw).astype(np.uint16)
+    raw[rng.random(raw.shape) < 0.002] = 0
+    return raw
+
+
+def reference_stretch(raw_frame):
+    """예전 final_temp.stretch_raw_to_grayscale (유효 픽셀 min/max 선형, float64)"""
+    valid = raw_frame[raw_frame > 0]
+    raw_min, raw_max = int(valid.min()), int(valid.max())
+    if raw_max - raw_min < MIN_SPAN:
+        raw_max = raw_min + MIN_SPAN
+    stretched = (raw_frame.astype(np.float64) - raw_min) * (255.0 / (raw_max - raw_min))
+    return np.clip(stretched, 0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("n_people", [0, 3])
+def test_linear_matches_reference_stretch(n_people):
+    raw = make_frame(np.random.default_rng(n_people), n_people)
+    out = Agc(smoothing=1.0).apply(raw)
+    valid = raw > 0
+    diff = np.abs(out.astype(int) - reference_stretch(raw).astype(int))
+    assert diff[valid].max() <= 1
+    # dead pixel 은 항상 0
+    assert np.all(out[~valid] == 0)
+
+
+def test_flat_frame_does_not_divide_by_zero():
+    raw = np.full((120, 160), 30000, dtype=np.uint16)
+    for mode in ("linear", "equalize"):
+        out = Agc(mode=mode).apply(raw)
+        assert out.dtype == np.uint8
+    assert np.all(Agc().apply(np.zeros((120, 160), dtype=np.uint16)) == 0)
+
+
+def test_smoothing_follows_range_gradually():
+    agc = Agc(smoothing=0.5)
+    cold = np.full((120, 160), 29000, dtype=np.uint16)
+    cold[0, 0] = 30000
+    agc.apply(cold)
+    hot = cold + np.uint16(1000)
+    agc.apply(hot)
+    # 범위가 한 번에 점프하지 않고 절반만 따라감
+    assert 29000 < agc.lo < 30000
+
+
+def test_equalize_is_monotonic():
+    raw = make_frame(np.random.default_rng(5), 2)
+    out = Agc(mode="equalize", smoothing=1.0).apply(raw)
+    order = np.argsort(raw[raw > 0], kind="stable")
+    assert np.all(np.diff(out[raw > 0][order].astype(int)) >= 0)
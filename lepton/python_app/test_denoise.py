@@ -0,0 +1,47 @@
+# test_denoise.py  (python -m pytest lepton/python_app)
+import numpy as np
+import pytest
+
+from denoise import TemporalFilter, parse_filter_spec, MOTION_THRESHOLD
+
+
+def frames(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(29000, 31000, size=(n, 120, 160), dtype=np.uint16)
+
+
+@pytest.mark.parametrize("window", [1, 2, 3, 4, 5])
+def test_median_matches_numpy(window):
+    stack = frames(8)
+    stack[:, :2, :2] = 0
+    filt = TemporalFilter("median", window=window)
+    for i, raw in enumerate(stack):
+        out = filt.update(raw)
+        if i + 1 >= window:
+            recent = stack[i + 1 - window:i + 1]
+            expected = np.sort(recent, axis=0)[window // 2]
+            expected[raw == 0] = 0
+            np.testing.assert_array_equal(out, expected)
+
+
+def test_ema_smooths_noise_and_resets_on_motion():
+    filt = TemporalFilter("ema", alpha=0.5)
+    base = np.full((120, 160), 30000, dtype=np.uint16)
+    filt.update(base)
+    noisy = base + np.uint16(20)
+    out = filt.update(noisy)
+    assert np.all(out == 30010)
+
+    moved = base + np.uint16(MOTION_THRESHOLD * 2)
+    np.testing.assert_array_equal(filt.update(moved), moved)
+
+    dead = moved.copy()
+    dead[5, 5] = 0
+    assert filt.update(dead)[5, 5] == 0
+
+
+def test_parse_filter_spec():
+    assert parse_filter_spec("ema:0.2").alpha == 0.2
+    assert parse_filter_spec("median:5").window == 5
+    with pytest.raises(ValueError):
+        parse_filter_spec("gauss")
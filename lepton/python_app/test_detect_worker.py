@@ -0,0 +1,125 @@
+# test_detect_worker.py  (python -m pytest lepton/python_app)
+import threading
+import time
+
+import numpy as np
+
+from detect_worker import (DETECTORS, Detector, DetectionWorker, register_detector, yolo_person_boxes,
+                           yolo_person_boxes_batch)
+
+
+def poll_until(worker, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = worker.poll()
+        if result is not None:
+            return result
+        time.sleep(0.001)
+    return None
+
+
+def test_worker_processes_only_the_latest_frame():
+    started, release = threading.Event(), threading.Event()
+    seen = []
+
+    def detect(image):
+        seen.append(int(image[0, 0]))
+        started.set()
+        release.wait(1.0)
+        return [(0, 0, int(image[0, 0]), 1)]
+
+    worker = DetectionWorker(detect).start()
+    try:
+        image = np.zeros((4, 4), dtype=np.uint8)
+        image[0, 0] = 1
+        worker.submit(image, 1)
+        assert started.wait(1.0)
+        for seq in (2, 3, 4):                   # 추론 중에 들어온 프레임은 마지막 것만 남음
+            image[0, 0] = seq                   # submit 이 복사하므로 덮어써도 됨
+            worker.submit(image, seq)
+        assert worker.dropped == 2 and worker.busy()
+        release.set()
+
+        # poll 하기 전에 끝난 결과는 더 새 결과로 덮어써질 수 있음 (1 은 건너뛸 수도)
+        results = [poll_until(worker)]
+        if results[0][0] != 4:
+            results.append(poll_until(worker))
+        assert results[-1] == (4, [(0, 0, 4, 1)])
+        assert [seq for seq, _ in results] in ([1, 4], [4])
+        assert worker.poll() is None
+        assert worker.latest == (4, [(0, 0, 4, 1)])
+        t0, t1 = worker.result_ns
+        assert t0 <= t1
+    finally:
+        worker.stop()
+    assert seen == [1, 4]
+
+
+def test_worker_load_failure_disables_detection():
+    def load():
+        raise ImportError("no ultralytics")
+
+    worker = DetectionWorker(load_fn=load).start()
+    worker._thread.join(1.0)
+    worker.submit(np.zeros((4, 4), dtype=np.uint8), 1)
+    assert isinstance(worker.error, ImportError)
+    assert not worker.ready() and not worker.busy()
+    assert worker.poll() is None
+    worker.stop()
+
+
+def test_detect_error_marks_detector_failed():
+    def detect(raw):
+        if raw[0, 0] == 2:
+            raise RuntimeError("bad input")
+        return [(0, 0, 1, 1)]
+
+    register_detector("broken", lambda: detect, background=True)
+    try:
+        detector = Detector("broken", interval=0.0)
+        worker = detector._worker
+        raw = np.ones((4, 4), dtype=np.uint16)
+        worker.submit(raw, 1)
+        assert poll_until(worker) == (1, [(0, 0, 1, 1)])
+
+        worker.submit(raw * 2, 2)
+        worker._thread.join(1.0)
+        assert isinstance(worker.error, RuntimeError)
+        assert not worker.ready() and not worker.busy()
+        assert detector.step(3, 1.0, raw, None) is None
+        assert detector.status() == "broken: failed"
+        detector.stop()
+    finally:
+        del DETECTORS["broken"]
+
+
+def test_registered_detector_runs_every_frame():
+    register_detector("fake", lambda: lambda raw: [(1, 2, 3, 4)] if raw.any() else [])
+    try:
+        detector = Detector("fake")
+        assert detector.ready()
+        raw = np.ones((4, 4), dtype=np.uint16)
+        assert detector.step(7, 0.0, raw, None) == (7, [(1, 2, 3, 4)])
+        assert detector.status().startswith("fake: ready")
+    finally:
+        del DETECTORS["fake"]
+
+
+class RecordingModel:
+    """ultralytics 모델 대신 호출 인자만 기록 (결과 없음)"""
+
+    def __init__(self):
+        self.kwargs = []
+
+    def __call__(self, images, **kwargs):
+        self.kwargs.append(kwargs)
+        return []
+
+
+def test_yolo_calls_are_quiet():
+    # ultralytics 는 verbose 가 켜져 있으면 추론마다 stdout 에 요약을 찍어 --headless 출력이 깨짐
+    model = RecordingModel()
+    image = np.zeros((120, 160, 3), dtype=np.uint8)
+    assert yolo_person_boxes(model, image) == []
+    assert yolo_person_boxes_batch(model, [image, image]) == []
+    assert all(kw.get("verbose") is False for kw in model.kwargs)
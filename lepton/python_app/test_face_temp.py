@@ -0,0 +1,104 @@
+# test_face_temp.py  (python -m pytest lepton/python_app)
+import numpy as np
+import pytest
+
+from face_temp import (find_face_center, refine_face_center, frame_integrals,
+                       face_raw_from_center, face_raw_from_centers)
+from read_frame import WIDTH, HEIGHT
+
+
+def make_scene(rng, n_people):
+    """
+    합성 RAW16 장면: 배경 + 사람(몸통 사각형 + 위쪽 가운데 얼굴) + 노이즈 + dead pixel.
+    반환: (raw, 사람 박스 [(x1, y1, x2, y2)], 얼굴 중심 [(x, y)])
+    """
+    temp = 22.0 + rng.normal(0.0, 0.1, size=(HEIGHT, WIDTH))
+    boxes, centers = [], []
+    for _ in range(n_people):
+        w, h = int(rng.integers(12, 30)), int(rng.integers(30, 70))
+        x1, y1 = int(rng.integers(0, WIDTH - w)), int(rng.integers(0, HEIGHT - h // 2))
+        x2, y2 = x1 + w, min(HEIGHT - 1, y1 + h)
+        head_h = max(4, h // 5)
+        temp[y1 + head_h:y2, x1:x2] = 31.0 + rng.uniform(-1.0, 1.0)
+        cx, cy, r = x1 + w // 2, y1 + head_h // 2 + 1, max(2, w // 5)
+        temp[max(0, cy - r):cy + r + 1, cx - r:cx + r + 1] = 35.0 + rng.uniform(-0.7, 0.7)
+        boxes.append((x1, y1, x2, y2))
+        centers.append((cx, cy))
+    raw = np.rint((temp + 273.15) * 100.0).astype(np.uint16)
+    raw[rng.random(raw.shape) < 0.002] = 0
+    return raw, boxes, centers
+
+
+def reference_face_center(raw_frame, box, prev_center=None, grid_rows=6, grid_cols=4):
+    """summed-area table 전의 칸별 loop 버전 (예전 final_temp.find_face_center)"""
+    x1, y1, x2, y2 = box
+    x1 = max(0, min(WIDTH - 1, x1))
+    x2 = max(0, min(WIDTH - 1, x2))
+    y1 = max(0, min(HEIGHT - 1, y1))
+    y2 = max(0, min(HEIGHT - 1, y2))
+    if x2 <= x1 or y2 <= y1:
+        return prev_center
+    H = y2 - y1
+    sy1 = max(0, min(HEIGHT - 1, int(y1 + H * 0.10)))
+    sy2 = max(0, min(HEIGHT, int(y1 + H * 0.80)))
+    sx1 = max(0, min(WIDTH - 1, x1))
+    sx2 = max(0, min(WIDTH, x2))
+    if sy2 <= sy1 or sx2 <= sx1:
+        return prev_center
+    cell_h = (sy2 - sy1) / grid_rows
+    cell_w = (sx2 - sx1) / grid_cols
+    best_mean, best_center = None, None
+    for r in range(grid_rows):
+        cy1, cy2 = int(sy1 + r * cell_h), int(sy1 + (r + 1) * cell_h)
+        for c in range(grid_cols):
+            cx1, cx2 = int(sx1 + c * cell_w), int(sx1 + (c + 1) * cell_w)
+            patch = raw_frame[cy1:cy2, cx1:cx2]
+            valid = patch[patch > 0]
+            if valid.size == 0:
+                continue
+            mean_val = float(valid.mean())
+            if best_mean is None or mean_val > best_mean:
+                best_mean = mean_val
+                best_center = ((cx1 + cx2) // 2, (cy1 + cy2) // 2)
+    if best_center is None:
+        return prev_center
+    if prev_center is not None:
+        return (int(0.5 * best_center[0] + 0.5 * prev_center[0]),
+                int(0.5 * best_center[1] + 0.5 * prev_center[1]))
+    return best_center
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_find_face_center_matches_loop_version(seed):
+    raw, boxes, _ = make_scene(np.random.default_rng(seed), 5)
+    integrals = frame_integrals(raw)
+    for box in boxes + [(0, 0, 159, 119), (10, 10, 10, 50)]:
+        assert find_face_center(raw, box) == reference_face_center(raw, box)
+        assert find_face_center(raw, box, integrals=integrals) == reference_face_center(raw, box)
+        assert find_face_center(raw, box, prev_center=(80, 60)) == \
+            reference_face_center(raw, box, prev_center=(80, 60))
+
+
+def test_refine_moves_toward_hot_spot_and_stays_on_it():
+    raw = np.full((HEIGHT, WIDTH), 29500, dtype=np.uint16)
+    raw[57:64, 87:94] = 30800          # (90, 60) 중심 7x7
+    center = (85, 58)
+    for _ in range(10):
+        center = refine_face_center(raw, center)
+    assert center == (90, 60)
+    assert refine_face_center(raw, center) == (90, 60)
+    assert refine_face_center(raw, None) is None
+
+
+@pytest.mark.parametrize("n_people", [1, 3, 6])
+def test_batched_face_raw_matches_single(n_people):
+    raw, _, centers = make_scene(np.random.default_rng(n_people), n_people)
+    centers = centers + [None, (2, 2), (WIDTH - 1, HEIGHT - 1)]
+    ratios = [0.05 + 0.01 * i for i in range(len(centers))]
+    batched = face_raw_from_centers(raw, centers, hot_ratios=ratios)
+    for center, ratio, value in zip(centers, ratios, batched):
+        single = face_raw_from_center(raw, center, hot_ratio=ratio)
+        if single is None:
+            assert value is None
+        else:
+            assert value == pytest.approx(single)
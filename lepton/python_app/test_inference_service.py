@@ -0,0 +1,108 @@
+# test_inference_service.py  (python -m pytest lepton/python_app)
+import time
+
+import numpy as np
+import pytest
+
+import inference_service
+from inference_service import InferenceService
+from read_frame import WIDTH, HEIGHT
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """모델 대신 batch 크기를 기록하고 장마다 gray 평균을 박스로 돌려주는 검출기"""
+    sizes = []
+
+    def load(max_batch):
+        def detect(grays):
+            sizes.append(len(grays))
+            return [[(0, 0, int(gray.mean()), 1)] for gray in grays]
+        return detect
+
+    monkeypatch.setitem(inference_service.BATCH_DETECTORS, "fake", load)
+    return sizes
+
+
+def poll_until(service, camera, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = service.poll(camera)
+        if result is not None:
+            return result
+        time.sleep(0.001)
+    return None
+
+
+def frame(value):
+    raw = np.full((HEIGHT, WIDTH), 30000, dtype=np.uint16)
+    raw[:, :WIDTH // 2] += value
+    return raw
+
+
+def test_cameras_are_batched_and_keep_latest(batches):
+    service = InferenceService("fake", max_batch=4, gather_time=0.5)
+    service.submit("a", frame(100), 1)
+    service.submit("a", frame(200), 2)          # a 의 이전 프레임은 버림
+    service.submit("b", frame(300), 7)
+    service.start()
+    try:
+        seq_a, boxes_a = poll_until(service, "a")
+        seq_b, boxes_b = poll_until(service, "b")
+    finally:
+        service.stop()
+
+    assert (seq_a, seq_b) == (2, 7)
+    assert len(boxes_a) == len(boxes_b) == 1
+    assert batches == [2]                        # 카메라 두 대가 한 번의 forward 로
+    stats = service.stats()
+    assert stats["cameras"]["a"] == {"frames": 1, "dropped": 1}
+    assert stats["mean_batch"] == 2.0
+    assert service.poll("a") is None and service.poll("missing") is None
+
+
+def test_batch_is_capped_at_max_batch(batches):
+    service = InferenceService("fake", max_batch=2, gather_time=0.0)
+    for i, camera in enumerate("abc"):
+        service.submit(camera, frame(i), i)
+    service.start()
+    try:
+        assert all(poll_until(service, camera) is not None for camera in "abc")
+    finally:
+        service.stop()
+    assert batches == [2, 1]
+
+
+def test_unknown_detector():
+    with pytest.raises(ValueError):
+        InferenceService("nope")
+
+
+@pytest.mark.parametrize("name", ["rec.lrec", "rec.lrcz"])
+def test_open_camera_replays_recordings(tmp_path, name):
+    from recorder import CompressedRecorder
+    from replay import RecordingWriter, ReplayReader
+
+    path = str(tmp_path / name)
+    with (CompressedRecorder(path) if name.endswith(".lrcz") else RecordingWriter(path)) as rec:
+        rec.write(frame(7), 1000)
+    source = inference_service.open_camera(path)
+    assert isinstance(source, ReplayReader)
+    np.testing.assert_array_equal(source.wait_frame(timeout=1.0)[1], frame(7))
+
+
+def test_detect_error_stops_service(monkeypatch):
+    def load(max_batch):
+        def detect(grays):
+            raise RuntimeError("bad batch")
+        return detect
+
+    monkeypatch.setitem(inference_service.BATCH_DETECTORS, "broken", load)
+    service = InferenceService("broken", gather_time=0.0).start()
+    service.submit("a", frame(1), 1)
+    service._thread.join(1.0)
+    assert isinstance(service.error, RuntimeError)
+    assert not service.ready()
+    service.submit("a", frame(2), 2)
+    assert service.poll("a") is None and service.stats()["frames"] == 0
+    service.stop()
@@ -0,0 +1,47 @@
+# test_latency.py  (python -m pytest lepton/python_app)
+import json
+import time
+
+from latency import CAPTURE, DETECT_END, DETECT_START, MAX_CAPTURE_AGE_NS, TEMP, LatencyMonitor
+
+MS = 1_000_000
+
+
+def test_intervals_and_dropped_frames(tmp_path):
+    lat = LatencyMonitor(str(tmp_path / "lat.json"), window=8, dump_interval=3600)
+    for seq in (2, 4, 10, 12):                 # 10 앞에서 2 프레임 빠짐 (seq 는 프레임당 2)
+        lat.begin(seq, time.monotonic_ns() - 5 * MS)
+        read_ns = lat._row[1]
+        lat.mark(TEMP, read_ns + 2 * MS)
+        lat.end()
+
+    stats = lat.stats()
+    assert (stats["frames"], stats["dropped"], stats["window"]) == (4, 2, 4)
+    read_temp = stats["intervals"]["read->temp"]
+    assert read_temp["count"] == 4
+    assert read_temp["p50"] == read_temp["max"] == 2.0
+    assert 5.0 <= stats["intervals"]["capture->read"]["p50"] < 1000
+    # 감지 결과가 없던 프레임은 detect 구간에서 빠짐
+    assert stats["intervals"]["detect"] == {"count": 0}
+
+
+def test_window_wraps_and_ignores_foreign_clock(tmp_path):
+    lat = LatencyMonitor(str(tmp_path / "lat.json"), window=4, dump_interval=3600)
+    for i in range(10):
+        lat.begin(capture_ns=time.monotonic_ns() - MAX_CAPTURE_AGE_NS - 1)   # 녹화 시각 등
+        lat.mark(DETECT_START, 1000)
+        lat.mark(DETECT_END, 1000 + i * MS)
+    stats = lat.stats()
+    assert stats["window"] == 4
+    assert stats["intervals"]["detect"]["max"] == 9.0
+    assert stats["intervals"]["capture->read"]["count"] == 0
+    assert (lat._stamps[:, CAPTURE] == 0).all()
+
+
+def test_dump_writes_whole_file(tmp_path):
+    path = tmp_path / "lat.json"
+    lat = LatencyMonitor(str(path), window=4, dump_interval=0)
+    lat.begin(2)
+    lat.end()                                  # dump_interval 0 → 바로 dump
+    assert json.loads(path.read_text())["frames"] == 1
+    assert not (tmp_path / "lat.json.tmp").exists()
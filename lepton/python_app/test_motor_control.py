@@ -0,0 +1,59 @@
+# test_motor_control.py  (python -m pytest lepton/python_app)
+import time
+
+from motor_control import FakePwm, ServoController, angle_to_duty
+
+
+def duty_to_angle(duty):
+    return (duty - 2.0) * 18.0
+
+
+def test_slew_limit_and_release():
+    pwm = FakePwm()
+    servo = ServoController(pwm, max_speed=200.0, rate=100.0, release_after=0.05,
+                            initial_angle=90.0).start()
+    try:
+        t0 = time.monotonic()
+        servo.set_target(130.0)
+        assert servo.wait(timeout=2.0)
+        assert time.monotonic() - t0 >= 40.0 / 200.0 * 0.9
+        time.sleep(0.2)
+    finally:
+        servo.stop()
+
+    writes = [(t, duty_to_angle(d)) for t, d in pwm.history if d > 0]
+    assert writes[0][1] == 90.0 and writes[-1][1] == 130.0
+    period = 1.0 / servo.rate
+    for (t_a, a), (t_b, b) in zip(writes, writes[1:]):
+        assert b >= a                                   # 목표 쪽으로만
+        assert b - a <= 200.0 * (t_b - t_a + period) + 1e-6
+    # 중간 값은 min_step 이상 바뀔 때만 씀
+    middle = [a for _, a in writes[1:-1]]
+    assert all(b - a >= servo.min_step for a, b in zip([90.0] + middle, middle))
+    # 도착 후 release_after 가 지나면 펄스를 끔
+    assert 0 in [d for _, d in pwm.history[:-1]]
+
+
+def test_targets_coalesce_to_latest():
+    pwm = FakePwm()
+    servo = ServoController(pwm, max_speed=1000.0, rate=200.0, release_after=None, initial_angle=90.0)
+    for angle in (100.0, 60.0, 200.0):                  # 스레드가 반영하기 전에 계속 덮어씀
+        servo.set_target(angle)
+    assert (servo.commands, servo.coalesced, servo.target) == (3, 2, 180.0)
+
+    servo.start()
+    try:
+        assert servo.wait(timeout=2.0)
+    finally:
+        servo.stop()
+    assert servo.angle == 180.0
+    assert angle_to_duty(60.0) not in [d for _, d in pwm.history]
+
+
+def test_angle_at_uses_history():
+    servo = ServoController(FakePwm(), initial_angle=90.0)
+    t = time.monotonic()
+    servo._history.extend([(t + 1, 100.0), (t + 2, 110.0)])
+    assert servo.angle_at(t - 10) == 90.0
+    assert servo.angle_at(t + 1.5) == 100.0
+    assert servo.angle_at(t + 5) == 110.0
@@ -0,0 +1,46 @@
+# test_onnx_detect.py  (python -m pytest lepton/python_app)
+# 모델 파일 없이 후처리만 (forward 는 yolov8n.onnx 가 있어야 해서 여기서는 다루지 않음)
+from types import SimpleNamespace
+
+import numpy as np
+
+from onnx_detect import PAD_Y, PERSON_CLASS, OnnxPersonDetector, nms
+from tracker import iou_matrix
+
+
+def greedy_nms(boxes, scores, threshold):
+    """한 박스씩 비교하는 기준 구현"""
+    keep = []
+    for i in np.argsort(-scores, kind="stable"):
+        if all(iou_matrix(boxes[i:i + 1], boxes[j:j + 1])[0, 0] <= threshold for j in keep):
+            keep.append(i)
+    return keep
+
+
+def test_nms_matches_greedy_reference():
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        xy = rng.uniform(0, 120, size=(30, 2))
+        wh = rng.uniform(5, 40, size=(30, 2))
+        boxes = np.hstack([xy, xy + wh])
+        scores = rng.uniform(0, 1, size=30)
+        assert nms(boxes, scores, 0.5).tolist() == greedy_nms(boxes, scores, 0.5)
+
+
+def test_postprocess_removes_padding_and_overlaps():
+    # 후보 하나 = (cx, cy, w, h, person 점수, 다른 class 점수), 모델 출력은 (4 + classes, N)
+    pred = np.array([
+        (40, 30 + PAD_Y, 20, 40, 0.9, 0.0),
+        (41, 31 + PAD_Y, 20, 40, 0.8, 0.0),     # 첫 번째와 거의 겹침 → 억제
+        (150, 60 + PAD_Y, 40, 20, 0.6, 0.0),    # 오른쪽 끝을 넘음 → clip
+        (100, 60 + PAD_Y, 20, 20, 0.1, 0.99),   # person 점수 conf 미만
+    ], dtype=np.float32).T
+    assert PERSON_CLASS == 0
+    boxes, scores = OnnxPersonDetector.postprocess(SimpleNamespace(conf=0.25, iou=0.7), pred)
+    assert boxes == [(30, 10, 50, 50), (130, 50, 159, 70)]
+    np.testing.assert_allclose(scores, [0.9, 0.6], rtol=1e-6)
+
+
+def test_postprocess_without_candidates():
+    pred = np.zeros((84, 10), dtype=np.float32)
+    assert OnnxPersonDetector.postprocess(SimpleNamespace(conf=0.25, iou=0.7), pred) == ([], [])
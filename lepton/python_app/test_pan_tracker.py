@@ -0,0 +1,62 @@
+# test_pan_tracker.py  (python -m pytest lepton/python_app)
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from motor_control import FakePwm, ServoController
+from pan_tracker import PanTracker, select_target
+from read_frame import WIDTH
+
+
+def track(track_id, temp, center=(80, 60)):
+    return SimpleNamespace(id=track_id, temp=temp, shifted_center=lambda: center)
+
+
+def center_x(pan, servo, bearing, t_ns):
+    """서보 좌표계에서 고정된 방향 bearing 에 있는 사람이 캡처 시각 화면에 보이는 x"""
+    return (WIDTH - 1) / 2.0 + (bearing - servo.angle_at(t_ns / 1e9)) / pan.deg_per_px
+
+
+def test_pid_settles_on_person_and_holds_still():
+    servo = ServoController(FakePwm(), release_after=0.1, initial_angle=90.0).start()
+    try:
+        pan = PanTracker(servo)
+        person_bearing = 110.0
+        commands = []
+        for _ in range(60):                          # 실제 시계로 ~30Hz, 서보는 slew limit 으로 따라감
+            now_ns = time.monotonic_ns()
+            pan.update((center_x(pan, servo, person_bearing, now_ns), 60), now_ns)
+            commands.append(servo.commands)
+            time.sleep(0.03)
+        time.sleep(0.2)
+    finally:
+        servo.stop()
+
+    assert servo.angle == pytest.approx(person_bearing, abs=pan.deadband)
+    # 도착한 뒤로는 명령이 없음 (남은 integral 로 조금씩 밀리지 않음) → 펄스도 꺼짐
+    assert commands[-20:] == [commands[-1]] * 20
+    assert pan.integral == 0.0
+    assert 0 in [duty for _, duty in servo.backend.history[1:]]
+
+
+def test_deadband_sends_no_command():
+    servo = ServoController(FakePwm(), initial_angle=90.0)
+    pan = PanTracker(servo)
+    assert pan.update(((WIDTH - 1) / 2.0 + 1, 60)) == 0.0
+    assert servo.commands == 0
+
+
+def test_direction_flips_command():
+    servo = ServoController(FakePwm(), initial_angle=90.0)
+    PanTracker(servo, direction=-1).update((WIDTH - 1, 60))
+    assert servo.commands == 1 and servo.target < 90.0
+
+
+def test_select_target_hysteresis():
+    a, b = track(1, 36.0), track(2, 36.3)
+    assert select_target([a, b]) is b                 # 처음엔 가장 뜨거운 사람
+    assert select_target([a, b], current_id=1) is a   # 0.3°C 차이는 바꾸지 않음
+    c = track(2, 36.8)
+    assert select_target([a, c], current_id=1) is c
+    assert select_target([track(3, None), track(4, 37.0, center=None)]) is None
@@ -0,0 +1,237 @@
+# test_read_frame.py  (python -m pytest lepton/python_app)
+#
+# C++ LeptonThread 대신 ShmProducer 가 같은 레이아웃(LeptonShm.h)으로 tmp 파일에 프레임을 쓴다.
+import ctypes
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import read_frame
+from read_frame import (FrameReader, RingReader, WIDTH, HEIGHT, SHM_MAGIC, SHM_VERSION, SHM_HEADER_SIZE,
+                        RING_MAGIC, RING_VERSION, SEQLOCK_TIMEOUT)
+
+_FUTEX_WAKE = 1
+
+
+def futex_wake(addr):
+    if read_frame._libc is not None:
+        read_frame._libc.syscall(read_frame._SYS_FUTEX, ctypes.c_void_p(addr), _FUTEX_WAKE,
+                                 ctypes.c_int(2 ** 31 - 1), None, None, 0)
+
+
+class ShmProducer:
+    """pixel + seqlock 헤더 세그먼트 하나를 LeptonThread 처럼 쓰는 테스트용 producer"""
+
+    def __init__(self, path, shape, dtype):
+        self.data_size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(path, "wb") as f:
+            f.truncate(self.data_size + SHM_HEADER_SIZE)
+        self.mm = np.memmap(path, dtype=np.uint8, mode="r+")
+        self.data = self.mm[:self.data_size].view(dtype).reshape(shape)
+        self.hdr32 = self.mm[self.data_size:].view(np.uint32)
+        self.hdr64 = self.mm[self.data_size:].view(np.uint64)
+        self.hdr32[0] = SHM_MAGIC
+        self.hdr32[1] = SHM_VERSION
+        self.hdr32[3] = SHM_HEADER_SIZE
+
+    @property
+    def seq(self):
+        return int(self.hdr32[2])
+
+    def begin(self):
+        self.hdr32[2] += 1
+
+    def end(self, timestamp_ns):
+        self.hdr64[2] = timestamp_ns
+        self.hdr32[2] += 1
+        futex_wake(self.hdr32.ctypes.data + 2 * 4)
+
+    def write(self, frame, timestamp_ns):
+        self.begin()
+        self.data[...] = frame
+        self.end(timestamp_ns)
+
+
+class RingProducer:
+    """lepton_ring_init / lepton_ring_push (LeptonShm.h) 와 같은 레이아웃"""
+
+    def __init__(self, path, depth):
+        slots_bytes = (depth * 16 + 63) & ~63
+        frames_offset = SHM_HEADER_SIZE + slots_bytes
+        with open(path, "wb") as f:
+            f.truncate(frames_offset + depth * HEIGHT * WIDTH * 2)
+        self.mm = np.memmap(path, dtype=np.uint8, mode="r+")
+        self.hdr = self.mm[:SHM_HEADER_SIZE].view(np.uint32)
+        self.slots = self.mm[SHM_HEADER_SIZE:SHM_HEADER_SIZE + depth * 16].view(read_frame._RING_SLOT_DTYPE)
+        self.frames = self.mm[frames_offset:].view(np.uint16).reshape(depth, HEIGHT, WIDTH)
+        self.depth = depth
+        self.hdr[1:6] = (RING_VERSION, depth, 0, SHM_HEADER_SIZE, frames_offset)
+        self.hdr[0] = RING_MAGIC
+
+    def push(self, value, timestamp_ns):
+        frame_no = int(self.hdr[3]) + 1
+        slot = self.slots[frame_no % self.depth]
+        slot["seq"] = 2 * frame_no - 1
+        self.frames[frame_no % self.depth] = value
+        slot["frame_no"] = frame_no
+        slot["timestamp_ns"] = timestamp_ns
+        slot["seq"] = 2 * frame_no
+        self.hdr[3] = frame_no
+        futex_wake(self.hdr.ctypes.data + 3 * 4)
+
+
+@pytest.fixture
+def shm(tmp_path):
+    raw = ShmProducer(str(tmp_path / "raw"), (HEIGHT, WIDTH), np.uint16)
+    rgb = ShmProducer(str(tmp_path / "rgb"), (HEIGHT, WIDTH, 3), np.uint8)
+    reader = FrameReader(raw_file=str(tmp_path / "raw"), rgb_file=str(tmp_path / "rgb"))
+    yield raw, rgb, reader
+    reader.close()
+
+
+def publish(raw, rgb, n, rgb_delay=0.0):
+    """프레임 n: RAW 값 n, RGB 값 n, 같은 캡처 시각 (C++ 처럼 RAW 먼저)"""
+    ts = 1_000_000 * n
+    raw.write(np.full((HEIGHT, WIDTH), n, dtype=np.uint16), ts)
+    if rgb_delay:
+        time.sleep(rgb_delay)
+    rgb.write(np.full((HEIGHT, WIDTH, 3), n, dtype=np.uint8), ts)
+
+
+def test_wait_frame_returns_rgb_of_the_same_capture(shm):
+    raw, rgb, reader = shm
+    publish(raw, rgb, 1)
+    assert reader.wait_frame(timeout=0.1) is not None
+
+    # RAW 가 깨운 뒤 RGB 는 10ms 늦게 → 이전 프레임(1) RGB 가 아니라 2 를 받아야 함
+    producer = threading.Thread(target=publish, args=(raw, rgb, 2, 0.01))
+    producer.start()
+    frame = reader.wait_frame(timeout=1.0)
+    producer.join()
+
+    assert frame is not None
+    rgb_frame, raw_frame = frame
+    assert raw_frame[0, 0] == 2
+    assert rgb_frame[0, 0, 0] == 2
+    assert reader.raw_timestamp_ns == reader.rgb_timestamp_ns == 2_000_000
+
+
+def test_wait_frame_times_out_without_new_frame(shm):
+    raw, rgb, reader = shm
+    publish(raw, rgb, 1)
+    assert reader.wait_frame(timeout=0.1) is not None
+    t0 = time.monotonic()
+    assert reader.wait_frame(timeout=0.05) is None
+    assert time.monotonic() - t0 < 0.5
+
+
+def test_wait_raw16_frame_does_not_read_rgb(shm):
+    raw, rgb, reader = shm
+    raw.write(np.full((HEIGHT, WIDTH), 7, dtype=np.uint16), 7)
+    out = reader.wait_raw16_frame(timeout=0.1)
+    assert out[0, 0] == 7
+    assert reader.raw_seq == raw.seq
+    assert reader.rgb_seq is None
+
+
+def test_wait_rgb_frame_waits_on_rgb_segment(shm):
+    raw, rgb, reader = shm
+    publish(raw, rgb, 3)
+    assert reader.wait_rgb_frame(timeout=0.1)[0, 0, 0] == 3
+    # RAW 만 새로 와도 RGB 는 새 프레임이 아님
+    raw.write(np.full((HEIGHT, WIDTH), 4, dtype=np.uint16), 4)
+    assert reader.wait_rgb_frame(timeout=0.05) is None
+    rgb.write(np.full((HEIGHT, WIDTH, 3), 4, dtype=np.uint8), 4)
+    assert reader.wait_rgb_frame(timeout=0.1)[0, 0, 0] == 4
+
+
+def test_seqlock_waits_for_writer_to_finish(shm, monkeypatch):
+    raw, rgb, reader = shm
+    monkeypatch.setattr(read_frame, "SEQLOCK_TIMEOUT", 1.0)   # 느린 CI 에서도 writer 를 기다리게
+    raw.write(np.full((HEIGHT, WIDTH), 1, dtype=np.uint16), 1)
+    raw.begin()                                  # 쓰는 중 (seq 홀수)
+    raw.data[:HEIGHT // 2] = 2                   # 반만 쓴 프레임
+
+    def finish():
+        time.sleep(0.01)
+        raw.data[...] = 2
+        raw.end(2)
+
+    writer = threading.Thread(target=finish)
+    writer.start()
+    out = reader.get_raw16_frame()
+    writer.join()
+    assert (out == 2).all()
+    assert (reader.raw_seq, reader.raw_timestamp_ns) == (raw.seq, 2)
+
+
+def test_seqlock_gives_up_on_stuck_writer(shm):
+    raw, rgb, reader = shm
+    raw.write(np.full((HEIGHT, WIDTH), 1, dtype=np.uint16), 1)
+    raw.begin()
+    t0 = time.monotonic()
+    reader.get_raw16_frame()
+    assert time.monotonic() - t0 >= SEQLOCK_TIMEOUT
+    assert reader.raw_torn and reader.torn_frames == 1   # 온전한 프레임이라는 보장 없음
+    assert reader.raw_seq == 2                   # 마지막으로 완성된 프레임 기준
+    assert reader.has_new_frame(2) is False      # 쓰는 중이면 직전 완성 프레임 기준
+    assert reader.wait_raw16_frame(timeout=0.05) is None
+
+    raw.data[...] = 5
+    raw.end(2)
+    frame = reader.wait_raw16_frame(timeout=1.0)
+    assert frame is not None and (frame == 5).all()
+    assert (reader.raw_seq, reader.raw_torn, reader.torn_frames) == (4, False, 1)
+    assert reader.wait_raw16_frame(timeout=0.05) is None
+
+
+@pytest.fixture
+def ring(tmp_path):
+    producer = RingProducer(str(tmp_path / "ring"), depth=4)
+    reader = RingReader(str(tmp_path / "ring"))
+    yield producer, reader
+    reader.close()
+
+
+def test_ring_latest_and_iter_new_in_order(ring):
+    producer, reader = ring
+    assert reader.latest() is None
+    for n in (1, 2, 3):
+        producer.push(n, 100 * n)
+    assert reader.latest()[0, 0] == 3 and reader.timestamp_ns == 300
+
+    reader.last_frame_no = 0
+    got = [(no, ts, int(frame[0, 0])) for no, ts, frame in reader.iter_new()]
+    assert got == [(1, 100, 1), (2, 200, 2), (3, 300, 3)]
+    assert list(reader.iter_new()) == []
+
+
+def test_ring_counts_overwritten_frames(ring):
+    producer, reader = ring
+    for n in range(1, 11):
+        producer.push(n, n)
+    # depth 4, 다음에 덮어쓸 slot 제외 → 최근 3 장만 남고 1..7 은 놓침
+    assert [no for no, _, _ in reader.iter_new()] == [8, 9, 10]
+    assert reader.dropped == 7
+    assert sorted(reader.slot_frame_nos()) == [7, 8, 9, 10]
+
+
+def test_ring_skips_slot_being_rewritten(ring):
+    producer, reader = ring
+    for n in (1, 2, 3):
+        producer.push(n, n)
+    producer.slots[1]["seq"] = 2 * 5 - 1        # frame 1 자리를 frame 5 가 쓰는 중
+    assert [no for no, _, _ in reader.iter_new()] == [2, 3]
+    assert reader.dropped == 1
+
+
+def test_ring_wait(ring):
+    producer, reader = ring
+    producer.push(1, 1)
+    reader.latest()
+    assert reader.wait(timeout=0.02) is False
+    threading.Timer(0.01, producer.push, args=(2, 2)).start()
+    assert reader.wait(timeout=1.0) is True
+    assert reader.head() == 2
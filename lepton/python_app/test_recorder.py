@@ -0,0 +1,140 @@
+# test_recorder.py  (python -m pytest lepton/python_app)
+import errno
+import os
+
+import numpy as np
+import pytest
+
+from recorder import (INDEX_DTYPE, LRCZ_HEADER_SIZE, CompressedFrames, CompressedRecorder,
+                      _unzigzag, _zigzag, convert)
+from replay import RecordingWriter, ReplayReader, open_recording
+
+SHAPE = (12, 16)
+
+
+@pytest.fixture
+def frames():
+    """drift + 노이즈 (차이가 음수 / 0 / 큰 값 / uint16 wrap 모두 나오게)"""
+    rng = np.random.default_rng(1)
+    base = rng.integers(29000, 31000, size=SHAPE)
+    out = np.array([base + 5 * i + rng.integers(-3, 4, size=SHAPE) for i in range(25)], dtype=np.uint16)
+    out[10, 0, 0] = 0
+    out[11, 0, 0] = 65535
+    return out
+
+
+def record(path, frames, **kwargs):
+    with CompressedRecorder(str(path), width=SHAPE[1], height=SHAPE[0], **kwargs) as rec:
+        for i, frame in enumerate(frames):
+            assert rec.write(frame, 1000 + i, block=True)
+    return rec
+
+
+def test_zigzag_roundtrip():
+    d = np.arange(-32768, 32768, dtype=np.int32).astype(np.int16).reshape(256, 256)
+    z = _zigzag(d, np.empty(d.shape, dtype=np.uint16))
+    assert z[d == 0] == 0 and z[d == -1] == 1 and z[d == 1] == 2
+    np.testing.assert_array_equal(_unzigzag(z, np.empty_like(z)).view(np.int16), d)
+
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma"])
+def test_lossless_roundtrip(tmp_path, frames, codec):
+    path = tmp_path / "rec.lrcz"
+    rec = record(path, frames, codec=codec, keyframe_interval=8)
+    assert (rec.count, rec.dropped) == (len(frames), 0)
+
+    ts, raw = open_recording(str(path))
+    assert raw.shape == frames.shape
+    np.testing.assert_array_equal(ts, 1000 + np.arange(len(frames)))
+    for i in range(len(frames)):
+        np.testing.assert_array_equal(raw[i], frames[i])
+
+
+def test_random_seek(tmp_path, frames):
+    path = tmp_path / "rec.lrcz"
+    record(path, frames, keyframe_interval=8)
+    raw = CompressedFrames(str(path))
+    for i in (20, 3, 3, 17, 0, -1, 9, 8, 23):
+        np.testing.assert_array_equal(raw[i], frames[i])
+    with pytest.raises(IndexError):
+        raw[len(frames)]
+
+
+def test_full_index_drops(tmp_path, frames):
+    with CompressedRecorder(str(tmp_path / "rec.lrcz"), width=SHAPE[1], height=SHAPE[0],
+                            index_capacity=10) as rec:
+        accepted = [rec.write(frame, block=True) for frame in frames]
+    assert accepted == [True] * 10 + [False] * 15
+    assert (rec.count, rec.dropped) == (10, 15)
+
+
+def test_disk_full_stops_recorder_and_reports(tmp_path, frames, monkeypatch):
+    path = tmp_path / "rec.lrcz"
+    rec = CompressedRecorder(str(path), width=SHAPE[1], height=SHAPE[0])
+    disk_end = rec._data_end + 1000     # 프레임 몇 장 뒤 디스크가 참
+    pwrite = os.pwrite
+
+    def full_pwrite(fd, data, offset):
+        if offset + len(data) > disk_end:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return pwrite(fd, data, offset)
+
+    monkeypatch.setattr(os, "pwrite", full_pwrite)
+    # 큐에 들어간 뒤 실패하면 write() 가 아니라 close() 에서 나옴 → 어느 쪽이든 같은 예외
+    with pytest.raises(OSError) as e:
+        with rec:
+            for frame in frames:
+                rec.write(frame, block=True)
+    assert e.value.errno == errno.ENOSPC
+    assert rec.error is e.value and 0 < rec.count < len(frames)
+    monkeypatch.undo()
+
+    # 실패 전까지 쓴 프레임은 그대로 읽힘
+    raw = CompressedFrames(str(path))
+    assert len(raw) == rec.count
+    np.testing.assert_array_equal(raw[rec.count - 1], frames[rec.count - 1])
+
+
+def test_codec_error_fails_next_write(tmp_path, frames, monkeypatch):
+    rec = CompressedRecorder(str(tmp_path / "rec.lrcz"), width=SHAPE[1], height=SHAPE[0])
+
+    def broken(raw, prev=None):
+        raise MemoryError("codec")
+
+    monkeypatch.setattr(rec._codec, "encode", broken)
+    assert rec.write(frames[0], block=True)
+    rec._thread.join(timeout=1.0)
+    assert isinstance(rec.error, MemoryError)
+    with pytest.raises(MemoryError):
+        rec.write(frames[1], block=True)
+    with pytest.raises(MemoryError):
+        rec.close()
+    assert rec.count == 0
+
+
+def test_interrupted_recording_uses_filled_index(tmp_path, frames):
+    path = tmp_path / "rec.lrcz"
+    record(path, frames, keyframe_interval=8)
+    # 녹화 중 끊긴 파일처럼: header count 0, 7 번째 이후 index 비어 있음
+    data = bytearray(path.read_bytes())
+    data[24:28] = bytes(4)
+    start = LRCZ_HEADER_SIZE + 7 * INDEX_DTYPE.itemsize
+    data[start:LRCZ_HEADER_SIZE + len(frames) * INDEX_DTYPE.itemsize] = bytes(
+        (len(frames) - 7) * INDEX_DTYPE.itemsize)
+    path.write_bytes(bytes(data))
+
+    raw = CompressedFrames(str(path))
+    assert len(raw) == 7
+    np.testing.assert_array_equal(raw[6], frames[6])
+
+
+def test_convert_and_replay(tmp_path, frames):
+    src, dst = tmp_path / "rec.lrec", tmp_path / "rec.lrcz"
+    with RecordingWriter(str(src), width=SHAPE[1], height=SHAPE[0]) as writer:
+        for i, frame in enumerate(frames):
+            writer.write(frame, 1000 + i)
+    convert(str(src), str(dst), keyframe_interval=8)
+
+    with ReplayReader(str(dst), speed=0) as reader:
+        got = [reader.wait_frame(timeout=1.0)[1].copy() for _ in range(len(frames))]
+    np.testing.assert_array_equal(np.array(got), frames)
@@ -0,0 +1,77 @@
+# test_replay.py  (python -m pytest lepton/python_app)
+import re
+
+import numpy as np
+import pytest
+
+from replay import RecordingWriter, ReplayReader, ReplayFinished, open_recording
+
+N_FRAMES = 60
+
+
+@pytest.fixture
+def recording(tmp_path):
+    path = str(tmp_path / "t.lrec")
+    rng = np.random.default_rng(0)
+    frames = rng.integers(29000, 31000, size=(N_FRAMES, 120, 160), dtype=np.uint16)
+    with RecordingWriter(path) as rec:
+        for i, frame in enumerate(frames):
+            rec.write(frame, 1_000_000 + i * 111_111_111)
+    return path, frames
+
+
+def test_open_recording_roundtrip(recording):
+    path, frames = recording
+    ts, raw = open_recording(path)
+    assert len(ts) == N_FRAMES
+    assert int(ts[1]) - int(ts[0]) == 111_111_111
+    np.testing.assert_array_equal(raw, frames)
+
+
+@pytest.mark.parametrize("method", ["wait_frame", "get_frame"])
+def test_max_speed_serves_every_frame_and_reports_fps(recording, capsys, method):
+    path, frames = recording
+    reader = ReplayReader(path, speed=0)
+    seqs = []
+    with pytest.raises(ReplayFinished):
+        while True:
+            _, raw = getattr(reader, method)()
+            np.testing.assert_array_equal(raw, frames[reader.frame_no])
+            seqs.append(reader.raw_seq)
+    assert seqs == [2 * (i + 1) for i in range(N_FRAMES)]
+
+    m = re.search(r"(\d+) frames in ([\d.]+)s \(([\d.]+) fps\)", capsys.readouterr().err)
+    assert m is not None
+    served, fps = int(m.group(1)), float(m.group(3))
+    assert served == N_FRAMES
+    assert fps > 0
+
+
+def test_loop_wraps_to_first_frame(recording):
+    path, frames = recording
+    reader = ReplayReader(path, speed=0, loop=True)
+    for _ in range(N_FRAMES + 1):
+        _, raw = reader.wait_frame()
+    np.testing.assert_array_equal(raw, frames[0])
+    assert reader.raw_seq == 2 * (N_FRAMES + 1)
+
+
+def test_single_segment_waits(recording):
+    path, frames = recording
+    reader = ReplayReader(path, speed=0)
+    np.testing.assert_array_equal(reader.wait_raw16_frame(), frames[0])
+    rgb = reader.wait_rgb_frame()
+    assert rgb.shape == (120, 160, 3)
+    assert reader.frame_no == 1
+
+
+def test_open_source_selects_replay(recording, monkeypatch):
+    import read_frame
+    path, frames = recording
+    monkeypatch.setenv("LEPTON_REPLAY", path)
+    monkeypatch.delenv("LEPTON_SPI", raising=False)
+    monkeypatch.delenv("LEPTON_DENOISE", raising=False)
+    assert not read_frame.live_source_selected()
+    source = read_frame.open_source()
+    assert isinstance(source, ReplayReader)
+    np.testing.assert_array_equal(source.wait_raw16_frame(), frames[0])
@@ -0,0 +1,49 @@
+# test_results.py  (python -m pytest lepton/python_app)
+import json
+
+import numpy as np
+
+from results import ResultPublisher, ResultSubscriber, person
+
+
+def test_person_converts_numpy_values():
+    item = person(np.int64(3), np.array([1, 2, 30, 40]), (np.int32(5), np.int32(6)),
+                  np.float32(36.4567), source="BLOB")
+    assert item == {"id": 3, "box": [1, 2, 30, 40], "center": [5, 6], "temp": 36.46, "source": "BLOB"}
+    json.dumps(item)
+
+
+def test_file_publisher_appends_json_lines(tmp_path):
+    path = tmp_path / "out.jsonl"
+    publisher = ResultPublisher(str(path))
+    publisher.publish(2, 100, [person(1, (0, 0, 10, 10))])
+    publisher.publish(4, 200, [], fps=8.9)
+    publisher.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [msg["seq"] for msg in lines] == [2, 4]
+    assert lines[1] == {"seq": 4, "ts_ns": 200, "people": [], "fps": 8.9}
+    assert publisher.sent == 2
+
+
+def test_unix_publisher_without_viewer_drops(tmp_path):
+    publisher = ResultPublisher(f"unix:{tmp_path / 'none.sock'}")
+    publisher.publish(2, 100, [])
+    assert (publisher.sent, publisher.dropped) == (0, 1)
+    publisher.close()
+
+
+def test_subscriber_keeps_only_latest(tmp_path):
+    path = str(tmp_path / "results.sock")
+    subscriber = ResultSubscriber(path)
+    publisher = ResultPublisher(f"unix:{path}")
+    try:
+        assert subscriber.latest() is None
+        for seq in (2, 4, 6):
+            publisher.publish(seq, seq * 10, [])
+        assert subscriber.latest()["seq"] == 6
+        assert subscriber.received == 3
+        assert subscriber.latest() is None
+    finally:
+        publisher.close()
+        subscriber.close()
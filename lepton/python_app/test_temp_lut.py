@@ -0,0 +1,37 @@
+# test_temp_lut.py  (python -m pytest lepton/python_app)
+import numpy as np
+
+from temp_lut import (raw_to_celsius, celsius_to_raw, raw_frame_to_celsius, raw_frame_to_display,
+                      display_range, raw_frame_to_gray_rgb)
+
+
+def test_celsius_lut_matches_formula():
+    raw = np.random.default_rng(0).integers(0, 65536, size=(120, 160), dtype=np.uint16)
+    expected = raw.astype(np.float64) * 0.01 - 273.15 + 1.5
+    np.testing.assert_allclose(raw_frame_to_celsius(raw, offset=1.5), expected, atol=1e-3)
+
+
+def test_celsius_roundtrip():
+    for temp_c in (-20.0, 0.0, 36.5, 100.0):
+        assert abs(raw_to_celsius(celsius_to_raw(temp_c)) - temp_c) <= 0.005
+    assert celsius_to_raw(-400.0) == 0
+    assert celsius_to_raw(1000.0) == 65535
+
+
+def test_display_matches_float_stretch():
+    raw = np.random.default_rng(1).integers(29000, 31000, size=(120, 160), dtype=np.uint16)
+    raw_min, raw_max = display_range(raw)
+    assert raw_min % 50 == 0 and raw_max % 50 == 0
+    assert raw_min <= raw.min() and raw_max >= raw.max()
+
+    expected = np.clip((raw.astype(np.float64) - raw_min) * (255.0 / (raw_max - raw_min)), 0, 255)
+    got = raw_frame_to_display(raw)
+    assert np.abs(got.astype(int) - expected.astype(np.uint8).astype(int)).max() <= 1
+
+
+def test_gray_rgb_has_three_equal_channels():
+    raw = np.random.default_rng(2).integers(29000, 31000, size=(120, 160), dtype=np.uint16)
+    rgb = raw_frame_to_gray_rgb(raw)
+    assert rgb.shape == (120, 160, 3)
+    np.testing.assert_array_equal(rgb[..., 0], rgb[..., 2])
+    np.testing.assert_array_equal(rgb[..., 0], raw_frame_to_display(raw))
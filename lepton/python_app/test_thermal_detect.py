@@ -0,0 +1,35 @@
+# test_thermal_detect.py  (python -m pytest lepton/python_app)
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT
+from temp_lut import celsius_to_raw
+from thermal_detect import ThermalDetector
+
+
+def blank(temp_c=22.0):
+    return np.full((HEIGHT, WIDTH), celsius_to_raw(temp_c), dtype=np.uint16)
+
+
+def test_finds_face_sized_skin_blob():
+    raw = blank()
+    raw[30:42, 50:60] = celsius_to_raw(34.0)     # 10x12 얼굴
+    boxes, scores = ThermalDetector().detect(raw)
+    assert boxes == [(50, 30, 60, 42)]
+    assert 0.3 <= scores[0] <= 1.0
+
+
+def test_rejects_noise_hot_objects_and_walls():
+    raw = blank()
+    raw[5:7, 5:7] = celsius_to_raw(34.0)         # 너무 작음
+    raw[60:80, 100:110] = celsius_to_raw(60.0)   # 피부보다 뜨거움 (전등)
+    assert ThermalDetector()(raw) == []
+    assert ThermalDetector()(blank(34.0)) == []  # 벽 전체가 피부 온도
+
+
+def test_sorted_by_confidence():
+    raw = blank()
+    raw[10:16, 10:15] = celsius_to_raw(34.0)     # 작은 덩어리
+    raw[50:65, 80:92] = celsius_to_raw(34.0)     # 큰 얼굴
+    boxes, scores = ThermalDetector().detect(raw)
+    assert boxes[0] == (80, 50, 92, 65)
+    assert scores == sorted(scores, reverse=True)
@@ -0,0 +1,60 @@
+# test_tracker.py  (python -m pytest lepton/python_app)
+import itertools
+
+import numpy as np
+import pytest
+
+import tracker as tracker_mod
+from tracker import Tracker, iou_matrix, linear_assignment, _hungarian
+
+
+def test_iou_matrix():
+    ious = iou_matrix([(0, 0, 10, 10)], [(0, 0, 10, 10), (5, 0, 15, 10), (20, 20, 30, 30)])
+    np.testing.assert_allclose(ious, [[1.0, 1 / 3, 0.0]], atol=1e-6)
+
+
+@pytest.mark.parametrize("shape", [(3, 3), (2, 5), (5, 2), (6, 6)])
+def test_hungarian_is_optimal(shape, monkeypatch):
+    # scipy 유무와 상관없이 내장 Hungarian 확인
+    monkeypatch.setattr(tracker_mod, "_scipy_assignment", None)
+    rng = np.random.default_rng(shape[0] * 10 + shape[1])
+    for _ in range(20):
+        cost = rng.random(shape)
+        rows, cols = linear_assignment(cost)
+        n = min(shape)
+        assert len(rows) == len(cols) == n
+        assert len(set(rows.tolist())) == len(set(cols.tolist())) == n
+        got = cost[rows, cols].sum()
+        if shape[0] <= shape[1]:
+            best = min(cost[range(n), list(p)].sum() for p in itertools.permutations(range(shape[1]), n))
+        else:
+            best = min(cost[list(p), range(n)].sum() for p in itertools.permutations(range(shape[0]), n))
+        assert got == pytest.approx(best)
+
+
+def test_hungarian_returns_column_per_row():
+    cost = np.array([[4.0, 1.0, 3.0], [2.0, 0.0, 5.0], [3.0, 2.0, 2.0]])
+    assert _hungarian(cost).tolist() == [1, 0, 2]
+
+
+def test_crossing_people_keep_ids():
+    tr = Tracker()
+    a, b = tr.update([(10, 10, 30, 60), (60, 10, 80, 60)], 0.0)
+    # 서로 가까워지는 두 사람: greedy 매칭이면 한 감지가 두 track 에 붙을 수 있는 배치
+    a2, b2 = tr.update([(25, 10, 45, 60), (45, 10, 65, 60)], 1.0)
+    assert (a2.id, b2.id) == (a.id, b.id)
+
+
+def test_missed_track_coasts_then_expires():
+    tr = Tracker(max_misses=2)
+    (a,) = tr.update([(10, 10, 30, 60)], 0.0)
+    tr.update([(12, 10, 32, 60)], 1.0)
+    for t in (2.0, 3.0):
+        tr.update([], t)
+        assert [x.id for x in tr.tracks()] == [a.id]
+    # 등속 예측으로 오른쪽으로 이동 중
+    assert tr.tracks()[0].box[0] > 12
+    tr.update([], 4.0)
+    assert tr.tracks() == []
+    (c,) = tr.update([(10, 10, 30, 60)], 5.0)
+    assert c.id != a.id
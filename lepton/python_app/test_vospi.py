@@ -0,0 +1,103 @@
+# test_vospi.py  (python -m pytest lepton/python_app)
+import numpy as np
+import pytest
+
+from read_frame import WIDTH, HEIGHT
+from vospi import (PACKET_SIZE, PACKETS_PER_SEGMENT, SegmentAssembler, VospiError, as_packets,
+                   crc_ok, decode_frame, is_discard, main)
+
+
+def crc16_ccitt(data):
+    """비트 단위 CRC16-CCITT (다항식 0x1021, 초기값 0), 표 기반 crc_ok 와 비교용"""
+    crc = 0
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else crc << 1
+            crc &= 0xFFFF
+    return crc
+
+
+def make_packet(number, payload_u16, segment=0, ttt=None):
+    packet = bytearray(PACKET_SIZE)
+    t = segment if number == 20 else (ttt or 0)
+    packet[0] = (t << 4) | ((number >> 8) & 0x0F)
+    packet[1] = number & 0xFF
+    packet[4:] = np.asarray(payload_u16, dtype=">u2").tobytes()
+    check = bytearray(packet)
+    check[0] &= 0x0F
+    crc = crc16_ccitt(check)
+    packet[2], packet[3] = crc >> 8, crc & 0xFF
+    return bytes(packet)
+
+
+def encode_segment(frame, seg):
+    rows = frame[30 * (seg - 1):30 * seg]
+    return b"".join(make_packet(j, rows[j // 2, (j % 2) * 80:(j % 2) * 80 + 80], segment=seg)
+                    for j in range(PACKETS_PER_SEGMENT))
+
+
+@pytest.fixture
+def frame():
+    return np.random.default_rng(0).integers(0, 65536, size=(HEIGHT, WIDTH), dtype=np.uint16)
+
+
+def test_crc_table_matches_bitwise_crc(frame):
+    packets = as_packets(encode_segment(frame, 2))
+    assert crc_ok(packets).all()
+    corrupted = packets.copy()
+    corrupted[7, 100] ^= 0x01
+    assert crc_ok(corrupted).tolist() == [i != 7 for i in range(PACKETS_PER_SEGMENT)]
+
+
+def test_decode_frame_in_any_segment_order(frame):
+    buf = b"".join(encode_segment(frame, s) for s in (3, 1, 4, 2))
+    np.testing.assert_array_equal(decode_frame(buf), frame)
+
+
+def test_decode_frame_rejects_crc_errors(frame):
+    buf = bytearray(b"".join(encode_segment(frame, s) for s in (1, 2, 3, 4)))
+    buf[5 * PACKET_SIZE + 50] ^= 0xFF
+    with pytest.raises(VospiError, match="CRC"):
+        decode_frame(bytes(buf))
+
+
+def test_decode_frame_rejects_missing_segment(frame):
+    with pytest.raises(VospiError):
+        decode_frame(b"".join(encode_segment(frame, s) for s in (1, 1, 3, 4)))
+
+
+def test_assembler_restarts_on_missing_segment(frame):
+    asm = SegmentAssembler()
+    segs = {s: as_packets(encode_segment(frame, s)) for s in (1, 2, 3, 4)}
+    assert asm.push(segs[1]) is None
+    assert asm.push(segs[3]) is None          # 2 를 놓침 → 버리고 1 부터
+    assert asm.wrong_segments == 1
+    for s in (1, 2, 3):
+        assert asm.push(segs[s]) is None
+    np.testing.assert_array_equal(asm.push(segs[4]), frame)
+    assert asm.frames == 1
+
+
+def test_discard_packets():
+    discard = bytearray(PACKET_SIZE)
+    discard[0] = 0x0F
+    packets = as_packets(bytes(discard) + make_packet(0, np.zeros(80)))
+    assert is_discard(packets).tolist() == [True, False]
+
+
+def test_decode_command(tmp_path, frame, capsys):
+    from replay import open_recording
+
+    short = tmp_path / "short.raw"
+    short.write_bytes(encode_segment(frame, 1))
+    assert main(["decode", str(short), str(tmp_path / "short.lrec")]) == 1
+    assert not (tmp_path / "short.lrec").exists()
+
+    dump = tmp_path / "frames.raw"
+    zero = np.zeros_like(frame)
+    dump.write_bytes(b"".join(encode_segment(f, s) for f in (frame, zero) for s in (1, 2, 3, 4)))
+    assert main(["decode", str(dump), str(tmp_path / "out.lrec")]) == 0
+    assert "2 frames, last frame all zero" in capsys.readouterr().out
+    ts, raw = open_recording(str(tmp_path / "out.lrec"))
+    np.testing.assert_array_equal(raw[0], frame)
@@ -0,0 +1,50 @@
+# test_yolo_blob.py  (python -m pytest lepton/python_app)
+import numpy as np
+import pytest
+
+from bench_hotpath import make_scene
+from detect_worker import Detector
+from thermal_detect import ThermalDetector
+from yolo_blob import select_person_box
+
+
+@pytest.fixture
+def scene():
+    raw, boxes, _ = make_scene(np.random.default_rng(1), 2)
+    return raw, boxes
+
+
+@pytest.mark.parametrize("name", ["yolo", "onnx"])
+def test_background_detector_boxes_are_primary(scene, name):
+    raw, _ = scene
+    detector = Detector(name)
+    try:
+        boxes = [(10, 10, 30, 60), (50, 20, 90, 100)]
+        box, source = select_person_box(detector, boxes, raw, ThermalDetector())
+    finally:
+        detector.stop()
+    assert box == (50, 20, 90, 100)
+    assert source == name.upper()
+
+
+def test_background_detector_without_people_falls_back_to_blob(scene):
+    raw, _ = scene
+    detector = Detector("onnx")
+    try:
+        box, source = select_person_box(detector, [], raw, ThermalDetector())
+    finally:
+        detector.stop()
+    assert source == "BLOB"
+    assert box is not None
+
+
+def test_blob_detector_uses_its_own_boxes(scene):
+    raw, _ = scene
+    detector = Detector("blob")
+    boxes = [(1, 2, 3, 4)]
+    assert select_person_box(detector, boxes, raw, ThermalDetector()) == ((1, 2, 3, 4), "BLOB")
+
+
+def test_nothing_found():
+    raw = np.zeros((120, 160), dtype=np.uint16)   # 전부 무효 픽셀
+    assert select_person_box(Detector("blob"), [], raw, ThermalDetector()) == (None, None)
@@ -0,0 +1,95 @@
+# thermal_detect.py  (YOLO 없이 열화상 RAW 만으로 사람 찾기: 피부 온도 구간 + connected components)
+#
+#   detector = ThermalDetector()
+#   boxes, scores = detector.detect(raw_frame)   # [(x1, y1, x2, y2), ...], [0~1, ...]
+#   boxes = detector(raw_frame)                  # DetectionWorker(detect_fn) 에 그대로 넣을 수 있음
+#
+# - raw 를 °C 로 바꾸지 않고 피부 온도 구간을 raw 값 구간으로 바꿔서 cv2.inRange 한 번
+# - 3x3 closing 으로 안경/머리카락에 잘린 얼굴 조각을 붙이고
+# - cv2.connectedComponentsWithStats 한 번 → 면적 / 가로세로 비율 필터는 배열 연산
+# 160x120 프레임 기준 수백 µs 라서 센서 속도(9Hz)로 매 프레임 돌려도 된다.
+# 박스는 사람 전체가 아니라 드러난 피부 덩어리 (얼굴 / 목 / 팔) 라서
+# find_face_center 같은 '박스 안 가장 뜨거운 곳' 계산에 바로 쓸 수 있다.
+import cv2
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT
+from temp_lut import celsius_to_raw
+
+# 피부 radiometric 온도 구간 (°C). 옷 / 머리카락 / 배경은 대부분 이보다 낮고
+# 전등 / 히터 같은 더 뜨거운 물체는 위쪽에서 잘린다.
+SKIN_MIN_C = 30.0
+SKIN_MAX_C = 40.0
+
+# 덩어리 면적 (픽셀): 이보다 작으면 노이즈 / 손가락, 크면 벽 / 난방기
+MIN_AREA = 12
+MAX_AREA = WIDTH * HEIGHT // 4
+
+# 세로 / 가로 비율 범위 (얼굴은 ~1.3, 팔을 뻗은 상체까지 붙어도 이 안)
+MIN_ASPECT = 0.4
+MAX_ASPECT = 4.0
+
+# 면적이 이 이상이면 크기 점수 1 (1~3m 거리 얼굴)
+FULL_CONF_AREA = 60
+# 박스를 채운 비율이 이 이상이면 모양 점수 1 (타원 ~0.78, 가늘게 휘어진 덩어리는 낮음)
+FULL_CONF_FILL = 0.6
+
+# 이 confidence 미만은 버림
+MIN_CONFIDENCE = 0.3
+
+
+class ThermalDetector:
+    """
+    피부 온도 구간 connected components 사람 검출기.
+    버퍼(mask / closing 결과)는 미리 할당해서 매 프레임 재사용.
+    반환 박스는 (x1, y1, x2, y2) int, confidence 높은 순.
+    """
+
+    def __init__(self, min_c=SKIN_MIN_C, max_c=SKIN_MAX_C, min_area=MIN_AREA, max_area=MAX_AREA,
+                 min_confidence=MIN_CONFIDENCE, shape=(HEIGHT, WIDTH)):
+        self.raw_lo = celsius_to_raw(min_c)
+        self.raw_hi = celsius_to_raw(max_c)
+        self.min_area = min_area
+        self.max_area = max_area
+        self.min_confidence = min_confidence
+
+        self._mask = np.empty(shape, dtype=np.uint8)
+        self._closed = np.empty(shape, dtype=np.uint8)
+        self._kernel = np.ones((3, 3), dtype=np.uint8)
+
+    def detect(self, raw_frame):
+        """RAW16 프레임 → (boxes, scores)"""
+        cv2.inRange(raw_frame, self.raw_lo, self.raw_hi, dst=self._mask)
+        cv2.morphologyEx(self._mask, cv2.MORPH_CLOSE, self._kernel, dst=self._closed)
+
+        n, _, stats, _ = cv2.connectedComponentsWithStats(self._closed, connectivity=8)
+        if n <= 1:
+            return [], []
+
+        # label 0 은 배경
+        stats = stats[1:]
+        x = stats[:, cv2.CC_STAT_LEFT]
+        y = stats[:, cv2.CC_STAT_TOP]
+        w = stats[:, cv2.CC_STAT_WIDTH]
+        h = stats[:, cv2.CC_STAT_HEIGHT]
+        area = stats[:, cv2.CC_STAT_AREA]
+
+        aspect = h / w
+        size_score = np.minimum(1.0, area / FULL_CONF_AREA)
+        fill_score = np.minimum(1.0, area / (w * h) / FULL_CONF_FILL)
+        conf = size_score * fill_score
+
+        keep = ((area >= self.min_area) & (area <= self.max_area)
+                & (aspect >= MIN_ASPECT) & (aspect <= MAX_ASPECT)
+                & (conf >= self.min_confidence))
+        idx = np.flatnonzero(keep)
+        if idx.size == 0:
+            return [], []
+        idx = idx[np.argsort(-conf[idx], kind="stable")]
+
+        boxes = np.stack([x[idx], y[idx], x[idx] + w[idx], y[idx] + h[idx]], axis=1).tolist()
+        return [tuple(b) for b in boxes], conf[idx].tolist()
+
+    def __call__(self, raw_frame):
+        """detect() 의 박스만 (detect_worker.yolo_person_boxes 와 같은 형태)"""
+        return self.detect(raw_frame)[0]
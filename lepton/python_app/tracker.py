@@ -0,0 +1,247 @@
+# tracker.py  (사람 박스 다중 추적: IoU 행렬 + 최적 할당 + coast/max-age + 등속 예측)
+#
+#   tracker = Tracker()
+#   tracks = tracker.update(boxes, now)   # 감지 결과가 왔을 때: boxes[i] ↔ tracks[i]
+#   tracker.predict(now)                  # 감지 사이 프레임: 속도로 박스 위치만 앞으로
+#   track.refine(center)                  # 감지 사이 프레임: 열화상으로 다시 잡은 얼굴 중심으로 보정
+#   for track in tracker.tracks(): ...    # 살아있는 track (id 순)
+#
+# - 감지 × track IoU 를 한 번의 배열 연산으로 계산하고 Hungarian 으로 1:1 할당
+#   (예전 final_temp.py 의 greedy 매칭처럼 두 감지가 같은 id 를 가져가는 일이 없음)
+# - 감지를 놓친 track 은 max_misses 번까지 예측 위치로 유지 (coast) → 온도 smoothing 상태 유지
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT
+
+try:
+    from scipy.optimize import linear_sum_assignment as _scipy_assignment
+except ImportError:
+    _scipy_assignment = None
+
+# 이보다 IoU 가 낮으면 같은 사람으로 보지 않음 (예전 매칭 기준과 같은 값)
+IOU_THRESHOLD = 0.1
+
+# 감지에서 연속으로 빠져도 유지하는 횟수 (DETECTION_INTERVAL 1초면 ~2초)
+MAX_MISSES = 2
+
+# 속도 EMA 계수, 예측에 쓰는 최대 시간 (오래 coast 하면 멀리 날아가지 않게)
+VELOCITY_ALPHA = 0.5
+MAX_PREDICT_TIME = 1.0
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """(N, 4), (M, 4) x1,y1,x2,y2 박스 → (N, M) IoU (한 번의 broadcast 연산)"""
+    a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+
+    iw = np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0])
+    ih = np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1])
+    inter = np.clip(iw, 0, None) * np.clip(ih, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-6)
+
+
+def _hungarian(cost):
+    """
+    최소 비용 할당 (행 수 <= 열 수). 반환: 각 행에 할당된 열 (N,).
+    shortest augmenting path 버전 Hungarian, 열 방향 갱신은 배열 연산.
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)      # p[j] = 열 j 에 할당된 행 (1-based, 0 = 없음)
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used
+            free[0] = False
+
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            better = free[1:] & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+
+            cand = np.where(free, minv, np.inf)
+            j1 = int(np.argmin(cand))
+            delta = cand[j1]
+
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    assign = np.empty(n, dtype=np.int64)
+    cols = np.flatnonzero(p[1:]) + 1
+    assign[p[cols] - 1] = cols - 1
+    return assign
+
+
+def linear_assignment(cost):
+    """
+    최소 비용 1:1 할당 → (rows, cols). 직사각 행렬이면 작은 쪽은 모두 할당.
+    scipy 가 있으면 linear_sum_assignment, 없으면 내장 Hungarian (사람 수십 명 수준이면 충분).
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    if _scipy_assignment is not None:
+        return _scipy_assignment(cost)
+
+    if cost.shape[0] <= cost.shape[1]:
+        rows = np.arange(cost.shape[0])
+        return rows, _hungarian(cost)
+    cols = np.arange(cost.shape[1])
+    rows = _hungarian(cost.T)
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+class Track:
+    """
+    사람 한 명.
+    box    : 현재 추정 박스 (감지 직후엔 감지 박스, 사이 프레임엔 예측 박스) float (4,)
+    center : 마지막으로 계산한 얼굴 중심 (호출한 쪽에서 채움)
+    temp   : smoothing 된 얼굴 온도 (호출한 쪽에서 채움)
+    """
+
+    def __init__(self, track_id, box, t):
+        self.id = track_id
+        self.det_box = np.asarray(box, dtype=np.float64)
+        self.box = self.det_box.copy()
+        self.velocity = np.zeros(4)    # 박스 좌표 변화 (픽셀/초)
+        self.t_update = t
+
+        self.hits = 1                  # 감지와 매칭된 횟수
+        self.misses = 0                # 연속으로 감지에서 빠진 횟수
+
+        self.center = None
+        self.temp = None
+        self.offset = (0.0, 0.0)       # 마지막 감지 이후 예측 이동량 (center 를 같이 옮길 때)
+        self.shift = np.zeros(4)       # 마지막 감지 이후 refine() 으로 보정한 박스 이동량
+
+    def predict(self, t):
+        dt = min(max(0.0, t - self.t_update), MAX_PREDICT_TIME)
+        self.box = self.det_box + self.velocity * dt + self.shift
+        dx = (self.box[0] + self.box[2] - self.det_box[0] - self.det_box[2]) * 0.5
+        dy = (self.box[1] + self.box[3] - self.det_box[1] - self.det_box[3]) * 0.5
+        self.offset = (dx, dy)
+        return self.box
+
+    def refine(self, center):
+        """
+        감지 사이 프레임에서 열화상으로 다시 찾은 얼굴 중심 (face_temp.refine_face_center).
+        shifted_center() 가 center 가 되도록 박스도 같은 만큼 옮긴다 (속도 추정에는 안 씀).
+        """
+        cur = self.shifted_center()
+        if center is None or cur is None:
+            return
+        dx = center[0] - cur[0]
+        dy = center[1] - cur[1]
+        if dx == 0 and dy == 0:
+            return
+        delta = np.array([dx, dy, dx, dy], dtype=np.float64)
+        self.shift += delta
+        self.box = self.box + delta
+        self.offset = (self.offset[0] + dx, self.offset[1] + dy)
+
+    def update(self, box, t):
+        box = np.asarray(box, dtype=np.float64)
+        # 감지 사이에 옮겨진 얼굴 중심을 그대로 이어받음 (새 박스 기준 이동량은 0 부터)
+        self.center = self.shifted_center()
+        dt = t - self.t_update
+        if dt > 0:
+            vel = (box - self.det_box) / dt
+            self.velocity += VELOCITY_ALPHA * (vel - self.velocity)
+        self.det_box = box
+        self.box = box.copy()
+        self.t_update = t
+        self.offset = (0.0, 0.0)
+        self.shift[:] = 0.0
+        self.hits += 1
+        self.misses = 0
+
+    def int_box(self):
+        """화면 표시용 정수 박스 (프레임 안으로 clip)"""
+        x1, y1, x2, y2 = np.rint(self.box).astype(int).tolist()
+        return (max(0, min(WIDTH - 1, x1)), max(0, min(HEIGHT - 1, y1)),
+                max(0, min(WIDTH - 1, x2)), max(0, min(HEIGHT - 1, y2)))
+
+    def shifted_center(self):
+        """얼굴 중심을 예측 이동량만큼 옮긴 위치 (center 없으면 None)"""
+        if self.center is None:
+            return None
+        return (int(round(self.center[0] + self.offset[0])),
+                int(round(self.center[1] + self.offset[1])))
+
+
+class Tracker:
+    def __init__(self, iou_threshold=IOU_THRESHOLD, max_misses=MAX_MISSES):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self._tracks = []
+        self._next_id = 1
+
+    def tracks(self):
+        """살아있는 track 목록 (id 순)"""
+        return list(self._tracks)
+
+    def predict(self, t):
+        """모든 track 을 시각 t 위치로 예측 (감지 사이 프레임에서 호출)"""
+        for track in self._tracks:
+            track.predict(t)
+        return self.tracks()
+
+    def update(self, boxes, t):
+        """
+        감지 박스들로 track 갱신.
+        반환: boxes 와 같은 순서의 Track 리스트 (새 사람이면 새 Track)
+        매칭 안 된 기존 track 은 misses 를 늘리고 max_misses 를 넘으면 삭제.
+        """
+        for track in self._tracks:
+            track.predict(t)
+
+        result = [None] * len(boxes)
+        matched_tracks = set()
+
+        if boxes and self._tracks:
+            ious = iou_matrix([tr.box for tr in self._tracks], boxes)
+            rows, cols = linear_assignment(1.0 - ious)
+            for r, c in zip(rows, cols):
+                if ious[r, c] < self.iou_threshold:
+                    continue
+                track = self._tracks[r]
+                track.update(boxes[c], t)
+                result[c] = track
+                matched_tracks.add(r)
+
+        for r, track in enumerate(self._tracks):
+            if r not in matched_tracks:
+                track.misses += 1
+
+        self._tracks = [tr for tr in self._tracks if tr.misses <= self.max_misses]
+
+        for c, box in enumerate(boxes):
+            if result[c] is None:
+                track = Track(self._next_id, box, t)
+                self._next_id += 1
+                self._tracks.append(track)
+                result[c] = track
+
+        return result
@@ -0,0 +1,433 @@
+# vospi.py  (Lepton 3.x VoSPI 패킷 → 160x120 RAW16 프레임, NumPy 배열 연산으로 조립)
+#
+# LeptonThread.cpp 의 픽셀 단위 루프(2바이트 조합 → setPixel)를 대신하는 Python 쪽 capture 경로.
+#
+#   패킷 164B = header 4B (ID 2B + CRC 2B) + payload 160B (big endian u16 80개)
+#   segment   = 패킷 60개, 패킷 20 의 ID 상위 4bit 가 segment 번호 (1~4)
+#   프레임    = segment 4개. segment s 의 패킷 j 는 row 30*(s-1) + j//2,
+#               column (j%2)*80 ~ +80 (왼쪽/오른쪽 반 줄)
+#   → 4개 segment payload 를 (4, 60, 80) 으로 쌓으면 메모리상 그대로 (120, 160) 프레임
+#
+#   python vospi.py decode ../../frame.raw out.lrec   # 덤프 → replay 용 녹화 파일
+#   LEPTON_SPI=/dev/spidev0.0 python final_temp.py   # Qt 앱 없이 SPI 에서 직접 읽기
+import fcntl
+import os
+import struct
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from read_frame import WIDTH, HEIGHT
+from temp_lut import raw_frame_to_gray_rgb
+
+PACKET_SIZE = 164
+PACKET_HEADER_SIZE = 4
+PACKET_PIXELS = (PACKET_SIZE - PACKET_HEADER_SIZE) // 2   # 80
+PACKETS_PER_SEGMENT = 60
+SEGMENTS_PER_FRAME = 4
+SEGMENT_SIZE = PACKET_SIZE * PACKETS_PER_SEGMENT
+FRAME_PACKETS = PACKETS_PER_SEGMENT * SEGMENTS_PER_FRAME
+FRAME_BYTES = PACKET_SIZE * FRAME_PACKETS                # 39360 (= frame.raw)
+
+# segment 번호가 들어있는 패킷
+SEGMENT_ID_PACKET = 20
+
+# 한 segment 의 정상 패킷 번호 0..59
+_EXPECTED_PACKETS = np.arange(PACKETS_PER_SEGMENT)
+
+# SPI 설정 (raspberrypi_video/SPI.cpp 와 같은 값)
+SPI_DEVICE = "/dev/spidev0.0"
+SPI_MODE_3 = 3
+SPI_BITS_PER_WORD = 8
+SPI_SPEED_HZ = 10_000_000
+
+# linux/spi/spidev.h 의 _IOW('k', n, size)
+_SPI_IOC_WR_MODE = 0x40016B01
+_SPI_IOC_WR_BITS_PER_WORD = 0x40016B03
+_SPI_IOC_WR_MAX_SPEED_HZ = 0x40046B04
+
+# sync 복구 (LeptonThread.cpp 의 LEPTON_RESYNC_* 와 같은 값)
+#   패킷이 깨지거나 순서가 틀려도 쉬지 않고, 뒤쪽에 이어지는 0,1,2.. 패킷부터 segment 를 다시 잡는다.
+#   그래도 RESYNC_IDLE_PACKETS 만큼 진전이 없을 때만 CS idle 로 센서 쪽 VoSPI 를 다시 맞춤.
+RESYNC_IDLE_PACKETS = PACKETS_PER_SEGMENT
+RESYNC_IDLE = 0.185          # VoSPI resync 에 필요한 idle 시간 (> 5 프레임 주기)
+REOPEN_IDLE_RESYNCS = 6      # idle resync 를 이만큼 연속으로 해도 안 되면 포트를 다시 연다
+
+
+class VospiError(ValueError):
+    """패킷 번호 / segment 번호가 VoSPI 형식과 맞지 않음"""
+
+
+def as_packets(buf):
+    """bytes / bytearray / uint8 배열 → (N, 164) uint8 view (복사 없음)"""
+    packets = np.frombuffer(buf, dtype=np.uint8)
+    if packets.size % PACKET_SIZE:
+        raise VospiError(f"buffer size {packets.size} is not a multiple of {PACKET_SIZE}")
+    return packets.reshape(-1, PACKET_SIZE)
+
+
+def packet_numbers(packets):
+    """(N, 164) 패킷들의 패킷 번호 (ID 하위 12bit)"""
+    return ((packets[:, 0].astype(np.uint16) & 0x0F) << 8) | packets[:, 1]
+
+
+def segment_id(segment):
+    """(60, 164) segment 의 segment 번호 (패킷 20 의 ID 상위 4bit, 0 이면 무효 segment)"""
+    return int(segment[SEGMENT_ID_PACKET, 0]) >> 4
+
+
+def is_discard(packets):
+    """discard 패킷 (ID 0xFxxx, 센서가 아직 보낼 데이터가 없을 때) mask"""
+    return (packets[:, 0] & 0x0F) == 0x0F
+
+
+@lru_cache(maxsize=1)
+def _crc_table():
+    """
+    (164, 256) uint16: 패킷 위치 i 에 바이트 v 가 있을 때 CRC 에 XOR 되는 값.
+    VoSPI CRC 는 초기값 0 인 CRC16-CCITT (raspberrypi_libs/.../crc16fast.c) 라서
+    선형(XOR) → 패킷 CRC = 위치별 기여값 XOR.
+    CRC 계산 규칙대로 byte 0 은 하위 4bit 만 (T 비트 제외), byte 2~3 (CRC 필드)은 0 으로 친다.
+    """
+    # 바이트 하나 CRC (crc16fast.c 의 ccitt_16Table 과 같은 값)
+    byte_crc = np.arange(256, dtype=np.uint32) << 8
+    for _ in range(8):
+        byte_crc = np.where(byte_crc & 0x8000, (byte_crc << 1) ^ 0x1021, byte_crc << 1) & 0xFFFF
+
+    table = np.empty((PACKET_SIZE, 256), dtype=np.uint32)
+    # 마지막 바이트 → 앞으로 갈수록 뒤에 0 바이트가 붙은 것과 같음 (CRC 에 0 바이트를 하나씩 통과)
+    crc = byte_crc
+    for pos in range(PACKET_SIZE - 1, -1, -1):
+        table[pos] = crc
+        crc = ((crc << 8) & 0xFFFF) ^ byte_crc[crc >> 8]
+
+    table[0] = table[0, np.arange(256) & 0x0F]
+    table[2:4] = 0
+    table = table.astype(np.uint16)
+    table.flags.writeable = False
+    return table
+
+
+# _crc_table().ravel() 인덱스 = 위치 * 256 + 바이트 (164*256 < 65536 이라 uint16 로 충분)
+_CRC_OFFSETS = (np.arange(PACKET_SIZE) * 256).astype(np.uint16)
+
+
+def crc_ok(packets):
+    """(N, 164) 패킷들의 CRC 를 한 번에 확인 → (N,) bool (패킷 60개 ~30us)"""
+    contrib = _crc_table().ravel().take(packets + _CRC_OFFSETS)
+    crc = np.bitwise_xor.reduce(contrib.T, axis=0)
+    expect = (packets[:, 2].astype(np.uint16) << 8) | packets[:, 3]
+    return crc == expect
+
+
+def payload(packets):
+    """(N, 164) 패킷 → (N, 80) big endian u16 view (복사 없음, 꺼낼 때 byteswap)"""
+    return packets[:, PACKET_HEADER_SIZE:].view(">u2")
+
+
+def check_segment(segment):
+    """(60, 164) CRC / 패킷 번호 0..59 순서를 확인하고 segment 번호 반환"""
+    good = crc_ok(segment)
+    if not good.all():
+        raise VospiError(f"packet {int(np.flatnonzero(~good)[0])} has a bad CRC")
+    numbers = packet_numbers(segment)
+    if not np.array_equal(numbers, _EXPECTED_PACKETS):
+        bad = int(np.flatnonzero(numbers != _EXPECTED_PACKETS)[0])
+        raise VospiError(f"packet {bad} has number {int(numbers[bad])}")
+    seg = segment_id(segment)
+    if not 1 <= seg <= SEGMENTS_PER_FRAME:
+        raise VospiError(f"wrong segment number {seg}")
+    return seg
+
+
+def _frame_segments(out):
+    """(120, 160) 프레임 → segment 별 (4, 60, 80) view"""
+    return out.reshape(SEGMENTS_PER_FRAME, PACKETS_PER_SEGMENT, PACKET_PIXELS)
+
+
+def decode_frame(buf, out=None):
+    """
+    패킷 240개 (frame.raw 와 같은 배치) → (120, 160) uint16 프레임.
+    segment 는 패킷 20 의 번호대로 놓으므로 순서가 섞여 있어도 된다.
+    형식이 안 맞으면 VospiError.
+    """
+    packets = as_packets(buf)
+    if len(packets) != FRAME_PACKETS:
+        raise VospiError(f"expected {FRAME_PACKETS} packets, got {len(packets)}")
+    if out is None:
+        out = np.empty((HEIGHT, WIDTH), dtype=np.uint16)
+
+    segments = packets.reshape(SEGMENTS_PER_FRAME, PACKETS_PER_SEGMENT, PACKET_SIZE)
+    ids = [check_segment(segment) for segment in segments]
+    if sorted(ids) != list(range(1, SEGMENTS_PER_FRAME + 1)):
+        raise VospiError(f"segments {ids} do not make a full frame")
+
+    dst = _frame_segments(out)
+    for seg, segment in zip(ids, segments):
+        # '>u2' → native 복사가 byteswap 까지 한 번에
+        np.copyto(dst[seg - 1], payload(segment))
+    return out
+
+
+class SegmentAssembler:
+    """
+    segment 를 하나씩 받아서 1→2→3→4 가 모이면 프레임 완성.
+    (LeptonThread.cpp 의 shelf[4] 와 같은 역할, 복사는 segment payload 한 번)
+    """
+
+    def __init__(self):
+        self.frame = np.empty((HEIGHT, WIDTH), dtype=np.uint16)
+        self._dst = _frame_segments(self.frame)
+        self._next = 1               # 다음에 기다리는 segment 번호
+
+        self.frames = 0              # 완성한 프레임 수
+        self.wrong_segments = 0      # segment 번호가 0 / 범위 밖 / 순서가 틀린 segment 수
+
+    def push(self, segment):
+        """
+        (60, 164) segment 하나 추가 (패킷 번호는 이미 확인됐다고 가정).
+        프레임이 완성되면 self.frame 반환, 아니면 None.
+        """
+        seg = segment_id(segment)
+        if not 1 <= seg <= SEGMENTS_PER_FRAME:
+            self.wrong_segments += 1
+            return None
+
+        if seg != self._next:
+            # 중간 segment 를 놓쳤으면 새 프레임의 1번부터 다시
+            self.wrong_segments += 1
+            self._next = 1
+            if seg != 1:
+                return None
+
+        np.copyto(self._dst[seg - 1], payload(segment))
+
+        if seg == SEGMENTS_PER_FRAME:
+            self._next = 1
+            self.frames += 1
+            return self.frame
+        self._next = seg + 1
+        return None
+
+
+class SpiCapture:
+    """
+    /dev/spidev 에서 직접 VoSPI 를 읽어 RAW16 프레임을 만드는 frame source.
+    C++ Qt 앱 없이 headless 로 돌릴 때 사용 (FrameReader 와 같은 get_frame/wait_frame).
+
+    - segment 에 남은 패킷을 readv 한 번으로 읽고 discard / CRC / 패킷 번호를 배열로 한 번에 확인
+    - discard 패킷은 쉬지 않고 건너뜀, 깨진 패킷이 있으면 뒤쪽에 0,1,2.. 로 이어지는 패킷부터
+      segment 를 다시 잡음 (sleep 없음). RESYNC_IDLE_PACKETS 동안 진전이 없을 때만 RESYNC_IDLE 쉼
+    - 프레임 조립은 SegmentAssembler (segment 당 배열 복사 한 번)
+    - raw_timestamp_ns: 마지막 segment 를 다 읽은 시각 (time.monotonic_ns, C++ 와 같은 시계)
+    - 통계는 capture_stats() (C++ 가 RAW shm 헤더에 쓰는 것과 같은 항목)
+    반환 배열은 내부 버퍼를 재사용하므로 보관하려면 .copy() 필요.
+    """
+
+    def __init__(self, device=SPI_DEVICE, speed_hz=SPI_SPEED_HZ):
+        self.device = device
+        self.speed_hz = speed_hz
+        self.fd = None
+
+        self._segment = np.empty((PACKETS_PER_SEGMENT, PACKET_SIZE), dtype=np.uint8)
+        self._rows = [memoryview(row) for row in self._segment]
+        self.assembler = SegmentAssembler()
+
+        self._raw_buf = np.empty((HEIGHT, WIDTH), dtype=np.uint16)
+        self._rgb_buf = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+        self.packets_dropped = 0     # CRC 오류 / 순서가 안 맞아서 버린 패킷 수
+        self.crc_errors = 0          # 그 중 CRC 오류
+        self.discard_packets = 0     # 센서가 보낸 discard 패킷 수 (정상 동작)
+        self.resyncs = 0             # segment 를 중간에 다시 잡은 횟수 (idle resync 포함)
+        self.reopens = 0             # 포트 재오픈 횟수
+
+        self.raw_seq = None
+        self.raw_timestamp_ns = None
+        self.rgb_seq = None
+        self.rgb_timestamp_ns = None
+
+        self._open()
+
+    def _open(self):
+        self.fd = os.open(self.device, os.O_RDWR)
+        fcntl.ioctl(self.fd, _SPI_IOC_WR_MODE, struct.pack("B", SPI_MODE_3))
+        fcntl.ioctl(self.fd, _SPI_IOC_WR_BITS_PER_WORD, struct.pack("B", SPI_BITS_PER_WORD))
+        fcntl.ioctl(self.fd, _SPI_IOC_WR_MAX_SPEED_HZ, struct.pack("I", self.speed_hz))
+
+    def _reopen(self):
+        os.close(self.fd)
+        self.fd = None
+        self._open()
+        self.reopens += 1
+
+    def _read_packets(self, start):
+        """segment 버퍼 start 번째 자리부터 끝까지 읽기 (syscall 1번, SPI 전송은 패킷마다)"""
+        os.readv(self.fd, self._rows[start:])
+
+    def read_segment(self):
+        """패킷 번호 0..59 가 순서대로 들어온 segment 하나 → (60, 164) 내부 버퍼"""
+        segment = self._segment
+        have = 0                     # 앞에서부터 0,1,2.. 가 확인된 패킷 수
+        stalled = 0                  # 진전 없이 버린 패킷 수
+        idle_resyncs = 0
+
+        while have < PACKETS_PER_SEGMENT:
+            self._read_packets(have)
+            new = segment[have:]
+
+            discard = is_discard(new)
+            good = crc_ok(new)
+            numbers = packet_numbers(new)
+
+            n_discard = int(np.count_nonzero(discard))
+            good &= ~discard
+            self.discard_packets += n_discard
+            n_bad_crc = len(new) - n_discard - int(np.count_nonzero(good))
+            self.crc_errors += n_bad_crc
+
+            # 대부분은 여기서 끝 (전부 정상이고 번호도 이어짐)
+            if n_bad_crc == 0 and n_discard == 0 and \
+                    np.array_equal(numbers, _EXPECTED_PACKETS[have:]):
+                return segment
+
+            # 정상 패킷만 앞으로 모아서, 끝에서부터 0,1,2.. 로 이어지는 구간만 남김
+            src = np.concatenate([_EXPECTED_PACKETS[:have], have + np.flatnonzero(good)])
+            seq = np.concatenate([_EXPECTED_PACKETS[:have], numbers[good]])
+            start = len(seq)
+            if start:
+                offset = seq - np.arange(len(seq))
+                p = -int(offset[-1])
+                if 0 <= p < len(seq) and seq[-1] < PACKETS_PER_SEGMENT and \
+                        np.all(offset[p:] == offset[-1]):
+                    start = p
+
+            kept = len(seq) - start
+            dropped = start + n_bad_crc
+            self.packets_dropped += dropped
+            if start:
+                self.resyncs += 1
+            if kept:
+                segment[:kept] = segment[src[start:]]
+
+            if kept > have:
+                stalled = 0
+                idle_resyncs = 0
+            else:
+                stalled += dropped
+                if stalled >= RESYNC_IDLE_PACKETS:
+                    # 한참 sync 가 안 잡히면 CS 를 쉬게 해서 센서 쪽 VoSPI 를 다시 맞춤
+                    self.resyncs += 1
+                    idle_resyncs += 1
+                    stalled = 0
+                    kept = 0
+                    if idle_resyncs >= REOPEN_IDLE_RESYNCS:
+                        self._reopen()
+                        idle_resyncs = 0
+                    time.sleep(RESYNC_IDLE)
+            have = kept
+
+        return segment
+
+    def capture_stats(self):
+        """캡처 통계 (FrameReader.capture_stats() 와 같은 키 + reopens)"""
+        return {
+            "frames": self.assembler.frames,
+            "packets_dropped": self.packets_dropped,
+            "crc_errors": self.crc_errors,
+            "discard_packets": self.discard_packets,
+            "resyncs": self.resyncs,
+            "reopens": self.reopens,
+        }
+
+    def read_frame(self):
+        """segment 1~4 가 모일 때까지 읽어서 (120, 160) 프레임 반환"""
+        while True:
+            frame = self.assembler.push(self.read_segment())
+            if frame is not None:
+                self.raw_timestamp_ns = self.rgb_timestamp_ns = time.monotonic_ns()
+                self.raw_seq = self.rgb_seq = 2 * self.assembler.frames
+                return frame
+
+    # ---- FrameReader 호환 (항상 다음 프레임까지 SPI 에서 읽음) ----
+
+    def current_seq(self):
+        return self.raw_seq
+
+    def has_new_frame(self, since_seq):
+        return True
+
+    def get_raw16_frame(self, out=None, since_seq=None):
+        if out is None:
+            out = self._raw_buf
+        np.copyto(out, self.read_frame())
+        return out
+
+    def get_rgb_frame(self, out=None, since_seq=None):
+        if self.raw_seq is None:
+            self.get_raw16_frame()
+        if out is None:
+            out = self._rgb_buf
+        return raw_frame_to_gray_rgb(self._raw_buf, out=out)
+
+    def get_frame(self, since_seq=None):
+        raw = self.get_raw16_frame()
+        return raw_frame_to_gray_rgb(raw, out=self._rgb_buf), raw
+
+    # SPI read 자체가 다음 패킷까지 막히므로 wait_* 는 get_* 과 같음 (timeout 은 무시)
+
+    def wait_frame(self, timeout=None, since_seq=None):
+        return self.get_frame()
+
+    def wait_raw16_frame(self, timeout=None, since_seq=None, out=None):
+        return self.get_raw16_frame(out=out)
+
+    def wait_rgb_frame(self, timeout=None, since_seq=None, out=None):
+        self.get_raw16_frame()
+        if out is None:
+            out = self._rgb_buf
+        return raw_frame_to_gray_rgb(self._raw_buf, out=out)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv):
+    if len(argv) == 3 and argv[0] == "decode":
+        # 패킷 덤프 (frame.raw 처럼 240 패킷 단위로 이어붙인 파일) → .lrec 녹화 파일
+        from replay import RecordingWriter
+
+        data = np.fromfile(argv[1], dtype=np.uint8)
+        n_frames = data.size // FRAME_BYTES
+        if n_frames == 0:
+            # 빈 .lrec 를 만들지 않음 (replay 가 "has no frames" 로 거부)
+            print(f"[decode] {argv[1]}: {data.size} bytes, less than one frame ({FRAME_BYTES} bytes)",
+                  file=sys.stderr)
+            return 1
+        frame = np.empty((HEIGHT, WIDTH), dtype=np.uint16)
+        with RecordingWriter(argv[2]) as writer:
+            for i in range(n_frames):
+                decode_frame(data[i * FRAME_BYTES:(i + 1) * FRAME_BYTES], out=frame)
+                # 덤프에는 시각이 없으므로 0 → 재생할 때 9Hz 간격으로 취급
+                writer.write(frame, 0)
+        valid = frame[frame > 0]
+        last = f"last raw {valid.min()}~{valid.max()}" if valid.size else "last frame all zero"
+        print(f"[decode] {argv[2]}: {n_frames} frames, {last}")
+    else:
+        print("usage: python vospi.py decode <packets.raw> <out.lrec>")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,25 +1,37 @@
 # face.py  (YOLO + hotspot blob fallback + mouse pixel temperature)
+import argparse
 import time
 import cv2
 import numpy as np
-from ultralytics import YOLO
 
-from read_frame import get_frame  # rgb_frame, raw_frame 반환
-
-# YOLO 일반 모델 (COCO, class 0 = person)
-model = YOLO("yolov8n.pt")
+from read_frame import get_frame, wait_frame, get_source  # rgb_frame, raw_frame 반환
+from temp_lut import raw_to_celsius
+from face_temp import find_face_center, refine_face_center
+from thermal_detect import ThermalDetector
+from detect_worker import Detector, add_detector_arg, print_startup_time, largest_box
+from results import add_output_args, open_publisher, person
 
 # Lepton 해상도
 WIDTH = 160
 HEIGHT = 120
 
-# YOLO 감지 주기 (초) - 1초에 한 번만 사람 detection
-DETECTION_INTERVAL = 1.0
+# YOLO 감지 주기 (초) - 2초에 한 번만 사람 detection
+# (사이 프레임은 refine_face_center 로 박스를 옮기고 머리 온도를 매 프레임 갱신)
+DETECTION_INTERVAL = 2.0
+
+# 사람 검출기 기본값 (--detector none|blob|yolo)
+#   yolo: YOLO (COCO class 0 = person), 못 잡으면 BLOB fallback
+#   blob: 처음부터 열화상 검출기만 (YOLO / torch 안 불러옴)
+DETECTOR = "yolo"
+
+# True: 새 프레임이 올 때까지 잠들어 있음 (busy polling X)
+# False: 예전처럼 get_frame() 을 쉬지 않고 반복
+WAIT_FOR_FRAME = True
 
-last_det_time = 0.0
 person_box = None          # (x1, y1, x2, y2)
 head_temp_c = None         # 마지막 추정 머리 온도(섭씨)
-det_source = None          # "YOLO" or "BLOB"
+det_source = None          # "YOLO" / "ONNX" (주 검출기 이름) or "BLOB"
+head_center = None         # 감지 사이 프레임에서 따라가는 얼굴(머리) 중심 (x, y)
 
 # ===== Mouse Temperature Reader =====
 mouse_x, mouse_y = -1, -1
@@ -35,16 +47,6 @@ def mouse_event(event, x, y, flags, param):
         mouse_x, mouse_y = x, y
 
 
-def raw_to_celsius(raw_val: float) -> float:
-    """
-    Radiometric Lepton 3.x 가정:
-    raw ≈ Kelvin * 100  =>  T(°C) = raw/100 - 273.15
-    절대 정확도는 캘리브레이션 필요하지만
-    상대적인 비교/제어 용도로는 충분함.
-    """
-    return raw_val * 0.01 - 273.15
-
-
 def find_head_hotspot(raw_frame, box, head_ratio=0.6, radius=3):
     """
     사람 박스의 상단 부분(head 영역)에서 가장 뜨거운 픽셀(hotspot)을 찾고,
@@ -141,105 +143,165 @@ def detect_blob_person_box(raw_frame, min_area=20):
     return (x, y, x + w, y + h)
 
 
-def main():
-    global last_det_time, person_box, head_temp_c, det_source
+def draw(window_name, rgb_frame, raw_frame):
+    """마우스 온도 + 사람 박스 / 머리 온도 / 탐지 소스 표시"""
+    # 시각화용 이미지 복사
+    vis = rgb_frame.copy()
+
+    # 3-1) 마우스 아래 픽셀 온도 표시
+    if 0 <= mouse_x < WIDTH and 0 <= mouse_y < HEIGHT:
+        raw_val = int(raw_frame[mouse_y, mouse_x])
+        if raw_val > 0:
+            temp_c = raw_to_celsius(raw_val)
+            txt = f"{temp_c:.2f} C"
+            cv2.putText(vis, txt, (mouse_x + 8, mouse_y + 12),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
+            cv2.circle(vis, (mouse_x, mouse_y), 2, (255, 255, 255), -1)
+
+    # 3-2) 사람 박스 + 머리 온도 + 탐지 소스 표시
+    if person_box is not None:
+        x1, y1, x2, y2 = person_box
+
+        # YOLO / ONNX 면 초록, BLOB면 파랑 박스
+        color = (255, 0, 0) if det_source == "BLOB" else (0, 255, 0)
+        label = f"Person({det_source})"
+
+        cv2.rectangle(vis, (x1, y1), (x2, y2), color, 2)
+
+        # 라벨 + 온도 텍스트
+        if head_temp_c is not None:
+            txt = f"{label} {head_temp_c:.1f} C"
+        else:
+            txt = label
+        cv2.putText(vis, txt, (x1, max(0, y1 - 5)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)
+
+    cv2.imshow(window_name, vis)
+
+
+def select_person_box(detector, boxes, raw_frame, thermal_detector):
+    """
+    새 감지 결과 → (사람 박스, 탐지 소스). 못 찾으면 (None, None)
+
+    1) yolo / onnx 같은 주 검출기(background) 결과가 있으면 가장 큰 박스, 소스는 검출기 이름 ("YOLO" / "ONNX")
+    2) 아무도 못 잡으면 BLOB fallback: 피부 온도 구간 검출기(confidence 가장 높은 덩어리)
+       (--detector blob 이면 boxes 가 이미 그 결과) → 없으면 상위 10% 온도 덩어리
+    """
+    if detector.background:
+        box = largest_box(boxes)
+        if box is not None:
+            return box, detector.name.upper()
+        blob_boxes = thermal_detector(raw_frame)
+    else:
+        blob_boxes = boxes
+
+    blob_box = blob_boxes[0] if blob_boxes else detect_blob_person_box(raw_frame, min_area=20)
+    if blob_box is None:
+        return None, None
+    return blob_box, "BLOB"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Person hotspot temperature (YOLO + thermal blob)")
+    add_detector_arg(parser, default=DETECTOR)
+    add_output_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    global person_box, head_temp_c, det_source, head_center
+
+    args = parse_args(argv)
+
+    # --headless: 창 / 그리기 없이 결과만 publisher 로 (화면은 result_viewer.py 가 따로)
+    publisher = open_publisher(args)
 
     window_name = "Person Hotspot Temperature"
-    cv2.namedWindow(window_name)
-    cv2.setMouseCallback(window_name, mouse_event)
-
-    while True:
-        # 1) C++가 /dev/shm에 써둔 프레임 읽기
-        rgb_frame, raw_frame = get_frame()  # rgb: (H, W, 3), raw: (H, W)
-
-        now = time.time()
-
-        # 2) 1초에 한 번만 YOLO + BLOB detection
-        if now - last_det_time > DETECTION_INTERVAL:
-            det_source = None
-            person_box = None
-            head_temp_c = None
-
-            # ---- 2-1) 먼저 YOLO로 사람 탐지 시도 ----
-            results = model(rgb_frame, imgsz=160, conf=0.25)
-
-            yolo_box = None
-            if len(results) > 0 and results[0].boxes is not None:
-                boxes = results[0].boxes
-                if boxes.xyxy is not None and boxes.cls is not None:
-                    xyxy = boxes.xyxy.cpu().numpy()
-                    cls  = boxes.cls.cpu().numpy()
-
-                    # class 0 = person
-                    person_idx = np.where(cls == 0)[0]
-                    if person_idx.size > 0:
-                        # 여러 명이면 가장 큰 박스 선택
-                        p_xyxy = xyxy[person_idx]
-                        areas = (p_xyxy[:, 2] - p_xyxy[:, 0]) * (p_xyxy[:, 3] - p_xyxy[:, 1])
-                        idx = np.argmax(areas)
-                        x1, y1, x2, y2 = p_xyxy[idx]
-                        yolo_box = (int(x1), int(y1), int(x2), int(y2))
-
-            if yolo_box is not None:
-                # YOLO로 사람 잘 잡은 경우
-                person_box = yolo_box
-                det_source = "YOLO"
-                head_temp_c = find_head_hotspot(raw_frame, person_box,
-                                                head_ratio=0.6, radius=3)
+    if not args.headless:
+        cv2.namedWindow(window_name)
+        cv2.setMouseCallback(window_name, mouse_event)
+
+    # yolo 는 worker 스레드에서 로딩하므로 모델을 기다리지 않고 바로 화면 루프 시작
+    detector = Detector(args.detector, interval=DETECTION_INTERVAL)
+    thermal_detector = ThermalDetector()
+    frame_seq = 0
+
+    try:
+        while True:
+            # 1) C++가 /dev/shm에 써둔 프레임 읽기
+            if WAIT_FOR_FRAME:
+                frame = wait_frame(timeout=0.5)
+                if frame is None:
+                    # 프레임이 안 와도 창 이벤트는 처리
+                    if not args.headless and cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+                    continue
+                rgb_frame, raw_frame = frame  # rgb: (H, W, 3), raw: (H, W)
             else:
-                # ---- 2-2) YOLO로 아무도 못 잡으면 BLOB fallback ----
-                blob_box = detect_blob_person_box(raw_frame, min_area=20)
-                if blob_box is not None:
-                    person_box = blob_box
-                    det_source = "BLOB"
-                    # blob 박스 전체를 사람 덩어리로 보고 상단 60%를 머리 영역처럼 취급
+                rgb_frame, raw_frame = get_frame()
+
+            now = time.time()
+
+            frame_seq += 1
+
+            if frame_seq == 1:
+                print_startup_time(detector)
+
+            # 2) 2초에 한 번만 YOLO detection 요청 (worker 스레드에서 가장 최근 프레임만 처리)
+            #    --detector blob 이면 매 프레임 열화상 검출기 결과
+            # 새 결과가 도착하면 박스/머리 온도 갱신 (화면 루프는 기다리지 않음)
+            result = detector.step(frame_seq, now, raw_frame, rgb_frame)
+            if result is not None:
+                det_seq, boxes = result
+                head_temp_c = None
+
+                # yolo / onnx 결과 (여러 명이면 가장 큰 박스), 아무도 못 잡으면 BLOB fallback
+                person_box, det_source = select_person_box(detector, boxes, raw_frame, thermal_detector)
+                if person_box is not None:
+                    # blob 박스도 사람 덩어리로 보고 상단 60%를 머리 영역처럼 취급
                     head_temp_c = find_head_hotspot(raw_frame, person_box,
                                                     head_ratio=0.6, radius=3)
-                else:
-                    person_box = None
-                    head_temp_c = None
-                    det_source = None
-
-            last_det_time = now
-
-        # 3) 시각화용 이미지 복사
-        vis = rgb_frame.copy()
-
-        # 3-1) 마우스 아래 픽셀 온도 표시
-        if 0 <= mouse_x < WIDTH and 0 <= mouse_y < HEIGHT:
-            raw_val = int(raw_frame[mouse_y, mouse_x])
-            if raw_val > 0:
-                temp_c = raw_to_celsius(raw_val)
-                txt = f"{temp_c:.2f} C"
-                cv2.putText(vis, txt, (mouse_x + 8, mouse_y + 12),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
-                cv2.circle(vis, (mouse_x, mouse_y), 2, (255, 255, 255), -1)
-
-        # 3-2) 사람 박스 + 머리 온도 + 탐지 소스 표시
-        if person_box is not None:
-            x1, y1, x2, y2 = person_box
-
-            # YOLO면 초록, BLOB면 파랑 박스
-            color = (0, 255, 0) if det_source == "YOLO" else (255, 0, 0)
-            label = "Person(YOLO)" if det_source == "YOLO" else "Person(BLOB)"
-
-            cv2.rectangle(vis, (x1, y1), (x2, y2), color, 2)
-
-            # 라벨 + 온도 텍스트
-            if head_temp_c is not None:
-                txt = f"{label} {head_temp_c:.1f} C"
-            else:
-                txt = label
-            cv2.putText(vis, txt, (x1, max(0, y1 - 5)),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)
-
-        # 4) 출력
-        cv2.imshow(window_name, vis)
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+                head_center = None
+                if person_box is not None:
+                    head_center = find_face_center(raw_frame, person_box)
+
+            elif person_box is not None and head_center is not None:
+                # 감지 사이 프레임: 머리 중심을 주변의 가장 뜨거운 곳으로 옮기고
+                # 박스도 같은 만큼 이동한 뒤 머리 온도 다시 계산
+                new_center = refine_face_center(raw_frame, head_center)
+                dx = new_center[0] - head_center[0]
+                dy = new_center[1] - head_center[1]
+                x1, y1, x2, y2 = person_box
+                person_box = (x1 + dx, y1 + dy, x2 + dx, y2 + dy)
+                head_center = new_center
+                head_temp_c = find_head_hotspot(raw_frame, person_box,
+                                                head_ratio=0.6, radius=3)
 
-    cv2.destroyAllWindows()
+            if publisher is not None:
+                # 한 사람만 추적하므로 id 는 항상 1
+                people = []
+                if person_box is not None:
+                    people.append(person(1, person_box, head_center, head_temp_c, source=det_source))
+                source = get_source()
+                publisher.publish(source.raw_seq, source.raw_timestamp_ns, people)
+
+            if args.headless:
+                continue
+
+            # 3) 화면 출력
+            draw(window_name, rgb_frame, raw_frame)
+
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detector.stop()
+        if publisher is not None:
+            publisher.close()
+        if not args.headless:
+            cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,208 @@
+#ifndef LEPTON_SHM_H        // 헤더 중복 포함 방지 시작
+#define LEPTON_SHM_H
+
+#include <stdint.h>
+#include <string.h>
+#include <limits.h>
+#include <time.h>
+#include <unistd.h>
+#include <sys/syscall.h>
+#include <linux/futex.h>
+
+// =============================
+// Python(read_frame.py)과 공유하는 shared memory 메타데이터 블록
+// =============================
+//
+// /dev/shm/lepton_raw, /dev/shm/lepton_frame 은
+//   [ 픽셀 데이터 (W*H*2 또는 W*H*3) ][ LeptonShmHeader (64 byte) ]
+// 순서로 배치한다.
+// 헤더를 픽셀 뒤에 두기 때문에 offset 0 부터 픽셀을 읽는 예전 스크립트도 그대로 동작한다.
+//
+// seq 는 seqlock 카운터:
+//   - 쓰기 시작할 때 +1 → 홀수 (쓰는 중)
+//   - 쓰기 끝나면   +1 → 짝수 (완성된 프레임)
+// reader 는 seq(짝수) 읽기 → 픽셀 복사 → seq 다시 읽기, 두 값이 같으면 온전한 프레임.
+//
+// seq 는 futex word 로도 쓴다. 프레임을 다 쓰면 FUTEX_WAKE 로 깨우므로
+// Python(read_frame.wait_frame) 은 busy polling 없이 FUTEX_WAIT 로 잠들어 있으면 된다.
+//
+// 레이아웃이 바뀌면 LEPTON_SHM_VERSION 을 올리고 read_frame.py 도 같이 고칠 것.
+
+// SPI 캡처 통계 (누적값). reserved 였던 자리에 넣었으므로 예전 reader 는 그냥 무시한다.
+struct LeptonCaptureStats {
+  uint32_t frames;            // 완성한 프레임 수
+  uint32_t packets_dropped;   // CRC 오류 / 패킷 번호가 안 맞아서 버린 패킷 수
+  uint32_t crc_errors;        // 그 중 CRC 오류
+  uint32_t discard_packets;   // 센서가 보낸 discard 패킷 수 (정상 동작, 참고용)
+  uint32_t resyncs;           // segment 중간에 sync 를 다시 잡은 횟수
+};
+
+#define LEPTON_SHM_MAGIC 0x5450454C     // "LEPT" (little endian)
+#define LEPTON_SHM_VERSION 1
+#define LEPTON_SHM_HEADER_SIZE 64
+
+struct LeptonShmHeader {
+  uint32_t magic;             // LEPTON_SHM_MAGIC
+  uint32_t version;           // LEPTON_SHM_VERSION
+  uint32_t seq;               // seqlock 카운터 (홀수 = 쓰는 중)
+  uint32_t header_size;       // sizeof(LeptonShmHeader)
+  uint64_t timestamp_ns;      // 프레임 캡처 시각 (CLOCK_MONOTONIC, ns)
+  uint16_t width;             // 프레임 가로
+  uint16_t height;            // 프레임 세로
+  LeptonCaptureStats stats;   // offset 28, RAW 세그먼트만 채움
+  uint8_t reserved[LEPTON_SHM_HEADER_SIZE - 28 - sizeof(LeptonCaptureStats)];
+};
+
+static_assert(sizeof(LeptonShmHeader) == LEPTON_SHM_HEADER_SIZE,
+              "LeptonShmHeader layout must match read_frame.py");
+
+
+// CLOCK_MONOTONIC ns (Python time.monotonic_ns() 와 같은 시계)
+static inline uint64_t lepton_monotonic_ns()
+{
+  struct timespec ts;
+  clock_gettime(CLOCK_MONOTONIC, &ts);
+  return (uint64_t)ts.tv_sec * 1000000000ull + (uint64_t)ts.tv_nsec;
+}
+
+// 헤더 초기화 (shm 을 처음 만들었을 때 한 번)
+static inline void lepton_shm_init(LeptonShmHeader *hdr, int width, int height)
+{
+  hdr->magic = LEPTON_SHM_MAGIC;
+  hdr->version = LEPTON_SHM_VERSION;
+  hdr->header_size = LEPTON_SHM_HEADER_SIZE;
+  hdr->timestamp_ns = 0;
+  hdr->width = (uint16_t)width;
+  hdr->height = (uint16_t)height;
+  memset(&hdr->stats, 0, sizeof(hdr->stats));
+  // 이전 실행에서 홀수로 남았을 수 있으므로 짝수로 맞춘다
+  __atomic_store_n(&hdr->seq, hdr->seq & ~1u, __ATOMIC_RELEASE);
+}
+
+// 픽셀 쓰기 시작 전: seq → 홀수
+static inline void lepton_shm_write_begin(LeptonShmHeader *hdr)
+{
+  __atomic_store_n(&hdr->seq, hdr->seq + 1, __ATOMIC_RELAXED);
+  __atomic_thread_fence(__ATOMIC_RELEASE);
+}
+
+// 캡처 통계 갱신 (프레임마다). 참고용 카운터라 seqlock 없이 덮어쓴다.
+static inline void lepton_shm_set_stats(LeptonShmHeader *hdr, const LeptonCaptureStats *stats)
+{
+  hdr->stats = *stats;
+}
+
+// 픽셀 쓰기 끝난 후: 타임스탬프 기록 → seq → 짝수 → 기다리는 reader 깨우기
+static inline void lepton_shm_write_end(LeptonShmHeader *hdr, uint64_t timestamp_ns)
+{
+  hdr->timestamp_ns = timestamp_ns;
+  __atomic_store_n(&hdr->seq, hdr->seq + 1, __ATOMIC_RELEASE);
+
+  // 다른 프로세스도 깨워야 하므로 FUTEX_WAKE_PRIVATE 가 아니라 FUTEX_WAKE
+  syscall(SYS_futex, &hdr->seq, FUTEX_WAKE, INT_MAX, NULL, NULL, 0);
+}
+
+
+// =============================
+// /dev/shm/lepton_ring : 최근 N 프레임을 보관하는 ring buffer
+// =============================
+//
+//   [ LeptonRingHeader (64 byte) ]
+//   [ LeptonRingSlot x depth (64 byte 단위로 패딩) ]
+//   [ uint16 프레임 x depth (160*120 씩 연속) ]
+//
+// 프레임 영역이 연속이라 Python 에서 (depth, 120, 160) 배열 view 로 바로 볼 수 있다.
+// frame_no 는 1부터 증가, slot = frame_no % depth.
+// slot.seq 는 slot 별 seqlock: 쓰는 중 2*frame_no-1 (홀수), 완료 2*frame_no (짝수).
+// head 는 마지막으로 완성된 frame_no 이고 futex word 로도 쓴다.
+
+#define LEPTON_RING_MAGIC 0x474E4952    // "RING" (little endian)
+#define LEPTON_RING_VERSION 1
+#define LEPTON_RING_DEFAULT_DEPTH 16
+#define LEPTON_RING_MAX_DEPTH 256
+#define LEPTON_RING_FRAME_PIXELS (160 * 120)
+
+struct LeptonRingHeader {
+  uint32_t magic;             // LEPTON_RING_MAGIC
+  uint32_t version;           // LEPTON_RING_VERSION
+  uint32_t depth;             // slot 개수
+  uint32_t head;              // 마지막으로 완성된 frame_no (0 = 아직 없음)
+  uint32_t slots_offset;      // LeptonRingSlot 배열 시작 offset
+  uint32_t frames_offset;     // 프레임 배열 시작 offset
+  uint16_t width;             // 프레임 가로
+  uint16_t height;            // 프레임 세로
+  uint8_t reserved[LEPTON_SHM_HEADER_SIZE - 28];
+};
+
+struct LeptonRingSlot {
+  uint32_t seq;               // slot seqlock (홀수 = 쓰는 중)
+  uint32_t frame_no;          // 이 slot 에 들어있는 frame_no
+  uint64_t timestamp_ns;      // 캡처 시각 (CLOCK_MONOTONIC, ns)
+};
+
+static_assert(sizeof(LeptonRingHeader) == LEPTON_SHM_HEADER_SIZE,
+              "LeptonRingHeader layout must match read_frame.py");
+static_assert(sizeof(LeptonRingSlot) == 16,
+              "LeptonRingSlot layout must match read_frame.py");
+
+
+static inline size_t lepton_ring_slots_bytes(uint32_t depth)
+{
+  return (depth * sizeof(LeptonRingSlot) + 63) & ~(size_t)63;
+}
+
+// ring 전체 매핑 크기
+static inline size_t lepton_ring_size(uint32_t depth)
+{
+  return sizeof(LeptonRingHeader) + lepton_ring_slots_bytes(depth)
+       + (size_t)depth * LEPTON_RING_FRAME_PIXELS * sizeof(uint16_t);
+}
+
+static inline LeptonRingSlot* lepton_ring_slots(LeptonRingHeader *ring)
+{
+  return reinterpret_cast<LeptonRingSlot*>(
+      reinterpret_cast<uint8_t*>(ring) + ring->slots_offset);
+}
+
+static inline uint16_t* lepton_ring_frames(LeptonRingHeader *ring)
+{
+  return reinterpret_cast<uint16_t*>(
+      reinterpret_cast<uint8_t*>(ring) + ring->frames_offset);
+}
+
+// ring 초기화 (이전 실행의 내용은 모두 버림)
+static inline void lepton_ring_init(LeptonRingHeader *ring, uint32_t depth, int width, int height)
+{
+  memset(ring, 0, lepton_ring_size(depth));
+  ring->depth = depth;
+  ring->slots_offset = sizeof(LeptonRingHeader);
+  ring->frames_offset = sizeof(LeptonRingHeader) + lepton_ring_slots_bytes(depth);
+  ring->width = (uint16_t)width;
+  ring->height = (uint16_t)height;
+  ring->version = LEPTON_RING_VERSION;
+  // magic 을 마지막에 써서 reader 가 초기화 중인 ring 을 잡지 않도록
+  __atomic_store_n(&ring->magic, LEPTON_RING_MAGIC, __ATOMIC_RELEASE);
+}
+
+// 완성된 RAW 프레임 하나를 다음 slot 에 복사하고 reader 깨우기
+static inline void lepton_ring_push(LeptonRingHeader *ring, const uint16_t *frame, uint64_t timestamp_ns)
+{
+  uint32_t frame_no = ring->head + 1;
+  uint32_t index = frame_no % ring->depth;
+  LeptonRingSlot *slot = lepton_ring_slots(ring) + index;
+
+  __atomic_store_n(&slot->seq, 2 * frame_no - 1, __ATOMIC_RELAXED);
+  __atomic_thread_fence(__ATOMIC_RELEASE);
+
+  memcpy(lepton_ring_frames(ring) + (size_t)index * LEPTON_RING_FRAME_PIXELS,
+         frame, LEPTON_RING_FRAME_PIXELS * sizeof(uint16_t));
+  slot->frame_no = frame_no;
+  slot->timestamp_ns = timestamp_ns;
+
+  __atomic_store_n(&slot->seq, 2 * frame_no, __ATOMIC_RELEASE);
+  __atomic_store_n(&ring->head, frame_no, __ATOMIC_RELEASE);
+
+  syscall(SYS_futex, &ring->head, FUTEX_WAKE, INT_MAX, NULL, NULL, 0);
+}
+
+#endif   // LEPTON_SHM_H 끝
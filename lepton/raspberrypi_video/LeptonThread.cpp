@@ -11,6 +11,7 @@
 #include "Palettes.h"                   // 색상 맵(colormap) 데이터
 #include "SPI.h"                        // SPI 함수들
 #include "Lepton_I2C.h"                 // I2C 기반 FFC/Reboot 제어
+#include "leptonSDKEmb32PUB/crc16.h"    // VoSPI 패킷 CRC (CalcCRC16Bytes)
 
 // Lepton 데이터 패킷 크기 및 프레임 구조 정의
 #define PACKET_SIZE 164
@@ -19,6 +20,60 @@
 #define FRAME_SIZE_UINT16 (PACKET_SIZE_UINT16*PACKETS_PER_FRAME)
 #define FPS 27;                         // 프레임레이트 정의(사용되지 않음)
 
+// sync 복구 관련
+#define LEPTON_RESYNC_RESETS 60          // 이만큼 연속으로 깨지면 CS idle 로 센서 VoSPI resync
+#define LEPTON_RESYNC_IDLE_US 185000     // VoSPI resync 에 필요한 idle 시간 (> 5 프레임 주기)
+#define LEPTON_REBOOT_RESETS 360         // 이만큼 깨지면 (resync 6번 실패) 센서 reboot
+#define LEPTON_STATS_LOG_FRAMES 900      // 캡처 통계 로그 주기 (프레임, 9Hz 기준 100초)
+
+
+/* discard 패킷인지 (ID 상위 nibble 하위 4bit 가 0xF) */
+static inline bool lepton_packet_is_discard(const uint8_t *packet)
+{
+	return (packet[0] & 0x0f) == 0x0f;
+}
+
+/* VoSPI 패킷 CRC 확인
+   CRC16-CCITT (crc16fast.c) 를 ID 의 T 비트(상위 4bit)와 CRC 필드를 0 으로 둔 패킷 전체에 계산 */
+static bool lepton_packet_crc_ok(const uint8_t *packet)
+{
+	uint8_t buf[PACKET_SIZE];
+	memcpy(buf, packet, PACKET_SIZE);
+	buf[0] &= 0x0f;
+	buf[2] = 0;
+	buf[3] = 0;
+	uint16_t crc = CalcCRC16Bytes(PACKET_SIZE, reinterpret_cast<char*>(buf));
+	return crc == ((packet[2] << 8) | packet[3]);
+}
+
+
+/* sync 가 깨진 패킷 하나 (CRC 오류 / 패킷 번호 어긋남) 마다 호출.
+   resets 를 올리는 곳은 여기뿐이라 임계값을 건너뛰지 않는다.
+   - LEPTON_RESYNC_RESETS 마다: CS 를 잠깐 쉬어서 센서 쪽 VoSPI 를 다시 맞춤
+   - LEPTON_REBOOT_RESETS 이상: 센서 reboot 후 resets 를 0 으로 (계속 깨지면 다시 같은 순서) */
+LeptonThread::SyncAction LeptonThread::syncLost(int &resets)
+{
+	captureStats.packets_dropped++;
+	resets += 1;
+
+	if (resets >= LEPTON_REBOOT_RESETS) {
+		log_message(3, "sync lost for " + std::to_string(resets) + " packets, rebooting sensor");
+		SpiClosePort(0);
+		lepton_reboot();
+		usleep(750000);
+		SpiOpenPort(0, spiSpeed);
+		resets = 0;
+		return SYNC_REBOOTED;
+	}
+
+	if ((resets % LEPTON_RESYNC_RESETS) == 0) {
+		captureStats.resyncs++;
+		usleep(LEPTON_RESYNC_IDLE_US);
+		return SYNC_RESYNCED;
+	}
+	return SYNC_RETRY;
+}
+
 
 /* ================================
    LeptonThread 생성자
@@ -62,6 +117,15 @@ LeptonThread::~LeptonThread() {
     	close(shm_fd);
     	shm_unlink("/lepton_frame");
     	shm_fd = -1;
+}
+	if (shm_ring && shm_ring != MAP_FAILED) {
+    	munmap(shm_ring, lepton_ring_size(ringDepth));
+    	shm_ring = nullptr;
+}
+	if (shm_ring_fd >= 0) {
+    	close(shm_ring_fd);
+    	shm_unlink("/lepton_ring");
+    	shm_ring_fd = -1;
 }
 }
 
@@ -144,6 +208,13 @@ void LeptonThread::useRangeMaxValue(uint16_t newMaxValue)
 }
 
 
+/* RAW ring buffer slot 개수 설정 */
+void LeptonThread::useRingDepth(unsigned int newRingDepth)
+{
+	ringDepth = newRingDepth;
+}
+
+
 /* ============================================
    LeptonThread::run()
    스레드가 실행되면 여기서 계속 SPI 데이터 읽음
@@ -152,7 +223,8 @@ void LeptonThread::run()
 {
 	    // ===== shared memory 초기화 (최초 1번만) =====
     if (shm_ptr == nullptr) {
-        shm_size = myImageWidth * myImageHeight * 3; // RGB888
+        // RGB888 픽셀 + seqlock 헤더 (LeptonShm.h 참고)
+        shm_size = myImageWidth * myImageHeight * 3 + LEPTON_SHM_HEADER_SIZE;
 
         shm_fd = shm_open("/lepton_frame", O_CREAT | O_RDWR, 0666);
         if (shm_fd < 0) {
@@ -168,6 +240,9 @@ void LeptonThread::run()
                     log_message(5, "[ERROR] mmap failed");
                 } else {
                     shm_ptr = static_cast<uint8_t*>(map);
+                    shm_hdr = reinterpret_cast<LeptonShmHeader*>(
+                        shm_ptr + myImageWidth * myImageHeight * 3);
+                    lepton_shm_init(shm_hdr, myImageWidth, myImageHeight);
                     log_message(10, "[INFO] Shared memory /lepton_frame ready");
                 }
             }
@@ -190,12 +265,40 @@ void LeptonThread::run()
                     log_message(5, "[ERROR] mmap RAW failed");
                 } else {
                     shm_raw_ptr = static_cast<uint16_t*>(map_raw);
+                    shm_raw_hdr = reinterpret_cast<LeptonShmHeader*>(
+                        shm_raw_ptr + 160 * 120);
+                    lepton_shm_init(shm_raw_hdr, myImageWidth, myImageHeight);
                     log_message(10, "[INFO] Shared memory /lepton_raw ready");
                 }
             }
         }
     }
 
+	// ===== RAW ring buffer 초기화 (최초 1번만) =====
+    if (shm_ring == nullptr && ringDepth > 0) {
+        size_t ring_size = lepton_ring_size(ringDepth);
+        shm_ring_fd = shm_open("/lepton_ring", O_CREAT | O_RDWR, 0666);
+        if (shm_ring_fd < 0) {
+            log_message(5, "[ERROR] shm_open RING failed");
+        } else {
+            if (ftruncate(shm_ring_fd, ring_size) != 0) {
+                log_message(5, "[ERROR] ftruncate RING failed");
+            } else {
+                void* map_ring = mmap(nullptr, ring_size,
+                                      PROT_READ | PROT_WRITE,
+                                      MAP_SHARED, shm_ring_fd, 0);
+                if (map_ring == MAP_FAILED) {
+                    log_message(5, "[ERROR] mmap RING failed");
+                } else {
+                    shm_ring = static_cast<LeptonRingHeader*>(map_ring);
+                    lepton_ring_init(shm_ring, ringDepth, myImageWidth, myImageHeight);
+                    log_message(10, "[INFO] Shared memory /lepton_ring ready, depth "
+                        + std::to_string(ringDepth));
+                }
+            }
+        }
+    }
+
 	// 출력할 이미지 생성 (RGB888 포맷)
 	myImage = QImage(myImageWidth, myImageHeight, QImage::Format_RGB888);
 
@@ -231,34 +334,53 @@ void LeptonThread::run()
 		for(int j=0;j<PACKETS_PER_FRAME;j++) {
 
 			// SPI로 패킷 읽기 (각 패킷 164바이트)
-			read(spi_cs0_fd,
-			     result + sizeof(uint8_t)*PACKET_SIZE*j,
-			     sizeof(uint8_t)*PACKET_SIZE);
+			uint8_t *packet = result + sizeof(uint8_t)*PACKET_SIZE*j;
+			read(spi_cs0_fd, packet, sizeof(uint8_t)*PACKET_SIZE);
+
+			// discard 패킷 (ID 0xFxxx): 아직 보낼 데이터가 없다는 뜻 → 쉬지 않고 같은 자리에 다시 읽기
+			if (lepton_packet_is_discard(packet)) {
+				captureStats.discard_packets++;
+				j--;
+				continue;
+			}
+
+			// CRC 가 틀리면 (긴 케이블 노이즈 등) 패킷 번호도 믿을 수 없으므로 segment 처음부터
+			if (!lepton_packet_crc_ok(packet)) {
+				captureStats.crc_errors++;
+				if (syncLost(resets) == SYNC_REBOOTED) {
+					n_wrong_segment = 0;
+					n_zero_value_drop_frame = 0;
+				}
+				j = -1;
+				continue;
+			}
 
 			// 패킷 header[1] = 패킷 번호
-			int packetNumber = result[j*PACKET_SIZE+1];
+			int packetNumber = packet[1];
 
 			// 패킷 번호가 맞지 않으면 sync 깨짐 → 재시도
 			if(packetNumber != j) {
-				j = -1;
-				resets += 1;
-				usleep(1000);
-
-				// 너무 많이 깨지면 reboot
-				if(resets == 750) {
-					SpiClosePort(0);
-					lepton_reboot();
+				SyncAction action = syncLost(resets);
+				if (action == SYNC_REBOOTED) {
 					n_wrong_segment = 0;
 					n_zero_value_drop_frame = 0;
-					usleep(750000);
-					SpiOpenPort(0, spiSpeed);
 				}
+
+				if (packetNumber == 0 && action == SYNC_RETRY) {
+					// 새 segment 가 이미 시작됨 → 기다리지 않고 이 패킷을 0번으로 이어서 읽기
+					// (resync / reboot 했으면 이 패킷은 그 전 것이라 버림)
+					memcpy(result, packet, PACKET_SIZE);
+					captureStats.resyncs++;
+					j = 0;
+					continue;
+				}
+				j = -1;
 				continue;
 			}
 
 			// Lepton 3.x 는 segment 기반 구조
 			if ((typeLepton == 3) && (packetNumber == 20)) {
-				segmentNumber = (result[j*PACKET_SIZE] >> 4) & 0x0f;
+				segmentNumber = (packet[0] >> 4) & 0x0f;
 				if ((segmentNumber < 1) || (4 < segmentNumber)) {
 					log_message(10, "[ERROR] Wrong segment number " + std::to_string(segmentNumber));
 					break;
@@ -266,6 +388,9 @@ void LeptonThread::run()
 			}
 		}
 
+		// 마지막 패킷을 받은 시각 = 프레임 캡처 시각
+		uint64_t captureNs = lepton_monotonic_ns();
+
 		if(resets >= 30) {
 			log_message(3, "done reading, resets: " + std::to_string(resets));
 		}
@@ -345,6 +470,9 @@ void LeptonThread::run()
 		uint16_t valueFrameBuffer;
 		QRgb color;
 
+		// RAW shm 쓰기 시작 (seq 홀수) → Python 은 이 동안 읽은 값을 버린다
+		if (shm_raw_hdr != nullptr) lepton_shm_write_begin(shm_raw_hdr);
+
 		for(int iSegment = iSegmentStart; iSegment <= iSegmentStop; iSegment++) {
 
 			int ofsRow = 30 * (iSegment - 1);   // row offset for segment
@@ -412,6 +540,26 @@ void LeptonThread::run()
 			}
 		}
 
+		// RAW shm 쓰기 끝 (seq 짝수)
+		captureStats.frames++;
+		if (shm_raw_hdr != nullptr) {
+			lepton_shm_set_stats(shm_raw_hdr, &captureStats);
+			lepton_shm_write_end(shm_raw_hdr, captureNs);
+		}
+
+		if ((captureStats.frames % LEPTON_STATS_LOG_FRAMES) == 0) {
+			log_message(3, "[INFO] frames " + std::to_string(captureStats.frames)
+				+ ", dropped packets " + std::to_string(captureStats.packets_dropped)
+				+ " (crc " + std::to_string(captureStats.crc_errors) + ")"
+				+ ", resyncs " + std::to_string(captureStats.resyncs)
+				+ ", discard " + std::to_string(captureStats.discard_packets));
+		}
+
+		// 완성된 RAW 프레임을 ring buffer 에도 보관
+		if (shm_ring != nullptr && shm_raw_ptr != nullptr) {
+			lepton_ring_push(shm_ring, shm_raw_ptr, captureNs);
+		}
+
 		if (n_zero_value_drop_frame != 0) {
 			log_message(8, "[WARNING] Zero-value recovered "
 				+ std::to_string(n_zero_value_drop_frame));
@@ -425,8 +573,10 @@ void LeptonThread::run()
             const uint8_t* imgBits =
                 reinterpret_cast<const uint8_t*>(myImage.bits());
 
-            // 이미지 전체를 shared memory로 복사
-            memcpy(shm_ptr, imgBits, shm_size);
+            // 이미지 전체를 shared memory로 복사 (헤더 seqlock 으로 감싸기)
+            lepton_shm_write_begin(shm_hdr);
+            memcpy(shm_ptr, imgBits, myImageWidth * myImageHeight * 3);
+            lepton_shm_write_end(shm_hdr, captureNs);
         }
 			
 		/* ----------------------------
@@ -9,6 +9,8 @@
 #include <QPixmap>          // 화면 출력용 이미지(QPixmap) 사용
 #include <QImage>           // CPU 메모리 이미지(QImage) 사용
 
+#include "LeptonShm.h"      // Python과 공유하는 shm 헤더(seqlock) 정의
+
 // Lepton 패킷/프레임 관련 고정값 정의
 #define PACKET_SIZE 164                           // 패킷 1개는 164바이트
 #define PACKET_SIZE_UINT16 (PACKET_SIZE/2)        // 16비트 단위로 보면 82개
@@ -40,6 +42,7 @@ public:
   void setAutomaticScalingRange();      // 자동 스케일링(min/max)
   void useRangeMinValue(uint16_t);      // 수동 최소 온도 범위
   void useRangeMaxValue(uint16_t);      // 수동 최대 온도 범위
+  void useRingDepth(unsigned int);      // RAW ring buffer slot 개수
   void run();                           // QThread 메인 함수 (SPI 루프)
 
 public slots:
@@ -54,6 +57,10 @@ private:
   // 내부 함수, 로그 찍기용
   void log_message(uint16_t level, std::string msg);
 
+  // sync 가 깨진 패킷 하나 처리: resets 증가 + 임계값마다 CS idle resync / 센서 reboot
+  enum SyncAction { SYNC_RETRY, SYNC_RESYNCED, SYNC_REBOOTED };
+  SyncAction syncLost(int &resets);
+
   // -------- 상태 변수들 --------
   uint16_t loglevel;          // 로그 레벨
 
@@ -82,11 +89,21 @@ private:
     // ===== Python과 공유할 shared memory 관련 멤버 =====
   int shm_fd = -1;          // shared memory 파일 디스크립터
   uint8_t* shm_ptr = nullptr; // shared memory 매핑 주소
-  size_t shm_size = 0;      // 공유할 이미지 바이트 크기 (W*H*3)
+  size_t shm_size = 0;      // 매핑 크기 (W*H*3 + 헤더)
+  LeptonShmHeader* shm_hdr = nullptr;  // RGB 픽셀 뒤에 붙는 seqlock 헤더
 
   int shm_raw_fd = -1;
   uint16_t* shm_raw_ptr = nullptr;
-  size_t shm_raw_size = 160 * 120 * sizeof(uint16_t);
+  size_t shm_raw_size = 160 * 120 * sizeof(uint16_t) + LEPTON_SHM_HEADER_SIZE;
+  LeptonShmHeader* shm_raw_hdr = nullptr;  // RAW 픽셀 뒤에 붙는 seqlock 헤더
+
+  // 최근 N 개 RAW 프레임 ring buffer (/lepton_ring)
+  int shm_ring_fd = -1;
+  LeptonRingHeader* shm_ring = nullptr;
+  unsigned int ringDepth = LEPTON_RING_DEFAULT_DEPTH;
+
+  // SPI 캡처 통계 (RAW shm 헤더에도 기록 → read_frame.FrameReader.capture_stats())
+  LeptonCaptureStats captureStats = {};
 
 
   uint16_t *frameBuffer;      // (사용되지 않지만) 프레임용 버퍼 포인터
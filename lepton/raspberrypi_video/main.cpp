@@ -38,6 +38,8 @@ void printUsage(char *cmd) {
         "           20 : 20MHz [default]\n"
         " -min x  override minimum value for scaling (0 - 65535)\n"
         " -max x  override maximum value for scaling (0 - 65535)\n"
+        " -ring x number of RAW frames kept in /dev/shm/lepton_ring (1 - 256)\n"
+        "           16 : [default]\n"
         " -d x    log level (0-255)\n",
         cmdname, cmdname
     );
@@ -59,6 +61,7 @@ int main(int argc, char **argv)
     int rangeMin     = -1;  // 자동 스케일링
     int rangeMax     = -1;  // 자동 스케일링
     int loglevel     = 0;   // 로그 레벨 기본값
+    int ringDepth    = LEPTON_RING_DEFAULT_DEPTH;  // RAW ring buffer 깊이
 
     // -----------------------------
     // 명령줄 인자 파싱
@@ -124,6 +127,15 @@ int main(int argc, char **argv)
                 i++;
             }
         }
+
+        // RAW ring buffer 깊이
+        else if (strcmp(argv[i], "-ring") == 0 && i + 1 != argc) {
+            int val = std::atoi(argv[i + 1]);
+            if (1 <= val && val <= LEPTON_RING_MAX_DEPTH) {
+                ringDepth = val;
+                i++;
+            }
+        }
     }
 
 
@@ -172,6 +184,7 @@ int main(int argc, char **argv)
     thread->useColormap(typeColormap);
     thread->useLepton(typeLepton);
     thread->useSpiSpeedMhz(spiSpeed);
+    thread->useRingDepth(ringDepth);
 
     // 자동 스케일링
     thread->setAutomaticScalingRange();